@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from inference_client import AsyncInferenceClient, CircuitBreaker, InferenceClient, InferenceError, UpstreamCooldown
+
+# Generation parameters the local backend forwards to transformers' generate()
+LOCAL_GENERATE_KWARGS = frozenset({"max_new_tokens", "temperature", "do_sample", "top_k", "top_p", "num_beams"})
+
+
+class GenerationBackend:
+    """Base class for text generation backends used by generate_questions"""
+
+    name = "base"
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the model behind the backend; part of the response cache key"""
+        return self.name
+
+    def is_available(self) -> bool:
+        return True
+
+    def generate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        """Generate text for a prompt; raises InferenceError on failure"""
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        """Async generate; runs the blocking implementation in a worker thread by default"""
+        return await asyncio.to_thread(self.generate, prompt, parameters)
+
+    def stream(self, prompt: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Yield text chunks as they are generated; non-streaming backends yield once"""
+        yield self.generate(prompt, parameters)
+
+    async def astream(self, prompt: str, parameters: Dict[str, Any]) -> AsyncIterator[str]:
+        """Async version of stream()"""
+        yield await self.agenerate(prompt, parameters)
+
+    async def aclose(self):
+        pass
+
+
+class HTTPBackend(GenerationBackend):
+    """Hugging Face Inference API over HTTP"""
+
+    name = "http"
+
+    def __init__(self, url: str, client: Optional[InferenceClient] = None,
+                 async_client: Optional[AsyncInferenceClient] = None, cooldown: Optional[UpstreamCooldown] = None):
+        self.url = url
+        # Both clients share the breaker and rate-limit cool-down, so both paths see one health state
+        self.breaker = client.breaker if client is not None else CircuitBreaker()
+        self.cooldown = cooldown
+        self._client = client
+        self._async_client = async_client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> InferenceClient:
+        # Built on first use, so importing the engine doesn't load requests
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = InferenceClient.from_env(self.url, breaker=self.breaker, cooldown=self.cooldown)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncInferenceClient:
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = AsyncInferenceClient.from_env(self.url, breaker=self.breaker, cooldown=self.cooldown)
+        return self._async_client
+
+    @property
+    def model_id(self) -> str:
+        return self.url
+
+    def is_available(self) -> bool:
+        if self.cooldown is not None and self.cooldown.remaining() > 0:
+            return False
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def generate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        return self.client.generate(prompt, parameters)
+
+    async def agenerate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        return await self.async_client.generate(prompt, parameters)
+
+    def stream(self, prompt: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        return self.client.stream(prompt, parameters)
+
+    def astream(self, prompt: str, parameters: Dict[str, Any]) -> AsyncIterator[str]:
+        return self.async_client.stream(prompt, parameters)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+
+
+class _PendingGeneration:
+    __slots__ = ("prompt", "parameters", "batch_key", "future")
+
+    def __init__(self, prompt: str, parameters: Dict[str, Any]):
+        self.prompt = prompt
+        self.parameters = {k: v for k, v in parameters.items() if k in LOCAL_GENERATE_KWARGS}
+        # Only requests with the same generation settings can share a batch
+        self.batch_key = json.dumps(self.parameters, sort_keys=True)
+        self.future = Future()
+
+
+class LocalSeq2SeqBackend(GenerationBackend):
+    """In-process CPU seq2seq model with dynamic batching of concurrent requests
+
+    The model is loaded lazily by the batching thread on first use. Requests
+    that arrive within ``max_wait`` seconds of each other are run through the
+    model together, up to ``max_batch_size`` at a time.
+    """
+
+    name = "local"
+
+    def __init__(self, model_name: str = "google/flan-t5-small", max_batch_size: int = 8,
+                 max_wait: float = 0.01, timeout: float = 60.0):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._carry = deque()
+        self._model = None
+        self._tokenizer = None
+        self._torch = None
+        self._load_error: Optional[str] = None
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LocalSeq2SeqBackend":
+        return cls(
+            model_name=os.environ.get("LOCAL_MODEL", "google/flan-t5-small"),
+            max_batch_size=int(os.environ.get("LOCAL_MAX_BATCH", 8)),
+            max_wait=float(os.environ.get("LOCAL_MAX_WAIT_MS", 10)) / 1000,
+        )
+
+    @property
+    def model_id(self) -> str:
+        return f"local:{self.model_name}"
+
+    def is_available(self) -> bool:
+        # After a failed load, skip straight to the fallback instead of retrying every request
+        return self._load_error is None
+
+    def _submit(self, prompt: str, parameters: Dict[str, Any]) -> Future:
+        if self._load_error is not None:
+            raise InferenceError(self._load_error)
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="local-seq2seq", daemon=True)
+                    self._worker.start()
+        pending = _PendingGeneration(prompt, parameters)
+        self._queue.put(pending)
+        return pending.future
+
+    def generate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        future = self._submit(prompt, parameters)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError as e:
+            raise InferenceError(f"Local generation timed out after {self.timeout}s") from e
+
+    async def agenerate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        future = self._submit(prompt, parameters)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError as e:
+            raise InferenceError(f"Local generation timed out after {self.timeout}s") from e
+
+    def _load(self):
+        try:
+            import torch
+            from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            self._model.eval()
+            self._torch = torch
+        except Exception as e:
+            self._load_error = f"Could not load {self.model_name}: {type(e).__name__}: {e}"
+            print(f"Local Model Error: {self._load_error}")
+
+    def _next_item(self, timeout: Optional[float]):
+        if self._carry:
+            return self._carry.popleft()
+        return self._queue.get(timeout=timeout) if timeout is not None else self._queue.get()
+
+    def _collect_batch(self) -> List[_PendingGeneration]:
+        first = self._next_item(None)
+        batch = [first]
+        skipped = []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._next_item(remaining)
+            except queue.Empty:
+                break
+            if item.batch_key == first.batch_key:
+                batch.append(item)
+            else:
+                skipped.append(item)
+        # Requests with other settings go first in the next batch
+        self._carry.extendleft(reversed(skipped))
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if self._model is None and self._load_error is None:
+                self._load()
+            if self._load_error is not None:
+                for item in batch:
+                    item.future.set_exception(InferenceError(self._load_error))
+                continue
+            try:
+                texts = self._generate_batch([item.prompt for item in batch], batch[0].parameters)
+            except Exception as e:
+                error = InferenceError(f"Local generation failed: {type(e).__name__}: {e}")
+                for item in batch:
+                    item.future.set_exception(error)
+                continue
+            for item, text in zip(batch, texts):
+                item.future.set_result(text)
+
+    def _generate_batch(self, prompts: List[str], parameters: Dict[str, Any]) -> List[str]:
+        inputs = self._tokenizer(prompts, return_tensors="pt", padding=True, truncation=True)
+        with self._torch.inference_mode():
+            outputs = self._model.generate(**inputs, **parameters)
+        return [text.strip() for text in self._tokenizer.batch_decode(outputs, skip_special_tokens=True)]
+
+
+class FakeBackend(GenerationBackend):
+    """Deterministic backend for tests: the same prompt always yields the same questions"""
+
+    name = "fake"
+
+    QUESTIONS = (
+        "Describe a project where you applied these skills end to end.",
+        "How do you debug an issue you cannot reproduce locally?",
+        "Explain a technical trade-off you made and what you would change.",
+        "How do you decide when code is ready for review?",
+        "Walk me through how you would onboard onto an unfamiliar codebase.",
+        "How do you measure whether a change improved performance?",
+        "Describe a disagreement with a teammate and how it was resolved.",
+        "What would you automate first in a new team, and why?",
+    )
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _count_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def _text(self, prompt: str) -> str:
+        match = re.search(r"Generate (\d+)", prompt)
+        count = int(match.group(1)) if match else 5
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        picked = [self.QUESTIONS[(seed + i * 3) % len(self.QUESTIONS)] for i in range(count)]
+        return "\n".join(f"{i}. {question}" for i, question in enumerate(picked, start=1))
+
+    def generate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        return self._text(prompt)
+
+    async def agenerate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        self._count_call()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._text(prompt)
+
+    def stream(self, prompt: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        for i, token in enumerate(re.findall(r"\S+\s*", self._text(prompt))):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            yield token
+
+    async def astream(self, prompt: str, parameters: Dict[str, Any]) -> AsyncIterator[str]:
+        self._count_call()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for i, token in enumerate(re.findall(r"\S+\s*", self._text(prompt))):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield token
+
+
+def create_backend(name: str, url: str, store=None) -> GenerationBackend:
+    """Build the backend selected by name: http, local or fake
+
+    A store (see store.py) holds the HTTP backend's rate-limit cool-down, so
+    worker processes sharing the store back off together.
+    """
+    if name == "http":
+        return HTTPBackend(url, cooldown=UpstreamCooldown(store) if store is not None else None)
+    if name == "local":
+        return LocalSeq2SeqBackend.from_env()
+    if name == "fake":
+        return FakeBackend(
+            latency=float(os.environ.get("FAKE_BACKEND_LATENCY", 0)),
+            token_latency=float(os.environ.get("FAKE_BACKEND_TOKEN_LATENCY", 0)),
+        )
+    raise ValueError(f"Unknown generation backend {name!r} (expected http, local or fake)")
@@ -0,0 +1,163 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from cache import make_cache_key
+
+REQUIRED_COLUMNS = ("role", "skills", "level")
+# Distinct requests remembered for sharing one generation between identical rows
+DEDUPE_WINDOW = 1024
+
+
+class BatchSummary:
+    """Counters reported at the end of a batch run"""
+
+    __slots__ = ("rows", "succeeded", "failed", "deduplicated", "elapsed")
+
+    def __init__(self):
+        self.rows = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.elapsed = 0.0
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def iter_csv_rows(path: str) -> Iterator[Dict[str, str]]:
+    """Stream rows from a CSV file with role, skills and level columns"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: missing column(s): {', '.join(missing)}")
+        yield from reader
+
+
+def validate_row(row: Dict[str, str], levels: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Return an error message for an unusable row, or None"""
+    for column in REQUIRED_COLUMNS:
+        if not (row.get(column) or "").strip():
+            return f"missing {column}"
+    if levels is not None and row["level"].strip() not in levels:
+        return f"unknown level {row['level']!r}"
+    return None
+
+
+def run_batch(
+    rows: Iterable[Dict[str, str]],
+    output: TextIO,
+    generate: Callable[..., str],
+    workers: int = 8,
+    use_api: bool = True,
+    levels: Optional[Iterable[str]] = None,
+    dedupe_window: int = DEDUPE_WINDOW,
+) -> BatchSummary:
+    """Generate question packs for many rows, writing one JSON line per row in input order
+
+    Rows are consumed lazily and at most ``workers * 4`` are in flight at a time,
+    so memory use doesn't grow with the input size. Identical requests seen within
+    the last ``dedupe_window`` distinct requests share a single generation.
+    """
+    summary = BatchSummary()
+    start = time.perf_counter()
+    levels = frozenset(levels) if levels is not None else None
+    max_pending = max(1, workers * 4)
+    pending = deque()
+    recent = OrderedDict()
+
+    def write(index: int, row: Dict[str, str], future: Optional[Future], error: Optional[str]):
+        record = {"row": index, "role": row.get("role"), "skills": row.get("skills"), "level": row.get("level")}
+        if error is None:
+            try:
+                result = future.result()
+                # Structured results (results.QuestionPack) are written as an object
+                if isinstance(result, str):
+                    record["questions"] = result
+                else:
+                    record["pack"] = result.to_dict()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        if error is None:
+            summary.succeeded += 1
+        else:
+            record["error"] = error
+            summary.failed += 1
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for index, row in enumerate(rows, start=1):
+            summary.rows += 1
+            future = None
+            error = validate_row(row, levels)
+            if error is None:
+                role, skills, level = (row[c].strip() for c in REQUIRED_COLUMNS)
+                key = make_cache_key(role, skills, level, use_api=use_api)
+                future = recent.get(key)
+                if future is not None:
+                    recent.move_to_end(key)
+                    summary.deduplicated += 1
+                else:
+                    future = pool.submit(generate, role, skills, level, use_api)
+                    recent[key] = future
+                    if len(recent) > dedupe_window:
+                        recent.popitem(last=False)
+            pending.append((index, row, future, error))
+
+            # Write finished rows in order once the in-flight window is full
+            while len(pending) >= max_pending:
+                write(*pending.popleft())
+
+        while pending:
+            write(*pending.popleft())
+
+    output.flush()
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def main(
+    argv,
+    generate: Callable[..., str],
+    levels: Optional[Iterable[str]] = None,
+    report: Optional[Callable[[], Dict]] = None,
+    generate_structured: Optional[Callable] = None,
+) -> int:
+    """Entry point for `python app.py batch in.csv out.jsonl`; `report` adds fields to the summary"""
+    parser = argparse.ArgumentParser(
+        prog="app.py batch",
+        description="Generate interview question packs for every row of a CSV file",
+    )
+    parser.add_argument("input", help="CSV file with role, skills and level columns")
+    parser.add_argument("output", help="JSON Lines file to write, one record per input row")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent generation requests")
+    parser.add_argument("--no-api", action="store_true", help="use only the rule-based questions")
+    if generate_structured is not None:
+        parser.add_argument(
+            "--structured", action="store_true",
+            help="write each pack as an object with questions, advice, source and timings instead of text",
+        )
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.output, "w", encoding="utf-8") as output:
+            summary = run_batch(
+                iter_csv_rows(args.input),
+                output,
+                generate_structured if getattr(args, "structured", False) else generate,
+                workers=args.workers,
+                use_api=not args.no_api,
+                levels=levels,
+            )
+    except (OSError, ValueError) as e:
+        print(f"Batch Error: {e}", file=sys.stderr)
+        return 2
+
+    print(json.dumps({**summary.as_dict(), **(report() if report else {})}), file=sys.stderr)
+    return 1 if summary.failed else 0
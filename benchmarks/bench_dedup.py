@@ -0,0 +1,129 @@
+"""Near-duplicate question removal: dedup rates and MinHash/LSH versus pairwise lookup.
+
+Run from the repository root:
+
+    python benchmarks/bench_dedup.py [--packs 200] [--sizes 1000 5000 20000]
+
+A fake backend answers with packs drawn from a small pool of paraphrased
+questions, as a model repeating itself does. The packs go through
+engine.dedupe_questions with one cross-batch index, and the script reports
+how many questions were dropped and topped up from the bank, next to the
+share that really repeat an earlier question. A pack of short imperative
+questions ("Define REST.") with duplicates checks that rebuilding a pack
+keeps them all. It then times one lookup against indexes of increasing
+size, with LSH and with a brute-force Jaccard scan over every indexed
+question.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("GENERATION_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from dedup import DedupIndex, jaccard, shingles, split_questions  # noqa: E402
+from skills import SKILL_ALIASES  # noqa: E402
+
+LEVELS = ("Entry/Junior", "Mid-Level", "Senior", "Lead/Principal")
+TOPICS = sorted(SKILL_ALIASES)
+# Each group is one question phrased several ways
+PARAPHRASES = (
+    (
+        "How would you use {topic} in a production system?",
+        "How do you use {topic} in production systems?",
+        "In a production system, how would you use {topic}?",
+    ),
+    (
+        "What trade-offs come with {topic} and how do you weigh them?",
+        "What are the trade-offs of {topic}, and how would you weigh them?",
+    ),
+    ("Tell me about a time {topic} caused an outage and what you changed afterwards.",),
+)
+
+
+def repetitive_pack(rng: random.Random, asked: set, size: int = 5) -> str:
+    topics = rng.sample(TOPICS, 3)
+    lines = []
+    for _ in range(size):
+        topic, group = rng.choice(topics), rng.randrange(len(PARAPHRASES))
+        asked.add((topic, group))
+        lines.append(rng.choice(PARAPHRASES[group]).format(topic=topic))
+    return "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+
+
+def dedup_rates(packs: int):
+    rng = random.Random(3)
+    seen = DedupIndex(engine.DEDUP_THRESHOLD)
+    roles = sorted(engine.JOB_CATEGORIES)
+    asked = set()
+    before = engine.dedup_stats.report()
+    start = time.perf_counter()
+    for _ in range(packs):
+        role = rng.choice(roles)
+        text = engine.dedupe_questions(
+            repetitive_pack(rng, asked), role, "Python, SQL", rng.choice(LEVELS), engine.JOB_CATEGORIES[role], seen
+        )
+        assert len(split_questions(text)) == 5, text
+    elapsed = time.perf_counter() - start
+    after = engine.dedup_stats.report()
+    counts = {name: after[name] - before[name] for name in after if name != "dedup_rate"}
+    dropped = counts["dropped_in_pack"] + counts["dropped_seen"]
+    print(f"{packs} packs, {counts['questions']} questions: {counts['dropped_in_pack']} dropped within a pack, "
+          f"{counts['dropped_seen']} already used in the batch ({dropped / counts['questions']:.0%}), "
+          f"{counts['topped_up']} topped up from the bank; {elapsed / packs * 1000:.2f} ms/pack")
+    # Every paraphrase after the first of a question is a repeat, so this is the least a correct dedup drops
+    print(f"{len(asked)} distinct questions asked: {1 - len(asked) / counts['questions']:.0%} of the questions repeat one")
+
+
+def short_questions():
+    # Short imperatives must survive when a duplicate forces the pack to be rebuilt
+    text = "1. Explain Python decorators.\n2. Define REST.\n3. What is a closure?\n4. Define REST.\n5. Explain Python decorators."
+    role = "Backend Developer"
+    before = engine.dedup_stats.report()
+    deduped = split_questions(engine.dedupe_questions(text, role, "Python, SQL", "Mid-Level", engine.JOB_CATEGORIES[role]))
+    after = engine.dedup_stats.report()
+    assert deduped[:3] == ["Explain Python decorators.", "Define REST.", "What is a closure?"], deduped
+    assert len(deduped) == 5, deduped
+    print(f"short questions: 3 kept, {after['dropped_in_pack'] - before['dropped_in_pack']} duplicates dropped, "
+          f"{after['topped_up'] - before['topped_up']} topped up from the bank")
+
+
+def lookup_latency(sizes, queries: int = 200):
+    rng = random.Random(4)
+    words = [f"term{i}" for i in range(3000)]
+    print(f"\n{'indexed':>8} {'LSH µs':>10} {'scan µs':>10}")
+    for size in sizes:
+        index = DedupIndex()
+        while len(index) < size:
+            index.add_if_new(f"How would you use {' '.join(rng.sample(words, 6))} in production?")
+        features = [features for _, features, _ in index._docs.values()]
+        probes = [f"How would you use {' '.join(rng.sample(words, 6))} in production?" for _ in range(queries)]
+        lsh, scan = [], []
+        for probe in probes:
+            start = time.perf_counter()
+            index.find(probe)
+            lsh.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            probe_features = shingles(probe)
+            any(jaccard(probe_features, other) >= index.threshold for other in features)
+            scan.append(time.perf_counter() - start)
+        print(f"{size:>8} {statistics.median(lsh) * 1e6:>10.1f} {statistics.median(scan) * 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packs", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    dedup_rates(args.packs)
+    short_questions()
+    lookup_latency(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Bulk export: documents per second and memory use as the number of packs grows.
+
+Run from the repository root:
+
+    python benchmarks/bench_export.py [--packs 200 2000] [--formats md html pdf]
+
+Exports rule-based packs for random roles into a zip archive with
+export.export_zip, first rendering in this process (one pack at a time) and
+then on the process pool. Peak resident memory should stay flat as the pack
+count grows, because packs are generated lazily and only a few are in flight.
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+
+os.environ.setdefault("GENERATION_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import export  # noqa: E402
+
+
+class InlinePool:
+    """Executor stand-in that renders in the calling thread, like the old one-at-a-time path"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def packs(count: int):
+    rng = random.Random(6)
+    roles = sorted(engine.JOB_CATEGORIES)
+    levels = list(engine.LEVEL_MODIFIERS)
+    for _ in range(count):
+        role = rng.choice(roles)
+        yield engine.fallback_question_pack(role, "Python, SQL, AWS", rng.choice(levels), engine.JOB_CATEGORIES[role])
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packs", type=int, nargs="+", default=[200, 2000])
+    parser.add_argument("--formats", nargs="+", choices=export.FORMATS, default=list(export.FORMATS))
+    args = parser.parse_args()
+
+    print(f"{export.EXPORT_WORKERS} worker process(es), formats: {' '.join(args.formats)}")
+    print(f"{'packs':>7} {'renderer':<10} {'packs/s':>9} {'zip KB':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.zip")
+        for count in args.packs:
+            for label, pool in (("inline", InlinePool()), ("pool", export.get_pool())):
+                start = time.perf_counter()
+                summary = export.export_zip(packs(count), path, args.formats, pool=pool)
+                elapsed = time.perf_counter() - start
+                print(f"{count:>7} {label:<10} {summary.packs / elapsed:>9.0f} "
+                      f"{os.path.getsize(path) / 1024:>9.0f} {peak_rss_mb():>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
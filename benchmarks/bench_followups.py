@@ -0,0 +1,118 @@
+"""Per-click cost of follow-up generation before and after the dispatch registry.
+
+Run from the repository root:
+
+    python benchmarks/bench_followups.py [--number N]
+
+Both paths run with the model disabled so only local work is measured; the
+script exits non-zero if the registry's fallback output differs from the
+original function for any question type and level.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import (  # noqa: E402
+    FOLLOWUP_PROMPTS,
+    LEVEL_MODIFIERS,
+    generate_followup_questions,
+    get_behavioral_fallback,
+    get_leadership_fallback,
+    get_scenario_fallback,
+    get_technical_fallback,
+)
+
+ROLE = "Backend Developer"
+SKILLS = "Python, PostgreSQL, Redis, Kafka"
+
+
+# Frozen copy of the original implementation, kept as the reference
+def legacy_generate_followup_questions(role, skills, level, question_type):
+    """Generate follow-up questions based on type and level"""
+    level_info = LEVEL_MODIFIERS.get(level, {})
+    
+    type_prompts = {
+        "behavioral": {
+            "Entry/Junior": f"Generate 3 behavioral questions focusing on learning, adaptability, and teamwork for a {role} at {level} level",
+            "Mid-Level": f"Generate 3 behavioral questions focusing on project experience, collaboration, and problem-solving for a {role} at {level} level",
+            "Senior": f"Generate 3 behavioral questions focusing on leadership, mentoring, and technical guidance for a {role} at {level} level",
+            "Lead/Principal": f"Generate 3 behavioral questions focusing on strategic thinking, team building, and stakeholder management for a {role} at {level} level"
+        },
+        "technical_depth": {
+            "Entry/Junior": f"Generate 3 technical questions focusing on fundamentals and basic concepts for {role}",
+            "Mid-Level": f"Generate 3 advanced technical questions diving deeper into specific skills: {skills}",
+            "Senior": f"Generate 3 architectural/system design questions for {role} position",
+            "Lead/Principal": f"Generate 3 strategic technical questions about technology selection and implementation for {role}"
+        },
+        "scenario": {
+            "Entry/Junior": f"Generate 3 simple scenario-based questions testing basic problem-solving for {role}",
+            "Mid-Level": f"Generate 3 realistic work scenario questions for {role} with skills: {skills}",
+            "Senior": f"Generate 3 complex scenario questions involving technical leadership and decision-making",
+            "Lead/Principal": f"Generate 3 strategic scenario questions involving business and technical trade-offs"
+        },
+        "leadership": {
+            "Entry/Junior": f"Generate 3 questions about teamwork and collaboration for junior {role}",
+            "Mid-Level": f"Generate 3 questions about informal leadership and mentoring for {role}",
+            "Senior": f"Generate 3 leadership questions about team management and technical direction",
+            "Lead/Principal": f"Generate 3 executive-level leadership questions for {role} position"
+        }
+    }
+    
+    prompt = type_prompts.get(question_type, {}).get(level, 
+        f"Generate 3 {question_type} questions for a {role} at {level} level with skills: {skills}")
+    
+    # Fallback responses when API is not available
+    fallback_responses = {
+        "behavioral": get_behavioral_fallback(role, level),
+        "technical_depth": get_technical_fallback(role, skills, level),
+        "scenario": get_scenario_fallback(role, level),
+        "leadership": get_leadership_fallback(role, level)
+    }
+    
+    return fallback_responses.get(question_type, "Focus on practical experience and problem-solving approaches.")
+
+
+def iter_cases():
+    for question_type in list(FOLLOWUP_PROMPTS) + ["unknown"]:
+        for level in LEVEL_MODIFIERS:
+            yield ROLE, SKILLS, level, question_type
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=500, help="iterations per timing run")
+    args = parser.parse_args()
+
+    cases = list(iter_cases())
+    mismatches = 0
+    for case in cases:
+        expected = legacy_generate_followup_questions(*case)
+        actual = generate_followup_questions(*case, use_api=False)
+        if actual != expected:
+            mismatches += 1
+            print(f"MISMATCH for {case!r}:\n  expected={expected!r}\n  actual={actual!r}")
+    print(f"{len(cases)} cases checked, {mismatches} mismatches")
+
+    def run_legacy():
+        for case in cases:
+            legacy_generate_followup_questions(*case)
+
+    def run_registry():
+        for case in cases:
+            generate_followup_questions(*case, use_api=False)
+
+    per_call = args.number * len(cases)
+    legacy = min(timeit.repeat(run_legacy, number=args.number, repeat=5)) / per_call
+    registry = min(timeit.repeat(run_registry, number=args.number, repeat=5)) / per_call
+    print(f"legacy   : {legacy * 1e9:8.0f} ns/click")
+    print(f"registry : {registry * 1e9:8.0f} ns/click")
+    print(f"speedup  : {legacy / registry:8.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
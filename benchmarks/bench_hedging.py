@@ -0,0 +1,93 @@
+"""Interactive latency against an upstream with a slow tail, with and without hedging.
+
+Run from the repository root:
+
+    python benchmarks/bench_hedging.py [--requests 300] [--latency 0.05] [--tail-rate 0.02] [--tail-latency 2] [--slo 1]
+
+The local fake inference server answers most requests after --latency
+seconds, but a --tail-rate share take --tail-latency seconds longer. The
+same requests are sent through engine.generate_questions three times:
+
+    off      no hedger: every slow response is waited out
+    timeout  adaptive timeout, capped at --slo: slow responses are abandoned for the fallback
+    hedge    as timeout, and a duplicate is sent after the p95 latency
+
+The hedger needs a latency history before it acts, so each mode starts
+with a warm-up of untimed requests.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_server import FakeInferenceServer  # noqa: E402
+from suite import percentile  # noqa: E402
+
+WARMUP_REQUESTS = 40
+
+
+def run(engine, mode: str, server: FakeInferenceServer, requests: int, concurrency: int, slo: float):
+    from hedging import Hedger
+
+    engine.upstream_hedger = None if mode == "off" else Hedger(hedge=mode == "hedge", slo=slo)
+    serial = iter(range(10 ** 9))
+
+    def ask(_=None):
+        skills = f"Python, SQL, {mode} skill {next(serial)}"
+        start = time.perf_counter()
+        text = engine.generate_questions("Software Engineer", skills, "Mid-Level")
+        # Only the rule-based fallback's header lists the skills
+        return time.perf_counter() - start, "Required Skills" in text
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(WARMUP_REQUESTS):
+            ask()
+        seen = server.requests_seen
+        before = engine.upstream_hedger.stats() if engine.upstream_hedger is not None else {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(ask, range(requests)))
+    latencies = sorted(latency for latency, _ in results)
+    after = engine.upstream_hedger.stats() if engine.upstream_hedger is not None else {}
+    stats = {name: value - before[name] for name, value in after.items()}
+    print(f"{mode:<8} {percentile(latencies, 0.5) * 1000:>8.0f} {percentile(latencies, 0.95) * 1000:>8.0f} "
+          f"{percentile(latencies, 0.99) * 1000:>8.0f} {latencies[-1] * 1000:>8.0f} "
+          f"{sum(fallback for _, fallback in results) / requests:>9.1%} "
+          f"{stats.get('hedged', 0):>7} {stats.get('hedge_wins', 0):>6} {server.requests_seen - seen:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="usual upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="random ± seconds added to the latency")
+    parser.add_argument("--tail-rate", type=float, default=0.02, help="share of slow upstream responses")
+    parser.add_argument("--tail-latency", type=float, default=2.0, help="seconds added to slow responses")
+    parser.add_argument("--slo", type=float, default=1.0, help="latency objective capping the adaptive timeout (s)")
+    args = parser.parse_args()
+
+    server = FakeInferenceServer(latency=args.latency, jitter=args.jitter, tail_rate=args.tail_rate,
+                                 tail_latency=args.tail_latency).start()
+    os.environ["HF_API_URL"] = server.url
+    os.environ["GENERATION_BACKEND"] = "http"
+    os.environ.setdefault("HF_POOL_SIZE", str(args.concurrency * 2))
+    os.environ.setdefault("HF_READ_TIMEOUT", str(args.tail_latency + 5))
+    import engine
+
+    print(f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'fallback':>9} "
+          f"{'hedged':>7} {'wins':>6} {'upstream':>9}")
+    try:
+        for mode in ("off", "timeout", "hedge"):
+            run(engine, mode, server, args.requests, args.concurrency, args.slo)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Repeated follow-up clicks and switching back to an earlier role, with and without session history.
+
+Run from the repository root:
+
+    python benchmarks/bench_history.py [--clicks 4] [--latency 0.3]
+
+Simulates a user who generates questions, clicks each follow-up button
+--clicks times, switches to another role and back. Without history every
+click recomputes the answer and shows the same questions again; with it
+each click adds only questions not yet shown, and switching back reads the
+ring buffer instead of regenerating. Uses the fake backend with --latency
+seconds per model call.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FOLLOWUP_TYPES = ("behavioral", "technical_depth", "scenario", "leadership")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=4, help="clicks on each follow-up button")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake model latency (s)")
+    args = parser.parse_args()
+
+    os.environ["GENERATION_BACKEND"] = "fake"
+    os.environ["FAKE_BACKEND_LATENCY"] = str(args.latency)
+    os.environ.pop("HISTORY_DB", None)
+    import engine
+    from history import QUESTIONS, HistoryStore, numbered_questions
+
+    role, skills, level = "Backend Developer", "Python, PostgreSQL, Redis", "Mid-Level"
+    history = HistoryStore.from_env(engine.DEDUP_THRESHOLD)
+    session = history.session("bench")
+    text = engine.generate_questions(role, skills, level)
+    history.record("bench", role, skills, level, QUESTIONS, text)
+
+    shown_before = numbered_questions(text)
+    shown_after = list(shown_before)
+    for question_type in FOLLOWUP_TYPES:
+        for _ in range(args.clicks):
+            shown_before += numbered_questions(engine.generate_followup_questions(role, skills, level, question_type))
+            rounds = session.rounds(role, skills, level, question_type)
+            questions = engine.generate_followup_round(role, skills, level, question_type, session.served(), rounds)
+            history.record("bench", role, skills, level, question_type, "\n".join(questions), questions)
+            shown_after += questions
+
+    print(f"{'':<10} {'shown':>6} {'distinct':>9} {'repeats':>8}")
+    for label, shown in (("before", shown_before), ("history", shown_after)):
+        distinct = len(set(shown))
+        print(f"{label:<10} {len(shown):>6} {distinct:>9} {len(shown) - distinct:>8}")
+
+    # Switching back: a model call once the cached answer has expired, vs reading the history
+    engine.response_cache.clear()
+    start = time.perf_counter()
+    engine.generate_questions(role, skills, level)
+    regenerate = time.perf_counter() - start
+    start = time.perf_counter()
+    session.latest(role, skills, level)
+    session.followups(role, skills, level)
+    restore = time.perf_counter() - start
+    print(f"\nswitch back: regenerate {regenerate * 1000:.1f} ms (uncached), restore from history {restore * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
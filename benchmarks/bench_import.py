@@ -0,0 +1,92 @@
+"""Import-time budget for the generation engine.
+
+Measures `import engine` and `import app` with `python -X importtime`, checks
+that the engine doesn't pull in the UI or HTTP stacks, and exits non-zero if
+the engine import exceeds its budget.
+
+    python benchmarks/bench_import.py --budget-ms 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only; importing the engine must not load these
+DEFERRED_MODULES = ("gradio", "fastapi", "requests", "aiohttp", "transformers", "torch")
+
+TARGETS = {
+    "engine": "import engine",
+    "app": "import app",
+    "app + build_demo()": "import app; app.build_demo()",
+}
+
+
+def _env():
+    env = dict(os.environ)
+    # Cached bytecode is part of a normal start; don't charge compilation to every run
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def import_times(code: str):
+    """Return ({module: (self_us, cumulative_us)}, wall ms) for one fresh interpreter"""
+    wrapped = f"import time; _t = time.perf_counter(); {code}; print((time.perf_counter() - _t) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", wrapped],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules, float(result.stdout.strip().splitlines()[-1])
+
+
+def deferred_modules_loaded():
+    code = f"import sys, engine; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="maximum median `import engine` time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="heaviest modules to list under the engine import")
+    args = parser.parse_args()
+
+    print(f"{'target':>18} {'median ms':>10}")
+    engine_runs = []
+    for label, code in TARGETS.items():
+        import_times(code)  # warm the bytecode and OS file caches
+        runs = [import_times(code) for _ in range(args.runs)]
+        if label == "engine":
+            engine_runs = runs
+        print(f"{label:>18} {statistics.median(wall for _, wall in runs):>10.1f}")
+
+    modules = engine_runs[0][0]
+    print("\nheaviest modules (self time) in a fresh `import engine`, interpreter start-up included:")
+    for name, (self_us, _) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:>7.1f} ms  {name}")
+
+    failures = []
+    loaded = deferred_modules_loaded()
+    if loaded:
+        failures.append(f"`import engine` loaded deferred module(s): {', '.join(loaded)}")
+    engine_ms = statistics.median(wall for _, wall in engine_runs)
+    if engine_ms > args.budget_ms:
+        failures.append(f"`import engine` took {engine_ms:.1f} ms, budget {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"\nOK: `import engine` {engine_ms:.1f} ms within the {args.budget_ms:.0f} ms budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Overhead of the metrics instrumentation on the rule-based generation path.
+
+Each mode runs in its own interpreter, since METRICS_ENABLED is read once at
+import time.
+
+    python benchmarks/bench_metrics.py --iterations 20000
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import time
+import engine as app
+
+cases = [(role, "Python, SQL", level) for role in app.JOB_CATEGORIES for level in app.LEVEL_MODIFIERS]
+for case in cases:
+    app.generate_questions(*case, use_api=False)
+start = time.perf_counter()
+for i in range({iterations}):
+    role, skills, level = cases[i % len(cases)]
+    app.generate_questions(role, skills, level, use_api=False)
+    app.generate_followup_questions(role, skills, level, "behavioral", use_api=False)
+print((time.perf_counter() - start) / {iterations} * 1e6)
+"""
+
+
+def run(enabled: bool, iterations: int) -> float:
+    env = dict(os.environ, METRICS_ENABLED="1" if enabled else "0", GENERATION_BACKEND="fake")
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER.format(iterations=iterations)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics instrumentation overhead")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    disabled = min(run(False, args.iterations) for _ in range(args.repeat))
+    enabled = min(run(True, args.iterations) for _ in range(args.repeat))
+    print(f"{'metrics':>10} {'us/request':>11}")
+    print(f"{'disabled':>10} {disabled:>11.2f}")
+    print(f"{'enabled':>10} {enabled:>11.2f}  (+{(enabled / disabled - 1) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
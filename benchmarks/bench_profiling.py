@@ -0,0 +1,76 @@
+"""Cost of the slow-request profiler on requests that are not slow.
+
+Run from the repository root:
+
+    python benchmarks/bench_profiling.py [--requests 2000] [--concurrency 16] [--interval-ms 5] [--rounds 15]
+
+Sends the same UI generate requests (fake backend, no latency, so the
+engine's own CPU time dominates) through a plain handler and through one
+wrapped by profiling.profiled with the sampler running, and reports the
+mean CPU time per request and the difference. Every request is under the
+threshold, so no profile is kept. The two alternate for --rounds rounds and
+the median of the per-round differences is reported, which drift on a busy
+machine moves much less than either time.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ["GENERATION_BACKEND"] = "fake"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import profiling  # noqa: E402
+
+
+async def handler(role, skills, level):
+    async for text in engine.generate_questions_stream_async(role, skills, level):
+        pass
+    return text
+
+
+def run(fn, requests: int, concurrency: int) -> float:
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(serial):
+            async with semaphore:
+                await fn("Software Engineer", f"Python, SQL, skill {serial % 50}", "Senior")
+
+        await asyncio.gather(*(one(serial) for serial in range(requests)))
+
+    # CPU time of the whole process, sampler thread included, so other load on the machine doesn't count
+    start = time.process_time()
+    asyncio.run(main())
+    return (time.process_time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=15)
+    args = parser.parse_args()
+
+    profiling.ENABLED = True
+    profiling.PROFILER = profiling.SlowRequestProfiler(threshold=60.0, interval=args.interval_ms / 1000)
+    profiled = profiling.profiled("generate")(handler)
+
+    run(handler, args.requests, args.concurrency)  # warm the caches
+    # Alternate the two so drift on the machine affects both alike
+    plain, sampled = [], []
+    for _ in range(args.rounds):
+        plain.append(run(handler, args.requests, args.concurrency))
+        sampled.append(run(profiled, args.requests, args.concurrency))
+    overhead = statistics.median(b / a - 1 for a, b in zip(plain, sampled))
+    print(f"plain     {statistics.median(plain) * 1e6:>8.1f} µs CPU/request")
+    print(f"profiled  {statistics.median(sampled) * 1e6:>8.1f} µs CPU/request  ({overhead:+.1%}, "
+          f"{profiling.PROFILER.stats()['captured']} profiles kept)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Prompt size and build cost: the original f-string prompt against the prompt registry.
+
+Run from the repository root:
+
+    python benchmarks/bench_prompts.py [--number N]
+
+For every role and level, builds the question prompt the original way (an
+indented triple-quoted f-string rebuilt on each call) and through the
+registry's precompiled variants, and compares their token counts (see
+prompts.count_tokens) and per-call cost. The script exits non-zero if
+variant "a" differs from the original prompt other than in whitespace.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+os.environ.setdefault("GENERATION_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from prompts import count_tokens, minimize_whitespace  # noqa: E402
+from skills import parse_skills  # noqa: E402
+
+SKILLS = "Python, SQL, AWS, Docker"
+
+
+# Frozen copy of the original prompt builder, kept as the reference
+def legacy_build_question_prompt(role, skills, level, category_name):
+    level_info = engine.LEVEL_MODIFIERS.get(level, {})
+    ranked = parse_skills(skills, engine.JOB_CATEGORIES.get(role, "default")).ranked
+    return f"""
+            Generate 5 interview questions for a {role} position at {level} level.
+            Focus areas: {', '.join(level_info.get('focus', ['technical skills', 'problem-solving']))}
+            Required skills: {', '.join(ranked) or skills}
+            Experience level: {level_info.get('experience', 'relevant experience')}
+            Questions should test {level_info.get('depth', 'appropriate')} knowledge.
+            
+            Format each question clearly with a number.
+            Make questions specific to {category_name} role.
+            """
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="iterations per timing run")
+    args = parser.parse_args()
+
+    cases = [(role, category, level) for role, category in engine.JOB_CATEGORIES.items()
+             for level in engine.LEVEL_MODIFIERS]
+    mismatches = 0
+    totals = {"legacy": 0, "a": 0, "b": 0}
+    for role, category, level in cases:
+        legacy = legacy_build_question_prompt(role, SKILLS, level, engine.get_category_name(category))
+        ranked = ", ".join(parse_skills(SKILLS, category).ranked)
+        variants = {
+            variant: engine.prompt_registry.render("questions", category, level, variant, role=role, skills=ranked)
+            for variant in ("a", "b")
+        }
+        if variants["a"] != minimize_whitespace(legacy):
+            mismatches += 1
+            print(f"MISMATCH for {role} / {level}:\n{variants['a']!r}\n{minimize_whitespace(legacy)!r}")
+        totals["legacy"] += count_tokens(legacy)
+        for variant, prompt in variants.items():
+            totals[variant] += count_tokens(prompt)
+
+    print(f"{len(cases)} role/level combinations, {mismatches} mismatches")
+    for label, total in totals.items():
+        saved = f" ({1 - total / totals['legacy']:.0%} fewer)" if label != "legacy" else ""
+        print(f"{label:<8} {total / len(cases):6.1f} tokens/prompt{saved}")
+
+    def run_legacy():
+        for role, category, level in cases:
+            legacy_build_question_prompt(role, SKILLS, level, engine.get_category_name(category))
+
+    def run_registry():
+        for role, category, level in cases:
+            engine.build_question_prompt(role, SKILLS, level, category)
+
+    for label, run in (("legacy f-string", run_legacy), ("registry", run_registry)):
+        run()
+        per_call = min(timeit.repeat(run, number=args.number, repeat=5)) / (args.number * len(cases))
+        print(f"{label:<16}: {per_call * 1e6:7.2f} µs/prompt")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Compare the precompiled question bank against the original if/elif lookup.
+
+Run from the repository root:
+
+    python benchmarks/bench_question_bank.py [--number N]
+
+Every JOB_CATEGORIES x LEVEL_MODIFIERS pair is rendered by both paths with a
+few skill strings; the script exits non-zero if any output differs from the
+original given the skill that skills.parse_skills ranks first.
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import JOB_CATEGORIES, LEVEL_MODIFIERS, get_level_specific_questions  # noqa: E402
+from skills import parse_skills  # noqa: E402
+
+SKILL_INPUTS = ["Python, SQL, AWS", " , React ,TypeScript", "", "  ,  ", "k8s; py, excel"]
+
+
+# Frozen copy of the original implementation, kept as the reference
+def legacy_get_level_specific_questions(role: str, skills: str, level: str, category: str) -> List[str]:
+    """Generate level-specific questions for each category"""
+    skills_list = [s.strip() for s in skills.split(",") if s.strip()]
+    level_info = LEVEL_MODIFIERS.get(level, LEVEL_MODIFIERS["Mid-Level"])
+    
+    # Category-specific questions with level adjustments
+    if category in ["software_dev", "frontend", "backend", "mobile"]:
+        if level == "Entry/Junior":
+            return [
+                f"1. Explain the difference between {skills_list[0] if skills_list else 'object-oriented'} and procedural programming.",
+                f"2. Walk me through how you would debug a simple application issue.",
+                f"3. What version control system have you used and how do you write good commit messages?",
+                f"4. Explain basic data structures like arrays, lists, and when to use each.",
+                f"5. How do you approach learning a new programming language or framework?"
+            ]
+        elif level == "Mid-Level":
+            return [
+                f"1. Design a REST API for a {skills_list[0] if skills_list else 'typical'} application and explain your choices.",
+                f"2. How do you optimize application performance and handle scaling issues?",
+                f"3. Describe your experience with testing frameworks and writing maintainable tests.",
+                f"4. Explain how you would refactor legacy code while maintaining functionality.",
+                f"5. What design patterns have you implemented and what problems did they solve?"
+            ]
+        elif level == "Senior":
+            return [
+                f"1. Design a scalable microservices architecture for a high-traffic application.",
+                f"2. How do you establish coding standards and ensure code quality across teams?",
+                f"3. Describe your approach to mentoring junior developers and code reviews.",
+                f"4. How do you make technical decisions that balance business needs and technical debt?",
+                f"5. What's your strategy for leading a technical migration or major refactoring?"
+            ]
+        else:  # Lead/Principal
+            return [
+                f"1. Define technical vision and architecture roadmap for a complex product suite.",
+                f"2. How do you align engineering initiatives with business strategy and OKRs?",
+                f"3. Describe your approach to building and scaling high-performing engineering teams.",
+                f"4. How do you evaluate new technologies and make build vs. buy decisions?",
+                f"5. What metrics do you track to measure engineering productivity and system health?"
+            ]
+    
+    elif category in ["data_science", "ml_engineer", "ai_engineer"]:
+        if level == "Entry/Junior":
+            return [
+                f"1. Explain basic ML concepts like overfitting, underfitting, and cross-validation.",
+                f"2. How do you handle missing data in a dataset?",
+                f"3. Describe the difference between supervised and unsupervised learning.",
+                f"4. What libraries have you used for data analysis and visualization?",
+                f"5. Walk me through a simple linear regression model implementation."
+            ]
+        elif level == "Mid-Level":
+            return [
+                f"1. How do you select the right algorithm for a given business problem?",
+                f"2. Describe your process for feature engineering and selection.",
+                f"3. How do you evaluate model performance beyond accuracy (precision, recall, F1)?",
+                f"4. Explain techniques for handling imbalanced datasets.",
+                f"5. What's your experience with model deployment and monitoring?"
+            ]
+        elif level == "Senior":
+            return [
+                f"1. Design an end-to-end ML pipeline for a production system.",
+                f"2. How do you establish MLOps practices and model governance?",
+                f"3. Describe your approach to A/B testing and model experimentation.",
+                f"4. How do you mentor junior data scientists and establish best practices?",
+                f"5. What strategies do you use for model explainability and fairness?"
+            ]
+        else:  # Lead/Principal
+            return [
+                f"1. Define AI/ML strategy aligned with business objectives.",
+                f"2. How do you build and scale data science teams and capabilities?",
+                f"3. Design a data platform that supports ML at enterprise scale.",
+                f"4. How do you measure ROI and business impact of ML initiatives?",
+                f"5. What's your approach to ethical AI and responsible machine learning?"
+            ]
+    
+    elif category in ["cybersecurity", "pentesting", "soc"]:
+        if level == "Entry/Junior":
+            return [
+                f"1. Explain basic security concepts: CIA triad, defense in depth.",
+                f"2. What common vulnerabilities should every developer know about?",
+                f"3. How do you stay updated with security news and threats?",
+                f"4. Describe basic network security concepts (firewalls, VPNs).",
+                f"5. What tools have you used for vulnerability scanning?"
+            ]
+        elif level == "Mid-Level":
+            return [
+                f"1. How do you conduct a security assessment of a web application?",
+                f"2. Describe your experience with SIEM tools and log analysis.",
+                f"3. How do you handle a security incident from detection to resolution?",
+                f"4. Explain different types of encryption and when to use each.",
+                f"5. What's your approach to security monitoring and alerting?"
+            ]
+        elif level == "Senior":
+            return [
+                f"1. Design a comprehensive security program for an organization.",
+                f"2. How do you build and lead incident response teams?",
+                f"3. Describe your approach to security architecture and secure SDLC.",
+                f"4. How do you establish security metrics and report to executives?",
+                f"5. What's your strategy for third-party risk management?"
+            ]
+        else:  # Lead/Principal
+            return [
+                f"1. Develop enterprise-wide cybersecurity strategy and roadmap.",
+                f"2. How do you align security initiatives with business objectives?",
+                f"3. Design a security operations center (SOC) for a global organization.",
+                f"4. How do you manage security compliance across multiple regulations?",
+                f"5. What's your approach to security culture and awareness programs?"
+            ]
+    
+    elif category in ["devops", "cloud", "sre"]:
+        if level == "Entry/Junior":
+            return [
+                f"1. Explain basic concepts: containers, VMs, and their differences.",
+                f"2. What's your experience with basic Linux administration?",
+                f"3. How do you write a simple Dockerfile and docker-compose file?",
+                f"4. Describe basic CI/CD concepts and why they're important.",
+                f"5. What monitoring tools have you used?"
+            ]
+        elif level == "Mid-Level":
+            return [
+                f"1. Design a CI/CD pipeline for a microservices application.",
+                f"2. How do you implement Infrastructure as Code?",
+                f"3. Describe your experience with container orchestration.",
+                f"4. How do you ensure high availability and disaster recovery?",
+                f"5. What's your approach to monitoring and alerting?"
+            ]
+        elif level == "Senior":
+            return [
+                f"1. Design cloud architecture for a globally distributed application.",
+                f"2. How do you establish SLOs, SLIs, and error budgets?",
+                f"3. Describe your approach to cost optimization in cloud environments.",
+                f"4. How do you mentor junior engineers and establish DevOps practices?",
+                f"5. What's your strategy for platform engineering and internal tools?"
+            ]
+        else:  # Lead/Principal
+            return [
+                f"1. Define cloud and platform strategy for an enterprise.",
+                f"2. How do you build and scale platform engineering teams?",
+                f"3. Design a multi-cloud strategy with cost and performance optimization.",
+                f"4. How do you measure and improve developer productivity?",
+                f"5. What's your approach to platform reliability and incident management?"
+            ]
+    
+    elif category in ["database"]:
+        if level == "Entry/Junior":
+            return [
+                f"1. Explain basic SQL concepts: joins, indexes, transactions.",
+                f"2. How do you write efficient SELECT queries?",
+                f"3. What's the difference between SQL and NoSQL databases?",
+                f"4. How do you backup and restore a database?",
+                f"5. What tools have you used for database administration?"
+            ]
+        elif level == "Mid-Level":
+            return [
+                f"1. How do you optimize slow-running queries?",
+                f"2. Design a database schema for a typical e-commerce application.",
+                f"3. Describe your experience with database replication.",
+                f"4. How do you implement database security and access controls?",
+                f"5. What's your approach to database performance monitoring?"
+            ]
+        elif level == "Senior":
+            return [
+                f"1. Design database architecture for a high-traffic application.",
+                f"2. How do you plan and execute database migrations?",
+                f"3. Describe your approach to database capacity planning.",
+                f"4. How do you establish database standards and best practices?",
+                f"5. What's your strategy for data lifecycle management?"
+            ]
+        else:  # Lead/Principal
+            return [
+                f"1. Define data architecture strategy for an enterprise.",
+                f"2. How do you build and lead database engineering teams?",
+                f"3. Design a data platform supporting multiple business units.",
+                f"4. How do you align database strategy with business goals?",
+                f"5. What's your approach to data governance and quality?"
+            ]
+    
+    # Default questions for other categories
+    if level == "Entry/Junior":
+        return [
+            f"1. What attracts you to this {role} position?",
+            f"2. Describe your educational background and relevant coursework.",
+            f"3. What projects have you completed using {skills_list[0] if skills_list else 'relevant skills'}?",
+            f"4. How do you approach learning new technologies?",
+            f"5. Where do you see yourself in 3 years in this field?"
+        ]
+    elif level == "Mid-Level":
+        return [
+            f"1. Describe a challenging project where you used {skills_list[0] if skills_list else 'key skills'}.",
+            f"2. How do you collaborate with team members on technical projects?",
+            f"3. What's your process for troubleshooting complex issues?",
+            f"4. How do you stay current with industry trends?",
+            f"5. Describe a time you improved an existing process or system."
+        ]
+    elif level == "Senior":
+        return [
+            f"1. How do you mentor and develop junior team members?",
+            f"2. Describe a technical decision you made that significantly impacted the business.",
+            f"3. How do you balance technical debt with new feature development?",
+            f"4. What's your approach to architectural design and documentation?",
+            f"5. How do you handle conflicting priorities in technical projects?"
+        ]
+    else:  # Lead/Principal
+        return [
+            f"1. How do you develop and communicate technical vision?",
+            f"2. Describe your experience building and leading high-performing teams.",
+            f"3. How do you align technical strategy with business objectives?",
+            f"4. What's your approach to stakeholder management and communication?",
+            f"5. How do you drive innovation while maintaining system stability?"
+        ]
+
+
+def iter_cases():
+    for role, category in JOB_CATEGORIES.items():
+        for level in LEVEL_MODIFIERS:
+            for skills in SKILL_INPUTS:
+                yield role, skills, level, category
+
+
+def check_identical() -> int:
+    mismatches = 0
+    for role, skills, level, category in iter_cases():
+        # Templates now get the most relevant canonical skill rather than the first one typed,
+        # so the reference is given that skill alone
+        primary = parse_skills(skills, category).primary or ""
+        expected = legacy_get_level_specific_questions(role, primary, level, category)
+        actual = get_level_specific_questions(role, skills, level, category)
+        case = (role, skills, level, category)
+        if actual != expected or any(type(q) is not str for q in actual):
+            mismatches += 1
+            print(f"MISMATCH for {case!r}:\n  expected={expected!r}\n  actual={actual!r}")
+    return mismatches
+
+
+def time_path(func, cases, number: int) -> float:
+    def run():
+        for case in cases:
+            func(*case)
+    return min(timeit.repeat(run, number=number, repeat=5)) / (number * len(cases))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="iterations per timing run")
+    args = parser.parse_args()
+
+    cases = list(iter_cases())
+    mismatches = check_identical()
+    print(f"{len(cases)} cases checked, {mismatches} mismatches")
+
+    legacy = time_path(legacy_get_level_specific_questions, cases, args.number)
+    indexed = time_path(get_level_specific_questions, cases, args.number)
+    print(f"legacy  : {legacy * 1e9:8.0f} ns/call")
+    print(f"indexed : {indexed * 1e9:8.0f} ns/call")
+    print(f"speedup : {legacy / indexed:8.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Interactive latency behind a batch backlog, with and without priority queuing.
+
+Run from the repository root:
+
+    python benchmarks/bench_ratelimit.py [--rate 10] [--batch 120] [--interactive 20]
+
+A batch job floods the upstream rate limit, then UI requests arrive one at a
+time. With priorities the UI requests jump the queue; in FIFO mode they wait
+behind the backlog until their latency budget runs out and get the fallback.
+Uses the fake backend, so no network is involved.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GENERATION_BACKEND", "fake")
+os.environ.setdefault("FAKE_BACKEND_LATENCY", "0.2")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from backends import FakeBackend  # noqa: E402
+from ratelimit import BATCH, INTERACTIVE, UpstreamLimiter  # noqa: E402
+
+
+class FIFOLimiter(UpstreamLimiter):
+    """Same limiter serving calls strictly in arrival order"""
+
+    @staticmethod
+    def _sort_key(priority, deadline):
+        return (0, 0.0)
+
+
+def run(mode: str, rate: float, batch: int, interactive: int, budget: float):
+    limiter_class = UpstreamLimiter if mode == "priority" else FIFOLimiter
+    engine.upstream_limiter = limiter_class(rate, burst=1, budgets={INTERACTIVE: budget, BATCH: None})
+    results = {"interactive": [], "batch": []}
+    lock = threading.Lock()
+
+    def request(kind: str, index: int, priority: int):
+        start = time.perf_counter()
+        text = engine.generate_questions("Software Engineer", f"Python, {mode}-{kind}-{index}", "Mid-Level",
+                                         priority=priority)
+        from_model = any(question in text for question in FakeBackend.QUESTIONS)
+        with lock:
+            results[kind].append((time.perf_counter() - start, from_model))
+
+    # Rejections print "API Error: ..." lines; keep them out of the table
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=batch + interactive) as pool:
+        for i in range(batch):
+            pool.submit(request, "batch", i, BATCH)
+        time.sleep(0.5)
+        for i in range(interactive):
+            pool.submit(request, "interactive", i, INTERACTIVE)
+            time.sleep(1 / rate)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Priority queue vs FIFO for the upstream rate limit")
+    parser.add_argument("--rate", type=float, default=10.0, help="upstream calls per second")
+    parser.add_argument("--batch", type=int, default=120, help="batch rows queued up front")
+    parser.add_argument("--interactive", type=int, default=20, help="UI requests arriving behind them")
+    parser.add_argument("--budget", type=float, default=3.0, help="interactive latency budget (s)")
+    args = parser.parse_args()
+
+    print(f"rate {args.rate}/s, {args.batch} batch rows, {args.interactive} UI requests, budget {args.budget}s")
+    print(f"{'mode':>9} {'UI p50 ms':>10} {'UI max ms':>10} {'UI model':>9} {'batch done s':>13}")
+    for mode in ("fifo", "priority"):
+        results = run(mode, args.rate, args.batch, args.interactive, args.budget)
+        ui = sorted(latency for latency, _ in results["interactive"])
+        from_model = sum(model for _, model in results["interactive"])
+        batch_done = max(latency for latency, _ in results["batch"])
+        print(f"{mode:>9} {statistics.median(ui) * 1000:>10.0f} {ui[-1] * 1000:>10.0f} "
+              f"{from_model:>5}/{len(ui):<3} {batch_done:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
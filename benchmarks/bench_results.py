@@ -0,0 +1,101 @@
+"""Serialization throughput of QuestionPack results for large batches.
+
+Run from the repository root:
+
+    python benchmarks/bench_results.py [--packs 20000]
+
+Builds a batch of packs shaped like real answers (five model questions, or a
+rule-based pack with advice) and times each way of handing them to another
+system: the UI text rendering that consumers used to re-parse, JSON via the
+standard library and orjson, and MessagePack when msgpack is installed.
+Every encoding is decoded again and compared with the original packs.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("GENERATION_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import results  # noqa: E402
+from dedup import split_questions  # noqa: E402
+from results import QuestionPack  # noqa: E402
+
+
+def build_packs(count: int):
+    rng = random.Random(5)
+    roles = sorted(engine.JOB_CATEGORIES)
+    levels = list(engine.LEVEL_MODIFIERS)
+    packs = []
+    for _ in range(count):
+        role = rng.choice(roles)
+        category = engine.JOB_CATEGORIES[role]
+        level = rng.choice(levels)
+        timings = (("retrieval", rng.random() / 1000), ("model", rng.random() * 3), ("total", rng.random() * 3))
+        if rng.random() < 0.3:
+            pack = engine.fallback_question_pack(role, "Python, SQL", level, category, timings)
+        else:
+            questions = [f"Question {n} about {role} with Python and SQL at the {level} level, case {rng.random():.6f}?"
+                         for n in range(1, 6)]
+            pack = QuestionPack(role, category, engine.get_category_name(category), level, "Python, SQL",
+                                questions, None, "model", timings)
+        packs.append(pack)
+    return packs
+
+
+def text_roundtrip(packs):
+    # What consumers did before: render the UI text, then scrape the questions back out of it
+    encoded = [pack.text for pack in packs]
+    decoded = [split_questions(text.split("=" * 50 + "\n\n", 1)[-1].split("\n\n💡")[0]) for text in encoded]
+    return sum(len(text.encode("utf-8")) for text in encoded), decoded
+
+
+def measure(label: str, encode, decode, packs, check: bool = True):
+    start = time.perf_counter()
+    encoded = [encode(pack) for pack in packs]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    decoded = [decode(data) for data in encoded]
+    decode_s = time.perf_counter() - start
+    if check and decoded != packs:
+        raise SystemExit(f"{label}: round trip changed the packs")
+    size = sum(len(data) for data in encoded)
+    print(f"{label:<22} {len(packs) / encode_s:>12,.0f} {len(packs) / decode_s:>12,.0f} {size / len(packs):>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packs", type=int, default=20000)
+    args = parser.parse_args()
+
+    packs = build_packs(args.packs)
+    fresh = build_packs(args.packs)
+    print(f"{'encoding':<22} {'encode/s':>12} {'decode/s':>12} {'bytes':>10}")
+
+    # Rendering is lazy, so the first pass pays for building the text
+    start = time.perf_counter()
+    size, _ = text_roundtrip(fresh)
+    elapsed = time.perf_counter() - start
+    print(f"{'text render + scrape':<22} {len(fresh) / elapsed:>12,.0f} {'':>12} {size / len(fresh):>10.0f}")
+
+    measure("json (stdlib)",
+            lambda pack: json.dumps(pack.to_dict(), ensure_ascii=False).encode("utf-8"),
+            lambda data: QuestionPack.from_dict(json.loads(data)), packs)
+    if results.load_orjson() is not None:
+        measure("json (orjson)", QuestionPack.to_json, QuestionPack.from_json, packs)
+    else:
+        print("json (orjson)          skipped: pip install orjson")
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        print("msgpack                skipped: pip install msgpack")
+    else:
+        measure("msgpack", QuestionPack.to_msgpack, QuestionPack.from_msgpack, packs)
+
+
+if __name__ == "__main__":
+    main()
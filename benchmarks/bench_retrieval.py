@@ -0,0 +1,114 @@
+"""Question retrieval: search latency by corpus size and model calls saved.
+
+Run from the repository root:
+
+    python benchmarks/bench_retrieval.py [--requests 400] [--sizes 1000 10000 50000]
+
+Search latency is measured on synthetic corpora of skill-specific questions.
+The workload replays requests for random roles with overlapping skill sets
+against a fake backend whose answers mention the requested skills, once with
+only the response cache and once with retrieval enabled, and counts how many
+requests still needed the model.
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+os.environ.setdefault("GENERATION_BACKEND", "fake")
+os.environ["RETRIEVAL_ENABLED"] = "1"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from backends import FakeBackend  # noqa: E402
+from retrieval import QuestionIndex  # noqa: E402
+from skills import CATEGORY_SKILLS  # noqa: E402
+
+LEVELS = ("Entry/Junior", "Mid-Level", "Senior", "Lead/Principal")
+PATTERNS = (
+    "How have you used {skill} in a production system, and what went wrong?",
+    "What are the trade-offs of {skill} compared with the alternatives you considered?",
+    "How would you debug a performance problem in a {skill} deployment?",
+    "Describe how you would test and monitor a {skill} based service.",
+    "What {skill} best practices would you enforce on a new team?",
+    "Explain how {skill} handles failures and how you design around them.",
+    "How do you keep {skill} configuration secure and maintainable?",
+)
+
+
+class SkillAwareBackend(FakeBackend):
+    """Fake model whose questions mention the skills listed in the prompt"""
+
+    def _text(self, prompt: str) -> str:
+        match = re.search(r"Required skills: (.*)", prompt)
+        skills = [s.strip() for s in match.group(1).split(",")] if match else ["the stack"]
+        rng = random.Random(prompt)
+        lines = [rng.choice(PATTERNS).format(skill=rng.choice(skills)) for _ in range(5)]
+        return "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+
+
+def synthetic_corpus(size: int, rng: random.Random) -> QuestionIndex:
+    index = QuestionIndex()
+    index.add_bank()
+    skills = sorted({skill for group in CATEGORY_SKILLS.values() for skill in group})
+    categories = sorted(CATEGORY_SKILLS)
+    while len(index) < size:
+        text = f"{rng.choice(PATTERNS).format(skill=rng.choice(skills))} ({rng.randrange(10 ** 6)})"
+        index.add(text, rng.choice(LEVELS), (rng.choice(categories),), "model")
+    return index
+
+
+def search_latency(sizes, queries: int = 300):
+    rng = random.Random(1)
+    print(f"{'docs':>8} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for size in sizes:
+        start = time.perf_counter()
+        index = synthetic_corpus(size, rng)
+        build = time.perf_counter() - start
+        index.search("warm up")
+        timings = []
+        for _ in range(queries):
+            category = rng.choice(sorted(CATEGORY_SKILLS))
+            query = f"Engineer {' '.join(rng.sample(CATEGORY_SKILLS[category], 2))}"
+            start = time.perf_counter()
+            index.search(query, rng.choice(LEVELS), category, k=5)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{size:>8} {build:>8.2f} {statistics.median(timings) * 1000:>8.2f} "
+              f"{timings[int(len(timings) * 0.95)] * 1000:>8.2f}")
+
+
+def workload(requests: int, retrieval: bool) -> int:
+    rng = random.Random(2)
+    engine.generation_backend = backend = SkillAwareBackend()
+    engine.response_cache.clear()
+    engine.question_index = QuestionIndex()
+    engine.question_index.add_bank()
+    if not retrieval:
+        engine.question_index = None
+    roles = [(role, category) for role, category in engine.JOB_CATEGORIES.items() if category in CATEGORY_SKILLS]
+    for _ in range(requests):
+        role, category = rng.choice(roles)
+        skills = ", ".join(rng.sample(CATEGORY_SKILLS[category], min(3, len(CATEGORY_SKILLS[category]))))
+        engine.generate_questions(role, skills, rng.choice(LEVELS))
+    return backend.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    search_latency(args.sizes)
+    cache_only = workload(args.requests, retrieval=False)
+    with_retrieval = workload(args.requests, retrieval=True)
+    print(f"\n{args.requests} requests: {cache_only} model calls with the cache alone, "
+          f"{with_retrieval} with retrieval ({1 - with_retrieval / cache_only:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cost of parsing long, messy skills strings with skills.parse_skills.
+
+Run from the repository root:
+
+    python benchmarks/bench_skills.py [--number N] [--skills 40]
+
+Builds strings with mixed separators, stray whitespace, duplicates and
+aliases, then times the old ad-hoc split (which resolves nothing) against
+parse_skills with a cold and a warm cache. The script exits non-zero if an
+alias is left unresolved or a duplicate survives.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills import CATEGORY_SKILLS, SKILL_ALIASES, fold, parse_skills  # noqa: E402
+
+SEPARATORS = (",", ", ", " ,", ";", " | ", "\n", ",,  ")
+
+
+def messy_skills(rng: random.Random, count: int):
+    """A skills string with `count` entries and the canonical names it should resolve to"""
+    canonical = rng.sample(sorted(SKILL_ALIASES), count)
+    tokens = []
+    for name in canonical:
+        spelling = rng.choice((name,) + SKILL_ALIASES[name])
+        spelling = rng.choice((spelling, spelling.upper(), spelling.lower(), f"  {spelling}  "))
+        tokens.append(spelling)
+        if rng.random() < 0.2:
+            tokens.append(name.lower())  # duplicate under another spelling
+    text = tokens[0]
+    for token in tokens[1:]:
+        text += rng.choice(SEPARATORS) + token
+    return text, canonical
+
+
+def legacy_parse(skills: str):
+    skills_list = [s.strip() for s in skills.split(",")]
+    return skills_list[0] if skills_list else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="iterations per timing run")
+    parser.add_argument("--skills", type=int, default=40, help="entries per skills string")
+    parser.add_argument("--strings", type=int, default=50, help="distinct skills strings")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    categories = sorted(CATEGORY_SKILLS)
+    cases = []
+    for _ in range(args.strings):
+        text, canonical = messy_skills(rng, args.skills)
+        cases.append((text, rng.choice(categories), canonical))
+
+    errors = 0
+    for text, category, canonical in cases:
+        parsed = parse_skills(text, category)
+        if sorted(parsed.names, key=fold) != sorted(canonical, key=fold):
+            errors += 1
+            print(f"MISMATCH for {text!r}:\n  expected={sorted(canonical)!r}\n  actual={sorted(parsed.names)!r}")
+    print(f"{len(cases)} strings of {args.skills} skills ({sum(len(t) for t, _, _ in cases) // len(cases)} chars avg), "
+          f"{errors} mismatches")
+
+    def run_legacy():
+        for text, _, _ in cases:
+            legacy_parse(text)
+
+    def run_cold():
+        parse_skills.cache_clear()
+        for text, category, _ in cases:
+            parse_skills(text, category)
+
+    def run_warm():
+        for text, category, _ in cases:
+            parse_skills(text, category)
+
+    run_warm()
+    for label, run in (("legacy split (no aliases)", run_legacy), ("parse_skills, cold", run_cold),
+                       ("parse_skills, cached", run_warm)):
+        per_call = min(timeit.repeat(run, number=args.number, repeat=5)) / (args.number * len(cases))
+        print(f"{label:<26}: {per_call * 1e6:8.2f} µs/string")
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
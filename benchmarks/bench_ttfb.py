@@ -0,0 +1,83 @@
+"""Time-to-first-output for the streaming and non-streaming UI paths.
+
+Runs both paths against the local fake endpoint with a per-token delay and
+reports when the header appeared, when the first model text appeared and
+when the answer was complete.
+
+    python benchmarks/bench_ttfb.py --latency 0.3 --token-latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_server import FakeInferenceServer  # noqa: E402
+
+ROLES = ("Software Engineer", "Data Scientist", "DevOps Engineer", "Product Manager")
+
+
+async def time_blocking(app, role: str):
+    start = time.perf_counter()
+    await app.generate_questions_async(role, "Python, SQL", "Mid-Level")
+    elapsed = time.perf_counter() - start
+    # The textbox stays empty until the whole answer arrives
+    return elapsed, elapsed, elapsed
+
+
+async def time_streaming(app, role: str):
+    start = time.perf_counter()
+    header = first = None
+    async for text in app.generate_questions_stream_async(role, "Python, SQL", "Mid-Level"):
+        now = time.perf_counter() - start
+        if header is None:
+            header = now
+            header_length = len(text)
+        elif first is None and len(text) > header_length:
+            first = now
+    return header, first, time.perf_counter() - start
+
+
+async def run(app, rounds: int):
+    results = {"blocking": [], "streaming": []}
+    try:
+        for i in range(rounds):
+            for mode, timer in (("blocking", time_blocking), ("streaming", time_streaming)):
+                # A fresh cache each time, so every request reaches the endpoint
+                app.response_cache.clear()
+                results[mode].append(await timer(app, ROLES[i % len(ROLES)]))
+    finally:
+        await app.generation_backend.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming time-to-first-output benchmark")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake upstream time to first token (s)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="delay between tokens (s)")
+    parser.add_argument("--rounds", type=int, default=8)
+    args = parser.parse_args()
+
+    server = FakeInferenceServer(latency=args.latency, token_latency=args.token_latency).start()
+    os.environ["HF_API_URL"] = server.url
+    import engine as app
+
+    try:
+        results = asyncio.run(run(app, args.rounds))
+    finally:
+        server.stop()
+
+    print(f"upstream latency {args.latency:.3f}s, {args.token_latency * 1000:.0f}ms/token, {args.rounds} rounds")
+    print(f"{'path':>10} {'header ms':>10} {'first text ms':>14} {'complete ms':>12}")
+    for mode, samples in results.items():
+        header, first, total = (statistics.median(column) * 1000 for column in zip(*samples))
+        print(f"{mode:>10} {header:>10.1f} {first:>14.1f} {total:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
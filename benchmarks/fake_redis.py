@@ -0,0 +1,257 @@
+"""Minimal Redis-compatible server for local multi-worker testing.
+
+Speaks RESP2 and implements only the commands the shared store and cache
+use (strings with expiry, INCR, the sorted set used for LRU order, and
+EVAL of the store's own Lua scripts), so
+SHARED_STORE=redis://... can be exercised without installing Redis:
+
+    python benchmarks/fake_redis.py --port 6399
+    SHARED_STORE=redis://127.0.0.1:6399/0 python app.py serve --workers 4
+"""
+import argparse
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import REDIS_DELETE_IF, REDIS_INCR  # noqa: E402
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class CommandError(Exception):
+    pass
+
+
+class FakeRedisServer:
+    """In-memory Redis stand-in; one lock serializes commands as Redis does"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._strings = {}  # key -> (value, expires_at or None)
+        self._zsets = {}  # key -> {member: score}
+        self._lock = threading.Lock()
+        self.commands_seen = 0
+        self._tcp = _Server((host, port), self._handler())
+        self.host, self.port = self._tcp.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            disable_nagle_algorithm = True
+
+            def handle(self):
+                while True:
+                    try:
+                        args = self._read_command()
+                    except (ConnectionError, ValueError):
+                        return
+                    if args is None:
+                        return
+                    try:
+                        reply = server.execute(args)
+                    except CommandError as e:
+                        self.wfile.write(f"-ERR {e}\r\n".encode())
+                    else:
+                        self.wfile.write(_encode(reply))
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b"*"):
+                    return line.decode().split()
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(length + 2)[:-2].decode())
+                return args
+
+        return Handler
+
+    def _string(self, key: str):
+        entry = self._strings.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._strings[key]
+            return None
+        return entry
+
+    def execute(self, args):
+        name, args = args[0].upper(), args[1:]
+        with self._lock:
+            self.commands_seen += 1
+            handler = getattr(self, f"_cmd_{name.lower()}", None)
+            if handler is None:
+                raise CommandError(f"unknown command '{name}'")
+            return handler(*args)
+
+    def _cmd_ping(self, *args):
+        return ("+", "PONG")
+
+    def _cmd_client(self, *args):
+        return ("+", "OK")
+
+    def _cmd_select(self, db):
+        return ("+", "OK")
+
+    def _cmd_flushdb(self, *args):
+        self._strings.clear()
+        self._zsets.clear()
+        return ("+", "OK")
+
+    _cmd_flushall = _cmd_flushdb
+
+    def _cmd_get(self, key):
+        entry = self._string(key)
+        return entry[0] if entry is not None else None
+
+    def _cmd_set(self, key, value, *options):
+        options = [o.upper() for o in options]
+        expires_at = None
+        if "PX" in options:
+            expires_at = time.time() + int(options[options.index("PX") + 1]) / 1000
+        elif "EX" in options:
+            expires_at = time.time() + int(options[options.index("EX") + 1])
+        elif "PXAT" in options:
+            expires_at = int(options[options.index("PXAT") + 1]) / 1000
+        if "NX" in options and self._string(key) is not None:
+            return None
+        self._strings[key] = (value, expires_at)
+        return ("+", "OK")
+
+    def _cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += (self._string(key) is not None) + (self._zsets.pop(key, None) is not None)
+            self._strings.pop(key, None)
+        return removed
+
+    def _cmd_incr(self, key):
+        return self._cmd_incrby(key, "1")
+
+    def _cmd_incrby(self, key, amount):
+        entry = self._string(key)
+        value, expires_at = entry if entry is not None else ("0", None)
+        try:
+            value = int(value) + int(amount)
+        except ValueError:
+            raise CommandError("value is not an integer or out of range")
+        self._strings[key] = (str(value), expires_at)
+        return value
+
+    def _cmd_pexpire(self, key, ms):
+        entry = self._string(key)
+        if entry is None:
+            return 0
+        self._strings[key] = (entry[0], time.time() + int(ms) / 1000)
+        return 1
+
+    def _cmd_eval(self, script, numkeys, *args):
+        # No Lua here: the store's scripts are recognised by their text and run in Python
+        handler = self._SCRIPTS.get(script)
+        if handler is None:
+            raise CommandError("only the store's own scripts can be evaluated")
+        numkeys = int(numkeys)
+        return handler(self, list(args[:numkeys]), list(args[numkeys:]))
+
+    def _script_delete_if(self, keys, argv):
+        entry = self._string(keys[0])
+        if entry is None or entry[0] != argv[0]:
+            return 0
+        return self._cmd_del(keys[0])
+
+    def _script_incr(self, keys, argv):
+        value = self._cmd_incr(keys[0])
+        if value == 1 and argv[0]:
+            self._cmd_pexpire(keys[0], argv[0])
+        return value
+
+    _SCRIPTS = {REDIS_DELETE_IF: _script_delete_if, REDIS_INCR: _script_incr}
+
+    def _cmd_zadd(self, key, *pairs):
+        zset = self._zsets.setdefault(key, {})
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def _cmd_zrem(self, key, *members):
+        zset = self._zsets.get(key, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    def _cmd_zcard(self, key):
+        return len(self._zsets.get(key, {}))
+
+    def _cmd_zpopmin(self, key, count="1"):
+        zset = self._zsets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: (item[1], item[0]))[:int(count)]
+        reply = []
+        for member, score in popped:
+            del zset[member]
+            reply.extend([member, repr(score)])
+        return reply
+
+    def _cmd_zrange(self, key, start, stop):
+        members = [m for m, _ in sorted(self._zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))]
+        stop = int(stop)
+        return members[int(start):None if stop == -1 else stop + 1]
+
+    def start(self) -> "FakeRedisServer":
+        self._thread = threading.Thread(target=self._tcp.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._tcp.shutdown()
+        self._tcp.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, tuple):
+        return f"{reply[0]}{reply[1]}\r\n".encode()
+    if isinstance(reply, int):
+        return f":{reply}\r\n".encode()
+    if isinstance(reply, list):
+        return f"*{len(reply)}\r\n".encode() + b"".join(_encode(item) for item in reply)
+    data = str(reply).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal Redis-compatible server for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Fake Redis listening on {server.url}")
+    try:
+        server._tcp.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._tcp.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Local stand-in for the Hugging Face Inference API.
+
+Used by the benchmarks and for exercising the inference client without
+network access. Run standalone and point the app at it with HF_API_URL:
+
+    python benchmarks/fake_server.py --port 8008 --latency 0.2 --loading 2
+    HF_API_URL=http://127.0.0.1:8008/models/fake python app.py
+
+Requests with "stream": true are answered as server-sent events, one token
+per event, in the text-generation-inference format. Faults can be injected
+at random: a share of requests answered with 500 (--error-rate) or with a
+503 "loading" response (--unavailable-rate), jitter added to the latency, and
+a share of slow responses that take --tail-latency longer (--tail-rate).
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TEXT = (
+    "1. Describe a project where you used these skills.\n"
+    "2. How do you debug a production issue?\n"
+    "3. Explain a trade-off you made recently.\n"
+    "4. How do you keep your skills current?\n"
+    "5. How do you review a teammate's code?"
+)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections when many clients connect at once
+    request_queue_size = 1024
+
+
+class FakeInferenceServer:
+    """Threaded HTTP server that mimics the Inference API text-generation route"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 loading_responses: int = 0, estimated_time: float = 0.05,
+                 status: int = 200, text: str = DEFAULT_TEXT, token_latency: float = 0.0,
+                 error_rate: float = 0.0, unavailable_rate: float = 0.0, jitter: float = 0.0, seed: int = 0,
+                 tail_rate: float = 0.0, tail_latency: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.unavailable_rate = unavailable_rate
+        self._random = random.Random(seed)
+        self.token_latency = token_latency
+        self.loading_responses = loading_responses
+        self.estimated_time = estimated_time
+        self.status = status
+        self.text = text
+        self.requests_seen = 0
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/models/fake"
+
+    def _next_response(self, payload):
+        with self._lock:
+            self.requests_seen += 1
+            if self.loading_responses > 0:
+                self.loading_responses -= 1
+                return 503, {"error": "Model fake is currently loading",
+                             "estimated_time": self.estimated_time}
+            draw = self._random.random()
+        if draw < self.error_rate:
+            return 500, {"error": "Injected internal error"}
+        if draw < self.error_rate + self.unavailable_rate:
+            return 503, {"error": "Model fake is currently loading", "estimated_time": self.estimated_time}
+        if self.status != 200:
+            return self.status, {"error": f"Injected status {self.status}"}
+        return 200, [{"generated_text": self.text}]
+
+    def sample_latency(self) -> float:
+        """Base latency plus uniform jitter of up to ±jitter seconds, plus tail_latency for a tail_rate share"""
+        if not self.jitter and not self.tail_rate:
+            return self.latency
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            if self._random.random() < self.tail_rate:
+                delay += self.tail_latency
+            return delay
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Avoid delayed-ACK stalls between the header and body writes
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                delay = server.sample_latency()
+                if delay:
+                    time.sleep(delay)
+                status, body = server._next_response(payload)
+                if status == 200 and payload.get("stream"):
+                    self._stream_tokens(body[0]["generated_text"])
+                    return
+                if status == 200 and server.token_latency:
+                    # A non-streamed answer still takes as long as generating every token
+                    tokens = len(re.findall(r"\S+\s*", body[0]["generated_text"]))
+                    time.sleep(server.token_latency * max(tokens - 1, 0))
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on the request, e.g. a hedged duplicate that lost the race
+                    self.close_connection = True
+
+            def _stream_tokens(self, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for i, token in enumerate(re.findall(r"\S+\s*", text)):
+                        if i and server.token_latency:
+                            time.sleep(server.token_latency)
+                        event = {"token": {"id": i, "text": token, "special": False}, "generated_text": None}
+                        self.wfile.write(f"data:{json.dumps(event)}\n\n".encode())
+                    final = {"token": {"id": -1, "text": "</s>", "special": True}, "generated_text": text}
+                    self.wfile.write(f"data:{json.dumps(final)}\n\n".encode())
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading the stream early
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeInferenceServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Hugging Face Inference API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--loading", type=int, default=0, help="number of initial 503 'loading' responses")
+    parser.add_argument("--status", type=int, default=200, help="status code returned after loading")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random ± seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--unavailable-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="share of requests that are slow")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="seconds added to slow requests")
+    args = parser.parse_args()
+
+    server = FakeInferenceServer(args.host, args.port, args.latency, args.loading, status=args.status,
+                                 token_latency=args.token_latency, error_rate=args.error_rate,
+                                 unavailable_rate=args.unavailable_rate, jitter=args.jitter,
+                                 tail_rate=args.tail_rate, tail_latency=args.tail_latency)
+    print(f"Serving fake inference API at {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
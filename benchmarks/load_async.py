@@ -0,0 +1,90 @@
+"""Load test for the async generation path against the local fake endpoint.
+
+Simulates N concurrent users each issuing a series of generate requests and
+reports throughput for the async handler and, for comparison, for the sync
+handler on a fixed-size thread pool (Gradio's default of 40 workers).
+
+    python benchmarks/load_async.py --latency 0.2 --users 1 8 32 128
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_server import FakeInferenceServer  # noqa: E402
+
+_serial = itertools.count()
+
+
+def request():
+    # A fresh skill per request keeps every cache key distinct, so each call reaches the upstream
+    return "Software Engineer", f"Python, SQL, Load Skill {next(_serial)}", "Mid-Level"
+
+
+async def run_async_users(app, users: int, requests_per_user: int) -> float:
+    async def user():
+        for _ in range(requests_per_user):
+            await app.generate_questions_async(*request())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return time.perf_counter() - start
+
+
+async def run_async_levels(app, levels, requests_per_user: int):
+    # Warm up the client so connection setup isn't charged to the first level
+    await app.generate_questions_async(*request())
+    try:
+        return [await run_async_users(app, users, requests_per_user) for users in levels]
+    finally:
+        await app.generation_backend.aclose()
+
+
+def run_thread_users(app, users: int, requests_per_user: int, workers: int) -> float:
+    def user(_):
+        for _ in range(requests_per_user):
+            app.generate_questions(*request())
+
+    # Users beyond the pool size queue for a worker, as they do in Gradio's thread pool
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(user, range(users)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async generation load test")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake upstream latency (s)")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=5, help="requests per user")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="HF_MAX_CONCURRENCY")
+    parser.add_argument("--threads", type=int, default=40, help="thread pool size for the sync path")
+    args = parser.parse_args()
+
+    server = FakeInferenceServer(latency=args.latency).start()
+    os.environ["HF_API_URL"] = server.url
+    os.environ["HF_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    os.environ["HF_POOL_SIZE"] = str(args.threads)
+    import engine as app
+
+    print(f"upstream latency {args.latency:.3f}s, {args.requests} requests/user")
+    print(f"{'users':>6} {'async req/s':>12} {'sync req/s':>12}")
+    try:
+        async_results = asyncio.run(run_async_levels(app, args.users, args.requests))
+        for users, async_elapsed in zip(args.users, async_results):
+            total = users * args.requests
+            sync_elapsed = run_thread_users(app, users, args.requests, args.threads)
+            print(f"{users:>6} {total / async_elapsed:>12.1f} {total / sync_elapsed:>12.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
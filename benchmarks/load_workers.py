@@ -0,0 +1,156 @@
+"""Throughput of `python app.py serve` as worker processes are added.
+
+Starts the fake inference endpoint (and optionally the fake Redis server),
+then for each worker count launches the server, drives the JSON API with
+concurrent clients and reports requests/s and latency. Every request has
+distinct skills so each one reaches the endpoint; --repeat-ratio mixes in
+repeats that the shared cache should answer in any worker.
+
+    python benchmarks/load_workers.py --workers 1 2 4 --store sqlite
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_redis import FakeRedisServer  # noqa: E402
+from fake_server import FakeInferenceServer  # noqa: E402
+
+ROLES = ("Software Engineer", "Data Scientist", "DevOps Engineer", "Frontend Developer")
+LEVELS = ("Entry/Junior", "Mid-Level", "Senior", "Lead/Principal")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, env) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "app.py", "serve", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process
+
+
+async def wait_ready(session, base: str, workers: int, timeout: float = 120.0):
+    import aiohttp
+
+    # Ready once every worker has answered a health check
+    deadline = time.monotonic() + timeout
+    pids = set()
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{base}/healthz") as response:
+                pids.add((await response.json())["pid"])
+            if len(pids) >= workers:
+                return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    if not pids:
+        raise RuntimeError("server did not start")
+
+
+async def drive(base: str, workers: int, concurrency: int, requests: int, repeat_ratio: float):
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=concurrency, force_close=True)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_ready(session, base, workers)
+        latencies = []
+        failures = 0
+        issued = 0
+        seen = []
+
+        async def client():
+            nonlocal issued, failures
+            while issued < requests:
+                issued += 1
+                if seen and random.random() < repeat_ratio:
+                    payload = random.choice(seen)
+                else:
+                    payload = {
+                        "role": random.choice(ROLES),
+                        "skills": f"Python, skill-{issued}-{random.random():.6f}",
+                        "level": random.choice(LEVELS),
+                    }
+                    seen.append(payload)
+                start = time.perf_counter()
+                try:
+                    async with session.post(f"{base}/v1/questions", json=payload) as response:
+                        await response.read()
+                        if response.status != 200:
+                            failures += 1
+                except aiohttp.ClientError:
+                    failures += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker serving load test")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--store", choices=["memory", "sqlite", "redis"], default="sqlite",
+                        help="SHARED_STORE backend; redis uses benchmarks/fake_redis.py")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency (s)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="share of requests repeating earlier ones")
+    args = parser.parse_args()
+
+    upstream = FakeInferenceServer(latency=args.latency).start()
+    redis = FakeRedisServer().start() if args.store == "redis" else None
+    tmpdir = tempfile.TemporaryDirectory()
+    print(f"{os.cpu_count()} CPU(s), store={args.store}, upstream latency {args.latency:.3f}s, "
+          f"{args.concurrency} concurrent clients, {args.requests} requests")
+    print(f"{'workers':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'failed':>7} {'upstream':>9}")
+    try:
+        for workers in args.workers:
+            if args.store == "sqlite":
+                store = f"sqlite:///{os.path.join(tmpdir.name, f'store-{workers}.db')}"
+            elif args.store == "redis":
+                redis._cmd_flushdb()
+                store = redis.url
+            else:
+                store = "memory://"
+            env = dict(os.environ, HF_API_URL=upstream.url, SHARED_STORE=store, HF_MAX_CONCURRENCY="256",
+                       GENERATION_BACKEND="http")
+            port = free_port()
+            seen_before = upstream.requests_seen
+            process = start_server(workers, port, env)
+            try:
+                elapsed, latencies, failures = asyncio.run(
+                    drive(f"http://127.0.0.1:{port}", workers, args.concurrency, args.requests, args.repeat_ratio)
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+            print(f"{workers:>8} {len(latencies) / elapsed:>9.1f} {p50:>8.1f} {p95:>8.1f} {failures:>7} "
+                  f"{upstream.requests_seen - seen_before:>9}")
+    finally:
+        upstream.stop()
+        if redis is not None:
+            redis.stop()
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
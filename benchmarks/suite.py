@@ -0,0 +1,260 @@
+"""End-to-end benchmark suite against the local fake inference server.
+
+Run from the repository root:
+
+    python benchmarks/suite.py [--concurrency 1 8 32] [--requests 200] [--latency 0.05]
+                               [--error-rate 0.02] [--unavailable-rate 0.02] [--output results.json]
+    python benchmarks/suite.py --compare before.json after.json
+
+Each scenario runs at every concurrency level, with every request distinct so
+the response cache never answers it:
+
+    generate        engine.generate_questions, the UI's main button
+    generate_async  engine.generate_questions_async, the JSON API
+    followup_*      the four follow-up buttons
+    fallback        generate_questions with use_api=False
+    batch           batch.run_batch with that many workers
+
+Latency percentiles (p50/p95/p99), throughput and the share of answers that
+came from the rule-based fallback are printed and written as JSON (by
+default to benchmarks/results/<commit>.json) together with the commit and
+settings, so runs can be compared with --compare.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_server import FakeInferenceServer  # noqa: E402
+
+FOLLOWUP_TYPES = ("behavioral", "technical_depth", "scenario", "leadership")
+LEVELS = ("Entry/Junior", "Mid-Level", "Senior", "Lead/Principal")
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def summarize(latencies, elapsed: float, fallbacks: int) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "fallback_rate": round(fallbacks / len(latencies), 4) if latencies else 0.0,
+    }
+
+
+class Suite:
+    def __init__(self, engine, metrics, requests: int):
+        self.engine = engine
+        self.metrics = metrics
+        self.requests = requests
+        self._serial = 0
+
+    def _request(self):
+        # A fresh skill per request keeps every cache key distinct
+        self._serial += 1
+        role = ("Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer")[self._serial % 4]
+        return role, f"Python, SQL, Benchmark Skill {self._serial}", LEVELS[self._serial % len(LEVELS)]
+
+    def _fallbacks(self, kind: str) -> float:
+        return self.metrics.ANSWERS.value(kind, "fallback")
+
+    def _reset(self):
+        # Each scenario starts with a closed circuit breaker, whatever the last one left behind
+        breaker = getattr(self.engine.generation_backend, "breaker", None)
+        if breaker is not None:
+            breaker.record_success()
+
+    def run_threads(self, kind: str, call, concurrency: int) -> dict:
+        self._reset()
+        requests = [self._request() for _ in range(self.requests)]
+        latencies = []
+
+        def timed(request):
+            start = time.perf_counter()
+            call(*request)
+            latencies.append(time.perf_counter() - start)
+
+        before = self._fallbacks(kind)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(timed, requests))
+        return summarize(latencies, time.perf_counter() - start, self._fallbacks(kind) - before)
+
+    def run_async(self, concurrency: int) -> dict:
+        self._reset()
+        requests = [self._request() for _ in range(self.requests)]
+        latencies = []
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def timed(request):
+                async with semaphore:
+                    start = time.perf_counter()
+                    await self.engine.generate_questions_async(*request)
+                    latencies.append(time.perf_counter() - start)
+
+            try:
+                await asyncio.gather(*(timed(request) for request in requests))
+            finally:
+                await self.engine.generation_backend.aclose()
+
+        before = self._fallbacks("questions")
+        start = time.perf_counter()
+        asyncio.run(run())
+        return summarize(latencies, time.perf_counter() - start, self._fallbacks("questions") - before)
+
+    def run_batch(self, concurrency: int) -> dict:
+        import batch
+
+        self._reset()
+        rows = [dict(zip(("role", "skills", "level"), self._request())) for _ in range(self.requests)]
+        latencies = []
+
+        def generate(*args):
+            start = time.perf_counter()
+            try:
+                return self.engine.generate_questions(*args)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        before = self._fallbacks("questions")
+        start = time.perf_counter()
+        batch.run_batch(iter(rows), io.StringIO(), generate, workers=concurrency)
+        return summarize(latencies, time.perf_counter() - start, self._fallbacks("questions") - before)
+
+    def scenarios(self):
+        engine = self.engine
+        yield "generate", lambda c: self.run_threads("questions", engine.generate_questions, c)
+        yield "generate_async", self.run_async
+        for question_type in FOLLOWUP_TYPES:
+            yield f"followup_{question_type}", lambda c, t=question_type: self.run_threads(
+                "followup", lambda role, skills, level: engine.generate_followup_questions(role, skills, level, t), c
+            )
+        yield "fallback", lambda c: self.run_threads(
+            "questions", lambda role, skills, level: engine.generate_questions(role, skills, level, use_api=False), c
+        )
+        yield "batch", self.run_batch
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+HEADER = f"{'scenario':<26} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fallback':>9}"
+
+
+def format_row(row) -> str:
+    return (f"{row['scenario']:<26} {row['concurrency']:>5} {row['throughput']:>9.1f} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['fallback_rate']:>9.1%}")
+
+
+def compare(before_path: str, after_path: str) -> int:
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+    old = {(row["scenario"], row["concurrency"]): row for row in before["results"]}
+    print(f"{before['commit']} -> {after['commit']}")
+    print(f"{'scenario':<26} {'conc':>5} {'req/s':>16} {'p95 ms':>18} {'p99 ms':>18}")
+    for row in after["results"]:
+        base = old.get((row["scenario"], row["concurrency"]))
+        if base is None:
+            continue
+
+        def change(field):
+            delta = (row[field] / base[field] - 1) if base[field] else 0.0
+            return f"{row[field]:>9.1f} ({delta:+.0%})"
+
+        print(f"{row['scenario']:<26} {row['concurrency']:>5} {change('throughput'):>16} "
+              f"{change('p95_ms'):>18} {change('p99_ms'):>18}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and concurrency level")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="random ± seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream calls answered with 500")
+    parser.add_argument("--unavailable-rate", type=float, default=0.0, help="share answered with 503")
+    parser.add_argument("--scenarios", nargs="+", help="only these scenarios")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two results files")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare))
+
+    server = FakeInferenceServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        unavailable_rate=args.unavailable_rate, estimated_time=0.01,
+    ).start()
+    os.environ["HF_API_URL"] = server.url
+    os.environ["GENERATION_BACKEND"] = "http"
+    os.environ["METRICS_ENABLED"] = "1"
+    os.environ.setdefault("HF_MAX_CONCURRENCY", str(max(args.concurrency)))
+    os.environ.setdefault("HF_POOL_SIZE", str(max(args.concurrency)))
+    import engine
+    import metrics
+
+    suite = Suite(engine, metrics, args.requests)
+    results = []
+    print(HEADER)
+    try:
+        for name, run in suite.scenarios():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            for concurrency in args.concurrency:
+                # Request output ("API Error: ...") would drown the table
+                with open(os.devnull, "w") as devnull:
+                    stdout, sys.stdout = sys.stdout, devnull
+                    try:
+                        row = {"scenario": name, "concurrency": concurrency, **run(concurrency)}
+                    finally:
+                        sys.stdout = stdout
+                results.append(row)
+                print(format_row(row), flush=True)
+    finally:
+        server.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    path = args.output or os.path.join(ROOT, "benchmarks", "results", f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
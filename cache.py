@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from skills import parse_skills
+from store import RedisStore, SQLiteStore
+
+
+def normalize_skills(skills: str) -> tuple:
+    """Canonical, lowercased, deduplicated and sorted skills, so "py, k8s" and "Kubernetes,Python" match"""
+    return parse_skills(skills).key
+
+
+def make_cache_key(role: str, skills: str, level: str, parameters: Optional[Dict[str, Any]] = None, **extra) -> str:
+    """Build a canonical cache key for a generation request"""
+    canonical = {
+        "role": role.strip(),
+        "skills": normalize_skills(skills),
+        "level": level,
+        "parameters": parameters or {},
+    }
+    canonical.update(extra)
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Hit, miss, eviction and expiration counters"""
+
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MemoryBackend:
+    """In-process LRU storage kept in insertion/access order"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, key: str):
+        """Like get(), but leaves the access order alone"""
+        return self._entries.get(key)
+
+    def set(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def pop_oldest(self):
+        self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """On-disk LRU storage that survives restarts and can be shared by worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+
+    def get(self, key: str):
+        row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def peek(self, key: str):
+        return self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+
+    def set(self, key: str, value: str, expires_at: float):
+        self._conn.execute(
+            "INSERT INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+            "last_access = excluded.last_access",
+            (key, value, expires_at, time.time()),
+        )
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def pop_oldest(self):
+        self._conn.execute(
+            "DELETE FROM cache WHERE key = (SELECT key FROM cache ORDER BY last_access LIMIT 1)"
+        )
+
+    def clear(self):
+        self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        # Counted in the database, since other worker processes insert and evict too
+        return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class RedisBackend:
+    """LRU storage in Redis shared by every worker; access order is kept in a sorted set"""
+
+    def __init__(self, client, prefix: str = "cache:"):
+        self.client = client
+        self.prefix = prefix
+        self.order_key = prefix + "lru"
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        self.client.zadd(self.order_key, {key: time.time()})
+        value, expires_at = json.loads(raw)
+        return value, expires_at
+
+    def peek(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        value, expires_at = json.loads(raw)
+        return value, expires_at
+
+    def set(self, key: str, value: str, expires_at: float):
+        pipe = self.client.pipeline(transaction=False)
+        # Redis drops the entry itself once it expires; the LRU order entry goes on eviction
+        pipe.set(self.prefix + key, json.dumps([value, expires_at]), pxat=int(expires_at * 1000))
+        pipe.zadd(self.order_key, {key: time.time()})
+        pipe.execute()
+
+    def delete(self, key: str):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(self.prefix + key)
+        pipe.zrem(self.order_key, key)
+        pipe.execute()
+
+    def pop_oldest(self):
+        popped = self.client.zpopmin(self.order_key)
+        if popped:
+            self.client.delete(self.prefix + popped[0][0])
+
+    def clear(self):
+        keys = self.client.zrange(self.order_key, 0, -1)
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+        self.client.delete(self.order_key)
+
+    def __len__(self) -> int:
+        return self.client.zcard(self.order_key)
+
+
+class ResponseCache:
+    """Size-bounded LRU cache with a per-entry TTL for generated text"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, backend=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, store=None) -> "ResponseCache":
+        """Build a cache from CACHE_* environment variables
+
+        Without CACHE_PATH, a shared store (see store.py) also holds the cache,
+        so every worker process sees the same entries.
+        """
+        path = os.environ.get("CACHE_PATH")
+        if path:
+            backend = SQLiteBackend(path)
+        elif isinstance(store, SQLiteStore):
+            backend = SQLiteBackend(store.path)
+        elif isinstance(store, RedisStore):
+            backend = RedisBackend(store.client)
+        else:
+            backend = None
+        return cls(
+            max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", 1024)),
+            ttl=float(os.environ.get("CACHE_TTL", 3600)),
+            backend=backend,
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self.backend.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                self.backend.delete(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            return value
+
+    def peek(self, key: str) -> Optional[str]:
+        """Like get(), but without counting a hit or miss or refreshing the LRU order; for polling"""
+        with self._lock:
+            entry = self.backend.peek(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Expiry time of a live entry, or None; doesn't count a hit or miss or refresh the LRU order"""
+        with self._lock:
+            entry = self.backend.peek(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self.backend.set(key, value, expires_at)
+            while len(self.backend) > self.max_entries:
+                self.backend.pop_oldest()
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.backend.clear()
+
+    def __len__(self) -> int:
+        return len(self.backend)
@@ -0,0 +1,225 @@
+import functools
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from skills import SKILL_ALIASES
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from have how i in is it its of on or that the their them this "
+    "to was what when where which while who why will with would you your describe explain walk me through".split()
+)
+_WORD = re.compile(r"[a-z0-9+#]+")
+_NUMBERING = re.compile(r"^\s*(?:\d+\s*[.):-]|[-*•])\s*")
+# Run-on model output puts several questions on one line
+_QUESTION_END = re.compile(r"(?<=\?)\s+(?=\S)")
+
+# MinHash permutations: a universal hash family with a fixed seed, so signatures
+# agree between indexes and processes
+NUM_PERM = 48
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(NUM_PERM)
+_PERMUTATIONS = tuple((_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM))
+del _rng
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words without stopwords"""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def strip_numbering(line: str) -> str:
+    """A question without its leading "1." or bullet"""
+    return _NUMBERING.sub("", line).strip()
+
+
+def _split_line(line: str) -> List[str]:
+    return [part.strip() for part in _QUESTION_END.split(line) if part.strip()]
+
+
+def list_items(text: str) -> List[str]:
+    """The numbered or bulleted lines of model output, without their markers and split after each "?"
+
+    Preamble and closing chatter are not numbered, so they are left out.
+    """
+    return [part for line in text.splitlines() if _NUMBERING.match(line) for part in _split_line(strip_numbering(line))]
+
+
+def split_questions(text: str) -> List[str]:
+    """Split model output into questions: its numbered or bulleted lines if it has any, else every line"""
+    return list_items(text) or [part for line in text.splitlines() for part in _split_line(line)]
+
+
+def _stem(word: str) -> str:
+    # Just enough stemming for paraphrases: plurals and British spellings
+    if len(word) > 4 and word.endswith("ise"):
+        word = word[:-3] + "ize"
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word
+
+
+@functools.lru_cache(maxsize=65536)
+def _feature_hashes(feature: str) -> Tuple[int, ...]:
+    # Questions share most of their words, so each word is hashed NUM_PERM ways only once
+    h = zlib.crc32(feature.encode("utf-8"))
+    return tuple(((a * h + b) % _PRIME) & _MAX_HASH for a, b in _PERMUTATIONS)
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Stemmed content words of a question; word order is ignored so reordered paraphrases match"""
+    return frozenset(_stem(word) for word in tokenize(text))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    # Nothing to compare (e.g. a line of stopwords) is never a duplicate
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# Words of skill names and one-word aliases: questions that differ in one of these ask about different technologies
+TOPIC_WORDS = frozenset(
+    [_stem(word) for canonical in SKILL_ALIASES for word in tokenize(canonical)]
+    + [_stem(words[0]) for aliases in SKILL_ALIASES.values() for words in map(tokenize, aliases) if len(words) == 1]
+)
+
+
+def same_question(a: FrozenSet[str], b: FrozenSet[str], threshold: float) -> bool:
+    """True if two shingle sets are near-duplicates: similar enough and about the same skills"""
+    return jaccard(a, b) >= threshold and not (a ^ b) & TOPIC_WORDS
+
+
+class DedupIndex:
+    """MinHash/LSH index for finding near-duplicate questions in sublinear time
+
+    A question's MinHash signature is cut into ``bands`` bands; questions that
+    agree on any whole band become candidates, and a candidate is a duplicate
+    if the Jaccard similarity of their shingles reaches ``threshold`` and both
+    name the same skills (see same_question). With the defaults (16 bands
+    of 3 rows) pairs at 0.7 similarity become candidates 99.9% of the time.
+    With a ``capacity``, only the most recently added questions are kept.
+    """
+
+    def __init__(self, threshold: float = 0.7, bands: int = 16, capacity: Optional[int] = None):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.capacity = capacity
+        self._buckets: List[Dict[tuple, List[int]]] = [{} for _ in range(bands)]
+        # doc id -> (question, shingles, band keys), oldest first
+        self._docs: "OrderedDict[int, Tuple[str, FrozenSet[str], list]]" = OrderedDict()
+        self._next_id = 0
+        self.checked = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(features: FrozenSet[str]) -> List[int]:
+        if not features:
+            return [0] * NUM_PERM
+        return [min(column) for column in zip(*map(_feature_hashes, features))]
+
+    def _band_keys(self, signature: List[int]):
+        rows = self.rows
+        return [tuple(signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def _find(self, features: FrozenSet[str], keys) -> Optional[int]:
+        if not features:
+            return None
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for doc_id in candidates:
+            if same_question(features, self._docs[doc_id][1], self.threshold):
+                return doc_id
+        return None
+
+    def find(self, question: str) -> Optional[str]:
+        """An indexed question near-identical to this one, or None"""
+        features = shingles(question)
+        keys = self._band_keys(self._signature(features))
+        with self._lock:
+            doc_id = self._find(features, keys)
+            return self._docs[doc_id][0] if doc_id is not None else None
+
+    def add_if_new(self, question: str) -> bool:
+        """Index the question unless it near-duplicates one already indexed; True if it was new"""
+        features = shingles(question)
+        keys = self._band_keys(self._signature(features))
+        with self._lock:
+            self.checked += 1
+            if self._find(features, keys) is not None:
+                self.duplicates += 1
+                return False
+            doc_id = self._next_id
+            self._next_id += 1
+            self._docs[doc_id] = (question, features, keys)
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(doc_id)
+            if self.capacity is not None and len(self._docs) > self.capacity:
+                self._evict_oldest()
+        return True
+
+    def _evict_oldest(self):
+        doc_id, (_, _, keys) = self._docs.popitem(last=False)
+        for band, key in enumerate(keys):
+            bucket = self._buckets[band][key]
+            bucket.remove(doc_id)
+            if not bucket:
+                del self._buckets[band][key]
+
+    @property
+    def questions(self) -> List[str]:
+        """Indexed questions, oldest first"""
+        with self._lock:
+            return [question for question, _, _ in self._docs.values()]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            rate = self.duplicates / self.checked if self.checked else 0.0
+            return {"checked": self.checked, "duplicates": self.duplicates, "dedup_rate": round(rate, 4)}
+
+
+class DedupStats:
+    """Counters for the dedup stage across all packs"""
+
+    __slots__ = ("packs", "questions", "dropped_in_pack", "dropped_seen", "topped_up", "_lock")
+
+    def __init__(self):
+        self.packs = 0
+        self.questions = 0
+        self.dropped_in_pack = 0
+        self.dropped_seen = 0
+        self.topped_up = 0
+        self._lock = threading.Lock()
+
+    def record(self, questions: int, dropped_in_pack: int, dropped_seen: int, topped_up: int):
+        with self._lock:
+            self.packs += 1
+            self.questions += questions
+            self.dropped_in_pack += dropped_in_pack
+            self.dropped_seen += dropped_seen
+            self.topped_up += topped_up
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: getattr(self, name) for name in self.__slots__ if name != "_lock"}
+
+    def report(self) -> Dict[str, float]:
+        """Counters plus the share of generated questions that were dropped"""
+        counts = self.snapshot()
+        dropped = counts["dropped_in_pack"] + counts["dropped_seen"]
+        counts["dedup_rate"] = round(dropped / counts["questions"], 4) if counts["questions"] else 0.0
+        return counts
@@ -0,0 +1,1023 @@
+"""Question generation engine: prompts, model calls, caching and rule-based fallbacks
+
+Kept free of UI imports so batch jobs and workers can use it without loading
+Gradio; app.py builds the interface on top of it.
+"""
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from cache import ResponseCache, make_cache_key
+from backends import create_backend
+from dedup import DedupIndex, DedupStats, list_items, split_questions, strip_numbering
+from hedging import Hedger
+from inference_client import InferenceError
+from prompts import DEFAULT_VARIANT, PromptRegistry, parse_weights
+from question_bank import compile_question, get_question_set
+from results import QuestionPack
+from ratelimit import INTERACTIVE, WARMUP, UpstreamLimiter
+from singleflight import SingleFlight
+from skills import parse_skills
+from store import store_from_env
+import metrics
+
+# Hugging Face Inference API
+API_URL = os.environ.get("HF_API_URL", "https://api-inference.huggingface.co/models/google/flan-t5-small")
+
+GENERATION_PARAMETERS = {
+    "max_new_tokens": 300,
+    "temperature": 0.8,
+    "do_sample": True,
+    "top_k": 50
+}
+
+# State shared between worker processes (SHARED_STORE); in-process memory by default
+shared_store = store_from_env()
+
+# Model backend: "http" (Inference API at API_URL), "local" (in-process seq2seq) or "fake" (tests).
+# The HTTP backend's circuit breaker skips the API while it is unhealthy.
+generation_backend = create_backend(os.environ.get("GENERATION_BACKEND", "http"), API_URL, store=shared_store)
+
+# Generated text keyed on the canonical request; configured with CACHE_* variables
+response_cache = ResponseCache.from_env(shared_store)
+
+# Identical requests that arrive while a generation is in flight share its result;
+# with a shared store, so do identical requests in other worker processes
+generation_flight = SingleFlight(
+    store=shared_store if shared_store.shared else None,
+    lookup=response_cache.peek,
+)
+
+# Token-bucket limit on upstream calls with interactive > batch > warm-up priority;
+# off unless UPSTREAM_RATE is set
+upstream_limiter = UpstreamLimiter.from_env()
+
+# Interactive model calls time out after a multiple of the observed p99 latency (capped at
+# UPSTREAM_SLO) and can be hedged with a duplicate after the p95; off unless HEDGE_ENABLED
+# or UPSTREAM_SLO is set
+upstream_hedger = Hedger.from_env()
+# The same for the UI's streamed answers, on time to the first chunk, which is tracked apart
+stream_hedger = Hedger.from_env()
+
+# Questions from the bank and earlier model answers, searched before calling the model;
+# off unless RETRIEVAL_ENABLED is set, so numpy is only imported when it is used
+question_index = None
+if os.environ.get("RETRIEVAL_ENABLED", "").lower() in ("1", "true", "yes", "on"):
+    from retrieval import index_from_env
+    question_index = index_from_env()
+RETRIEVAL_MIN_SCORE = float(os.environ.get("RETRIEVAL_MIN_SCORE", 0.2))
+RETRIEVAL_MIN_MODEL = int(os.environ.get("RETRIEVAL_MIN_MODEL", 3))
+RETRIEVAL_INDEX_PATH = os.environ.get("RETRIEVAL_INDEX_PATH")
+RETRIEVAL_SAVE_EVERY = int(os.environ.get("RETRIEVAL_SAVE_EVERY", 50))
+QUESTIONS_PER_PACK = 5
+_unsaved_questions = 0
+_index_saver: Optional[threading.Thread] = None
+
+# Near-duplicate questions in model answers are dropped and replaced from the question bank
+DEDUP_ENABLED = os.environ.get("DEDUP_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+DEDUP_THRESHOLD = float(os.environ.get("DEDUP_THRESHOLD", 0.7))
+dedup_stats = DedupStats()
+
+# Scrape-time views of the shared components; no-ops unless METRICS_ENABLED is set
+metrics.register_stats(
+    "interview_cache_events_total", "Response cache hits, misses, evictions and expirations",
+    response_cache.stats.snapshot, "event"
+)
+metrics.REGISTRY.callback("interview_cache_entries", "Entries in the response cache", lambda: len(response_cache))
+metrics.register_stats(
+    "interview_singleflight_calls_total", "Generations executed vs. coalesced onto one already in flight",
+    lambda: {k: v for k, v in generation_flight.stats().items() if k != "in_flight"}, "outcome"
+)
+metrics.REGISTRY.callback(
+    "interview_singleflight_in_flight", "Generations currently in flight", lambda: generation_flight.stats()["in_flight"]
+)
+metrics.register_stats(
+    "interview_dedup_events_total", "Model questions checked, dropped as near-duplicates and topped up from the bank",
+    dedup_stats.snapshot, "event"
+)
+if question_index is not None:
+    metrics.register_stats(
+        "interview_retrieval_documents", "Questions in the retrieval index by source (bank, model)",
+        question_index.stats, "source", kind="gauge"
+    )
+if upstream_hedger is not None:
+    metrics.register_stats(
+        "interview_hedge_events_total", "Hedged model calls: calls, duplicates sent, duplicate wins, over budget, timeouts",
+        upstream_hedger.stats, "event"
+    )
+    metrics.REGISTRY.callback(
+        "interview_upstream_timeout_seconds", "Current adaptive timeout for interactive model calls", upstream_hedger.timeout
+    )
+    metrics.register_stats(
+        "interview_stream_hedge_events_total", "Hedged model stream starts: calls, duplicates sent, duplicate wins, over budget, timeouts",
+        stream_hedger.stats, "event"
+    )
+    metrics.REGISTRY.callback(
+        "interview_stream_first_chunk_timeout_seconds", "Current adaptive timeout for the first chunk of interactive model streams",
+        stream_hedger.timeout
+    )
+if upstream_limiter is not None:
+    metrics.REGISTRY.callback(
+        "interview_limiter_queued", "Upstream calls waiting for the rate limit", lambda: upstream_limiter.stats()["queued"]
+    )
+
+# Job category mapping
+JOB_CATEGORIES = {
+    # Software Development
+    "Software Engineer": "software_dev",
+    "Software Developer": "software_dev",
+    "Full Stack Developer": "software_dev",
+    "Frontend Developer": "frontend",
+    "Backend Developer": "backend",
+    "Mobile Application Developer": "mobile",
+    "Web Developer": "frontend",
+    "Game Developer": "gaming",
+    "Embedded Systems Engineer": "embedded",
+    
+    # Data, AI & ML
+    "Data Scientist": "data_science",
+    "Data Analyst": "data_analysis",
+    "Machine Learning Engineer": "ml_engineer",
+    "AI Engineer": "ai_engineer",
+    "Deep Learning Engineer": "ml_engineer",
+    "NLP Engineer": "nlp",
+    "Computer Vision Engineer": "computer_vision",
+    "Business Intelligence Analyst": "bi",
+    "Big Data Engineer": "big_data",
+    "Data Engineer": "data_engineering",
+    
+    # Cybersecurity
+    "Cybersecurity Analyst": "cybersecurity",
+    "Information Security Engineer": "cybersecurity",
+    "Ethical Hacker": "pentesting",
+    "Penetration Tester": "pentesting",
+    "Network Engineer": "networking",
+    "Network Security Engineer": "cybersecurity",
+    "SOC Analyst": "soc",
+    
+    # Cloud & DevOps
+    "Cloud Engineer": "cloud",
+    "Cloud Solutions Architect": "cloud_arch",
+    "DevOps Engineer": "devops",
+    "Site Reliability Engineer (SRE)": "sre",
+    "Systems Engineer": "systems",
+    
+    # Database & Systems
+    "Database Administrator (DBA)": "database",
+    "Systems Programmer": "systems",
+    
+    # Product & Testing
+    "QA Engineer / Software Tester": "qa",
+    "Automation Test Engineer": "automation",
+    "Technical Product Manager": "product",
+    
+    # Emerging Tech
+    "Blockchain Developer": "blockchain",
+    "AR/VR Developer": "ar_vr",
+    "IoT Engineer": "iot",
+    "Robotics Software Engineer": "robotics",
+}
+
+# Level-specific question modifiers
+LEVEL_MODIFIERS = {
+    "Entry/Junior": {
+        "focus": ["fundamentals", "basic concepts", "learning ability", "willingness to learn"],
+        "depth": "basic",
+        "experience": "0-2 years"
+    },
+    "Mid-Level": {
+        "focus": ["practical application", "project experience", "problem-solving", "collaboration"],
+        "depth": "intermediate",
+        "experience": "2-5 years"
+    },
+    "Senior": {
+        "focus": ["architecture", "mentoring", "system design", "technical leadership", "best practices"],
+        "depth": "advanced",
+        "experience": "5-8+ years"
+    },
+    "Lead/Principal": {
+        "focus": ["strategy", "technical vision", "team leadership", "cross-functional collaboration", "innovation"],
+        "depth": "expert",
+        "experience": "8+ years"
+    }
+}
+
+@metrics.timed("level_questions")
+def get_level_specific_questions(role: str, skills: str, level: str, category: str) -> List[str]:
+    """Generate level-specific questions for each category"""
+    question_set = get_question_set(category, level)
+    # Only parse the skills string when a template actually has a skill slot;
+    # the slot gets the skill most relevant to the category, not just the first one
+    skill = parse_skills(skills, category).primary if question_set.uses_skill else None
+    return question_set.render(role, skill)
+
+def _prompt_context(category: str, level: str) -> Dict[str, str]:
+    # Fields filled in once when a prompt is compiled for a (category, level) pair
+    level_info = LEVEL_MODIFIERS.get(level, {})
+    return {
+        "level": level,
+        "focus": ", ".join(level_info.get("focus", ["technical skills", "problem-solving"])),
+        "experience": level_info.get("experience", "relevant experience"),
+        "depth": level_info.get("depth", "appropriate"),
+        "category_name": get_category_name(category),
+    }
+
+# All prompts, compiled without indentation or blank lines once per (type, category, level, variant).
+# `python app.py prompts` reports their sizes; PROMPT_VARIANTS splits traffic between A/B variants.
+prompt_registry = PromptRegistry(_prompt_context)
+prompt_registry.register("questions", """
+            Generate 5 interview questions for a {role} position at {level} level.
+            Focus areas: {focus}
+            Required skills: {skills}
+            Experience level: {experience}
+            Questions should test {depth} knowledge.
+            
+            Format each question clearly with a number.
+            Make questions specific to {category_name} role.
+            """)
+prompt_registry.register(
+    "questions",
+    "Write 5 numbered interview questions for a {level} {role} ({category_name}, {experience}).\n"
+    "Skills: {skills}\nFocus: {focus}\nDepth: {depth}",
+    variant="b",
+)
+
+def prompt_variant(prompt_type: str, role: str, skills: str, level: str) -> str:
+    """The A/B variant a request gets; always the same for equivalent requests"""
+    return prompt_registry.choose_variant(prompt_type, f"{role.strip()}|{','.join(parse_skills(skills).key)}|{level}")
+
+@metrics.timed("prompt")
+def build_question_prompt(role: str, skills: str, level: str, category: str) -> str:
+    """Build the level-specific generation prompt"""
+    variant = prompt_variant("questions", role, skills, level)
+    # Canonical names, most relevant first, so equivalent inputs share one prompt (and cache entry)
+    ranked = parse_skills(skills, category).ranked
+    compiled = prompt_registry.get("questions", category, level, variant)
+    fields = {"role": role, "skills": ", ".join(ranked) or skills}
+    if metrics.ENABLED:
+        metrics.PROMPT_TOKENS.observe("questions", variant, value=compiled.count_tokens(**fields))
+    return compiled.render(**fields)
+
+def question_cache_key(role: str, skills: str, level: str) -> str:
+    """Cache key of the model output for a question request"""
+    variant = prompt_variant("questions", role, skills, level)
+    if variant != DEFAULT_VARIANT:
+        # Answers to different prompts are cached apart
+        return make_cache_key(role, skills, level, GENERATION_PARAMETERS, model=generation_backend.model_id, prompt_variant=variant)
+    return make_cache_key(role, skills, level, GENERATION_PARAMETERS, model=generation_backend.model_id)
+
+@metrics.timed("upstream")
+def _generate_and_cache(cache_key: str, prompt: str, parameters: Dict) -> str:
+    start = time.monotonic()
+    questions = generation_backend.generate(prompt, parameters)
+    if upstream_hedger is not None:
+        upstream_hedger.observe(time.monotonic() - start)
+    response_cache.set(cache_key, questions)
+    return questions
+
+@metrics.timed("upstream")
+async def _agenerate_and_cache(cache_key: str, prompt: str, parameters: Dict) -> str:
+    start = time.monotonic()
+    questions = await generation_backend.agenerate(prompt, parameters)
+    if upstream_hedger is not None:
+        upstream_hedger.observe(time.monotonic() - start)
+    response_cache.set(cache_key, questions)
+    return questions
+
+def _limited_generate(cache_key: str, prompt: str, parameters: Dict, priority: int) -> str:
+    """Wait for the upstream rate limit, then generate and cache"""
+    if upstream_limiter is None:
+        return _generate_and_cache(cache_key, prompt, parameters)
+    upstream_limiter.acquire(priority, upstream_limiter.deadline_for(priority))
+    start = time.monotonic()
+    questions = _generate_and_cache(cache_key, prompt, parameters)
+    upstream_limiter.record_service_time(time.monotonic() - start)
+    return questions
+
+async def _alimited_generate(cache_key: str, prompt: str, parameters: Dict, priority: int) -> str:
+    """Async version of _limited_generate"""
+    if upstream_limiter is None:
+        return await _agenerate_and_cache(cache_key, prompt, parameters)
+    await upstream_limiter.aacquire(priority, upstream_limiter.deadline_for(priority))
+    start = time.monotonic()
+    questions = await _agenerate_and_cache(cache_key, prompt, parameters)
+    upstream_limiter.record_service_time(time.monotonic() - start)
+    return questions
+
+def _throttled_generate(cache_key: str, prompt: str, parameters: Dict, priority: int) -> str:
+    """Rate-limited generation; interactive calls are hedged and bounded by the adaptive timeout"""
+    if upstream_hedger is None or priority != INTERACTIVE:
+        return _limited_generate(cache_key, prompt, parameters, priority)
+    return upstream_hedger.call(_limited_generate, cache_key, prompt, parameters, priority)
+
+async def _athrottled_generate(cache_key: str, prompt: str, parameters: Dict, priority: int) -> str:
+    """Async version of _throttled_generate"""
+    if upstream_hedger is None or priority != INTERACTIVE:
+        return await _alimited_generate(cache_key, prompt, parameters, priority)
+    return await upstream_hedger.acall(_alimited_generate, cache_key, prompt, parameters, priority)
+
+def _limited_stream(prompt: str, parameters: Dict, priority: int):
+    """Wait for the upstream rate limit, then yield the model output's chunks"""
+    if upstream_limiter is None:
+        yield from generation_backend.stream(prompt, parameters)
+        return
+    upstream_limiter.acquire(priority, upstream_limiter.deadline_for(priority))
+    start = time.monotonic()
+    yield from generation_backend.stream(prompt, parameters)
+    upstream_limiter.record_service_time(time.monotonic() - start)
+
+async def _alimited_stream(prompt: str, parameters: Dict, priority: int):
+    """Async version of _limited_stream"""
+    if upstream_limiter is None:
+        async for chunk in generation_backend.astream(prompt, parameters):
+            yield chunk
+        return
+    await upstream_limiter.aacquire(priority, upstream_limiter.deadline_for(priority))
+    start = time.monotonic()
+    async for chunk in generation_backend.astream(prompt, parameters):
+        yield chunk
+    upstream_limiter.record_service_time(time.monotonic() - start)
+
+def _throttled_stream(prompt: str, parameters: Dict, priority: int):
+    """Rate-limited stream; interactive streams have their start hedged and bounded by the adaptive timeout"""
+    if stream_hedger is None or priority != INTERACTIVE:
+        return _limited_stream(prompt, parameters, priority)
+    return stream_hedger.stream(_limited_stream, prompt, parameters, priority)
+
+def _athrottled_stream(prompt: str, parameters: Dict, priority: int):
+    """Async version of _throttled_stream"""
+    if stream_hedger is None or priority != INTERACTIVE:
+        return _alimited_stream(prompt, parameters, priority)
+    return stream_hedger.astream(_alimited_stream, prompt, parameters, priority)
+
+def generate_with_model(cache_key: str, prompt: str, parameters: Dict, priority: int = INTERACTIVE):
+    """Get model output from the cache or the backend; None if the model can't be used"""
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if not generation_backend.is_available():
+        return None
+    try:
+        return generation_flight.do(cache_key, _throttled_generate, cache_key, prompt, parameters, priority)
+    except InferenceError as e:
+        print(f"API Error: {e}", file=sys.stderr)
+        return None
+
+async def agenerate_with_model(cache_key: str, prompt: str, parameters: Dict, priority: int = INTERACTIVE):
+    """Async version of generate_with_model"""
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if not generation_backend.is_available():
+        return None
+    try:
+        return await generation_flight.ado(cache_key, _athrottled_generate, cache_key, prompt, parameters, priority)
+    except InferenceError as e:
+        print(f"API Error: {e}", file=sys.stderr)
+        return None
+
+@metrics.timed("upstream_stream")
+def stream_with_model(cache_key: str, prompt: str, parameters: Dict, priority: int = INTERACTIVE):
+    """Yield the model output accumulated so far; raises InferenceError on failure
+
+    Identical requests already in flight are joined rather than streamed again,
+    and the finished text is cached and shared with anyone who joined this one.
+    """
+    future, leader = generation_flight.join(cache_key)
+    if not leader:
+        yield future.result()
+        return
+    claimed, text = generation_flight.claim(cache_key)
+    if not claimed:
+        # Another worker process generated it while we waited
+        generation_flight.finish(cache_key, future, text)
+        yield text
+        return
+    text = ""
+    error = None
+    chunks = _throttled_stream(prompt, parameters, priority)
+    try:
+        for chunk in chunks:
+            text += chunk
+            yield text
+        text = text.strip()
+    except BaseException as e:
+        error = e if isinstance(e, Exception) else InferenceError("Stream closed before completion")
+        raise
+    finally:
+        # Closes the upstream request too if our consumer went away
+        chunks.close()
+        # Cache before releasing the lease, so waiting workers find the result
+        if error is None:
+            response_cache.set(cache_key, text)
+        generation_flight.release(cache_key)
+        generation_flight.finish(cache_key, future, text, error)
+
+@metrics.timed("upstream_stream")
+async def astream_with_model(cache_key: str, prompt: str, parameters: Dict, priority: int = INTERACTIVE):
+    """Async version of stream_with_model"""
+    future, leader = generation_flight.join(cache_key)
+    if not leader:
+        yield await asyncio.shield(asyncio.wrap_future(future))
+        return
+    claimed, text = await generation_flight.aclaim(cache_key)
+    if not claimed:
+        generation_flight.finish(cache_key, future, text)
+        yield text
+        return
+    text = ""
+    error = None
+    chunks = _athrottled_stream(prompt, parameters, priority)
+    try:
+        async for chunk in chunks:
+            text += chunk
+            yield text
+        text = text.strip()
+    except BaseException as e:
+        error = e if isinstance(e, Exception) else InferenceError("Stream closed before completion")
+        raise
+    finally:
+        await chunks.aclose()
+        # Cache before releasing the lease, so waiting workers find the result
+        if error is None:
+            response_cache.set(cache_key, text)
+        try:
+            await generation_flight.arelease(cache_key)
+        finally:
+            generation_flight.finish(cache_key, future, text, error)
+
+@metrics.timed("retrieval")
+def retrieve_questions(role: str, skills: str, level: str, category: str) -> Optional[str]:
+    """A full question pack from indexed questions, or None if the index can't cover the request
+
+    Every question must score at least RETRIEVAL_MIN_SCORE, and at least
+    RETRIEVAL_MIN_MODEL of them must come from earlier model answers, so a
+    pack is never just the rule-based templates.
+    """
+    if question_index is None:
+        return None
+    parsed = parse_skills(skills, category)
+    query = f"{role} {' '.join(parsed.ranked)} {get_category_name(category)}"
+    hits = [
+        doc for score, doc in question_index.search(query, level, category, k=QUESTIONS_PER_PACK)
+        if score >= RETRIEVAL_MIN_SCORE
+    ]
+    if len(hits) < QUESTIONS_PER_PACK or sum(doc["source"] == "model" for doc in hits) < RETRIEVAL_MIN_MODEL:
+        return None
+    questions = []
+    for doc in hits:
+        template = doc.get("template")
+        if template is None:
+            questions.append(doc["text"])
+        else:
+            item = compile_question(template)
+            questions.append(item if isinstance(item, str) else item.render(role, parsed.primary))
+    return "\n".join(f"{number}. {question}" for number, question in enumerate(questions, 1))
+
+def index_model_output(questions: str, level: str, category: str):
+    """Add a model answer's questions to the retrieval index, saving it every RETRIEVAL_SAVE_EVERY new ones
+
+    The save runs on a background thread, one at a time, so requests never wait for the disk.
+    """
+    global _unsaved_questions, _index_saver
+    if question_index is None:
+        return
+    _unsaved_questions += question_index.add_model_output(questions, level, category)
+    if RETRIEVAL_INDEX_PATH and _unsaved_questions >= RETRIEVAL_SAVE_EVERY:
+        if _index_saver is not None and _index_saver.is_alive():
+            return
+        _unsaved_questions = 0
+        _index_saver = threading.Thread(target=_save_index, name="index-save", daemon=True)
+        _index_saver.start()
+
+def _save_index():
+    try:
+        question_index.save(RETRIEVAL_INDEX_PATH)
+    except OSError as e:
+        print(f"Index Save Error: {e}", file=sys.stderr)
+
+@metrics.timed("dedup")
+def dedupe_questions(
+    questions_text: str, role: str, skills: str, level: str, category: str, seen: Optional[DedupIndex] = None,
+    record: bool = True,
+) -> str:
+    """Drop near-duplicate questions from a model answer and top the pack up from the question bank
+
+    A question is dropped if it repeats one earlier in the pack or, given
+    ``seen``, one already used in another pack (such as elsewhere in a batch).
+    Answers without duplicates are returned unchanged. ``record=False`` leaves
+    dedup_stats alone, for answers replayed from the cache that were counted
+    when they were generated.
+    """
+    if not DEDUP_ENABLED:
+        return questions_text
+    questions = split_questions(questions_text)
+    pack = DedupIndex(DEDUP_THRESHOLD)
+    kept = []
+    dropped_in_pack = dropped_seen = 0
+    for question in questions:
+        if not pack.add_if_new(question):
+            dropped_in_pack += 1
+        elif seen is not None and not seen.add_if_new(question):
+            dropped_seen += 1
+        else:
+            kept.append(question)
+    topped_up = 0
+    if len(kept) < len(questions):
+        templates = split_questions("\n".join(get_level_specific_questions(role, skills, level, category)))
+        # Bank questions not used in another pack yet come first; used ones only fill what's left
+        for fresh_only in ((True, False) if seen is not None else (False,)):
+            for question in templates:
+                if len(kept) >= len(questions):
+                    break
+                if fresh_only and seen.find(question) is not None:
+                    continue
+                if pack.add_if_new(question):
+                    kept.append(question)
+                    topped_up += 1
+                    if seen is not None:
+                        seen.add_if_new(question)
+    if record:
+        dedup_stats.record(len(questions), dropped_in_pack, dropped_seen, topped_up)
+    if not dropped_in_pack and not dropped_seen:
+        return questions_text
+    return "\n".join(f"{number}. {question}" for number, question in enumerate(kept, 1))
+
+def refresh_questions(role: str, skills: str, level: str, priority: int = WARMUP) -> bool:
+    """Regenerate and cache the model output for a request even if it is cached; False if the model can't be used"""
+    if not generation_backend.is_available():
+        return False
+    cache_key = question_cache_key(role, skills, level)
+    prompt = build_question_prompt(role, skills, level, JOB_CATEGORIES.get(role, "default"))
+    try:
+        questions = generation_flight.do(cache_key, _throttled_generate, cache_key, prompt, GENERATION_PARAMETERS, priority)
+        index_model_output(questions, level, JOB_CATEGORIES.get(role, "default"))
+        return True
+    except InferenceError as e:
+        print(f"API Error: {e}", file=sys.stderr)
+        return False
+
+def make_question_pack(
+    role: str, skills: str, level: str, category: str, questions_text: str, source: str, timings=()
+) -> QuestionPack:
+    """Parse a numbered questions answer into a QuestionPack
+
+    The questions are the answer's numbered or bulleted lines; an answer with
+    none is kept whole as a single question rather than guessed at.
+    """
+    questions = list_items(questions_text) or [questions_text.strip()]
+    return QuestionPack(role, category, get_category_name(category), level, skills, questions, None, source, timings)
+
+@metrics.timed("fallback")
+def fallback_question_pack(role: str, skills: str, level: str, category: str, timings=()) -> QuestionPack:
+    """Rule-based QuestionPack with level-specific advice"""
+    questions = [strip_numbering(question) for question in get_level_specific_questions(role, skills, level, category)]
+    return QuestionPack(
+        role, category, get_category_name(category), level, skills, questions,
+        get_level_specific_advice(level), "fallback", timings,
+    )
+
+@metrics.timed("generate_questions")
+def generate_question_pack(role, skills, level, use_api=True, priority=INTERACTIVE, seen_questions=None) -> QuestionPack:
+    """Generate interview questions using API or fallback, as a structured QuestionPack
+
+    ``seen_questions`` (a dedup.DedupIndex) drops model questions already used
+    in other packs, e.g. earlier in a batch. Raises ValueError without a role
+    or skills.
+    """
+    if not role or not skills:
+        raise ValueError("Please enter both job role and skills.")
+    
+    # Get category
+    category = JOB_CATEGORIES.get(role, "default")
+    start = time.perf_counter()
+    timings = []
+    
+    if use_api:
+        cache_key = question_cache_key(role, skills, level)
+        cached = response_cache.peek(cache_key) is not None
+        # An exact cached answer beats a retrieved one, so only misses are looked up
+        retrieved = None if cached or question_index is None else retrieve_questions(role, skills, level, category)
+        timings.append(("retrieval", time.perf_counter() - start))
+        if retrieved is not None:
+            metrics.ANSWERS.inc("questions", "retrieval")
+            timings.append(("total", time.perf_counter() - start))
+            return make_question_pack(role, skills, level, category, retrieved, "retrieval", timings)
+        prompt = build_question_prompt(role, skills, level, category)
+        model_start = time.perf_counter()
+        questions = generate_with_model(cache_key, prompt, GENERATION_PARAMETERS, priority)
+        timings.append(("model", time.perf_counter() - model_start))
+        if questions is not None:
+            questions = dedupe_questions(questions, role, skills, level, category, seen_questions, record=not cached)
+            index_model_output(questions, level, category)
+            metrics.ANSWERS.inc("questions", "model")
+            timings.append(("total", time.perf_counter() - start))
+            return make_question_pack(role, skills, level, category, questions, "model", timings)
+    
+    # If API fails, use enhanced fallback
+    metrics.ANSWERS.inc("questions", "fallback")
+    pack = fallback_question_pack(role, skills, level, category)
+    timings.append(("total", time.perf_counter() - start))
+    return pack.with_timings(tuple(timings))
+
+@metrics.timed("generate_questions")
+async def agenerate_question_pack(
+    role, skills, level, use_api=True, priority=INTERACTIVE, seen_questions=None
+) -> QuestionPack:
+    """Async version of generate_question_pack that doesn't block a worker thread"""
+    if not role or not skills:
+        raise ValueError("Please enter both job role and skills.")
+    
+    category = JOB_CATEGORIES.get(role, "default")
+    start = time.perf_counter()
+    timings = []
+    
+    if use_api:
+        cache_key = question_cache_key(role, skills, level)
+        cached = response_cache.peek(cache_key) is not None
+        # An exact cached answer beats a retrieved one, so only misses are looked up
+        retrieved = None if cached or question_index is None else retrieve_questions(role, skills, level, category)
+        timings.append(("retrieval", time.perf_counter() - start))
+        if retrieved is not None:
+            metrics.ANSWERS.inc("questions", "retrieval")
+            timings.append(("total", time.perf_counter() - start))
+            return make_question_pack(role, skills, level, category, retrieved, "retrieval", timings)
+        prompt = build_question_prompt(role, skills, level, category)
+        model_start = time.perf_counter()
+        questions = await agenerate_with_model(cache_key, prompt, GENERATION_PARAMETERS, priority)
+        timings.append(("model", time.perf_counter() - model_start))
+        if questions is not None:
+            questions = dedupe_questions(questions, role, skills, level, category, seen_questions, record=not cached)
+            index_model_output(questions, level, category)
+            metrics.ANSWERS.inc("questions", "model")
+            timings.append(("total", time.perf_counter() - start))
+            return make_question_pack(role, skills, level, category, questions, "model", timings)
+    
+    metrics.ANSWERS.inc("questions", "fallback")
+    pack = fallback_question_pack(role, skills, level, category)
+    timings.append(("total", time.perf_counter() - start))
+    return pack.with_timings(tuple(timings))
+
+def generate_questions(role, skills, level, use_api=True, priority=INTERACTIVE, seen_questions=None):
+    """Generate interview questions using API or fallback, as the UI's plain text"""
+    if not role or not skills:
+        return "Please enter both job role and skills."
+    return generate_question_pack(role, skills, level, use_api, priority, seen_questions).text
+
+async def generate_questions_async(role, skills, level, use_api=True, priority=INTERACTIVE, seen_questions=None):
+    """Async version of generate_questions"""
+    if not role or not skills:
+        return "Please enter both job role and skills."
+    return (await agenerate_question_pack(role, skills, level, use_api, priority, seen_questions)).text
+
+@metrics.timed("generate_questions")
+def generate_questions_stream(role, skills, level, use_api=True, priority=INTERACTIVE):
+    """Generator version of generate_questions yielding the output text as it grows
+
+    The header is yielded before the model is called, then the text is re-yielded
+    as chunks arrive, ending on the same text generate_questions returns for the
+    answer. Cached and fallback answers are yielded at once.
+    """
+    if not role or not skills:
+        yield "Please enter both job role and skills."
+        return
+    
+    category = JOB_CATEGORIES.get(role, "default")
+    
+    if use_api:
+        cache_key = question_cache_key(role, skills, level)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            metrics.ANSWERS.inc("questions", "model")
+            deduped = dedupe_questions(cached, role, skills, level, category, record=False)
+            yield make_question_pack(role, skills, level, category, deduped, "model").text
+            return
+        retrieved = retrieve_questions(role, skills, level, category)
+        if retrieved is not None:
+            metrics.ANSWERS.inc("questions", "retrieval")
+            yield make_question_pack(role, skills, level, category, retrieved, "retrieval").text
+            return
+        
+        if generation_backend.is_available():
+            header = format_questions("", role, category)
+            yield header
+            prompt = build_question_prompt(role, skills, level, category)
+            questions = ""
+            try:
+                for questions in stream_with_model(cache_key, prompt, GENERATION_PARAMETERS, priority):
+                    yield header + questions
+                deduped = dedupe_questions(questions, role, skills, level, category)
+                # End on the pack rendering, so the stream shows a cached answer as /v1 and batches do
+                text = make_question_pack(role, skills, level, category, deduped, "model").text
+                if text != header + questions:
+                    yield text
+                index_model_output(deduped, level, category)
+                metrics.ANSWERS.inc("questions", "model")
+                return
+            except InferenceError as e:
+                print(f"API Error: {e}", file=sys.stderr)
+    
+    metrics.ANSWERS.inc("questions", "fallback")
+    yield generate_enhanced_fallback(role, skills, level, category)
+
+@metrics.timed("generate_questions")
+async def generate_questions_stream_async(role, skills, level, use_api=True, priority=INTERACTIVE):
+    """Async version of generate_questions_stream used by the UI"""
+    if not role or not skills:
+        yield "Please enter both job role and skills."
+        return
+    
+    category = JOB_CATEGORIES.get(role, "default")
+    
+    if use_api:
+        cache_key = question_cache_key(role, skills, level)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            metrics.ANSWERS.inc("questions", "model")
+            deduped = dedupe_questions(cached, role, skills, level, category, record=False)
+            yield make_question_pack(role, skills, level, category, deduped, "model").text
+            return
+        retrieved = retrieve_questions(role, skills, level, category)
+        if retrieved is not None:
+            metrics.ANSWERS.inc("questions", "retrieval")
+            yield make_question_pack(role, skills, level, category, retrieved, "retrieval").text
+            return
+        
+        if generation_backend.is_available():
+            header = format_questions("", role, category)
+            yield header
+            prompt = build_question_prompt(role, skills, level, category)
+            stream = astream_with_model(cache_key, prompt, GENERATION_PARAMETERS, priority)
+            questions = ""
+            try:
+                async for questions in stream:
+                    yield header + questions
+                deduped = dedupe_questions(questions, role, skills, level, category)
+                text = make_question_pack(role, skills, level, category, deduped, "model").text
+                if text != header + questions:
+                    yield text
+                index_model_output(deduped, level, category)
+                metrics.ANSWERS.inc("questions", "model")
+                return
+            except InferenceError as e:
+                print(f"API Error: {e}", file=sys.stderr)
+            finally:
+                # Close the model stream now if the client went away, so waiting followers are released
+                await stream.aclose()
+    
+    metrics.ANSWERS.inc("questions", "fallback")
+    yield generate_enhanced_fallback(role, skills, level, category)
+
+def generate_enhanced_fallback(role: str, skills: str, level: str, category: str) -> str:
+    """Generate enhanced level-specific fallback questions"""
+    return fallback_question_pack(role, skills, level, category).text
+
+def get_level_specific_advice(level: str) -> str:
+    """Get level-specific interview advice"""
+    if level == "Entry/Junior":
+        return "💡 Junior Level Tips:\n• Focus on fundamentals and willingness to learn\n• Show enthusiasm and growth mindset\n• Be prepared to discuss academic projects and internships\n• Demonstrate problem-solving approach, not just answers"
+    elif level == "Mid-Level":
+        return "💡 Mid-Level Tips:\n• Emphasize practical experience and project contributions\n• Show ability to work independently and in teams\n• Discuss specific technical challenges and how you solved them\n• Demonstrate understanding of best practices"
+    elif level == "Senior":
+        return "💡 Senior Level Tips:\n• Highlight leadership and mentoring experience\n• Discuss architectural decisions and trade-offs\n• Show business impact of technical decisions\n• Demonstrate ability to establish processes and standards"
+    else:  # Lead/Principal
+        return "💡 Leadership Tips:\n• Emphasize strategic thinking and vision\n• Show experience building and scaling teams\n• Discuss stakeholder management and communication\n• Demonstrate business-technical alignment"
+
+def get_category_name(category: str) -> str:
+    """Get display name for category"""
+    category_names = {
+        "software_dev": "Software Development",
+        "data_science": "Data Science",
+        "ml_engineer": "Machine Learning",
+        "cybersecurity": "Cybersecurity",
+        "devops": "DevOps & Cloud",
+        "frontend": "Frontend Development",
+        "backend": "Backend Development",
+        "database": "Database Administration",
+        "default": "General Technology"
+    }
+    return category_names.get(category, "General Technology")
+
+@metrics.timed("format")
+def format_questions(questions_text: str, role: str, category: str) -> str:
+    """Format the generated questions nicely"""
+    category_name = get_category_name(category)
+    header = f"📋 Interview Questions for {role}\n"
+    header += f"🏷️ Category: {category_name}\n"
+    header += "=" * 50 + "\n\n"
+    
+    return header + questions_text
+
+# Follow-up prompt templates, defined once; {role}, {skills} and {level} are filled per request
+FOLLOWUP_PROMPTS = {
+    "behavioral": {
+        "Entry/Junior": "Generate 3 behavioral questions focusing on learning, adaptability, and teamwork for a {role} at {level} level",
+        "Mid-Level": "Generate 3 behavioral questions focusing on project experience, collaboration, and problem-solving for a {role} at {level} level",
+        "Senior": "Generate 3 behavioral questions focusing on leadership, mentoring, and technical guidance for a {role} at {level} level",
+        "Lead/Principal": "Generate 3 behavioral questions focusing on strategic thinking, team building, and stakeholder management for a {role} at {level} level"
+    },
+    "technical_depth": {
+        "Entry/Junior": "Generate 3 technical questions focusing on fundamentals and basic concepts for {role}",
+        "Mid-Level": "Generate 3 advanced technical questions diving deeper into specific skills: {skills}",
+        "Senior": "Generate 3 architectural/system design questions for {role} position",
+        "Lead/Principal": "Generate 3 strategic technical questions about technology selection and implementation for {role}"
+    },
+    "scenario": {
+        "Entry/Junior": "Generate 3 simple scenario-based questions testing basic problem-solving for {role}",
+        "Mid-Level": "Generate 3 realistic work scenario questions for {role} with skills: {skills}",
+        "Senior": "Generate 3 complex scenario questions involving technical leadership and decision-making",
+        "Lead/Principal": "Generate 3 strategic scenario questions involving business and technical trade-offs"
+    },
+    "leadership": {
+        "Entry/Junior": "Generate 3 questions about teamwork and collaboration for junior {role}",
+        "Mid-Level": "Generate 3 questions about informal leadership and mentoring for {role}",
+        "Senior": "Generate 3 leadership questions about team management and technical direction",
+        "Lead/Principal": "Generate 3 executive-level leadership questions for {role} position"
+    }
+}
+DEFAULT_FOLLOWUP_PROMPT = "Generate 3 {question_type} questions for a {role} at {level} level with skills: {skills}"
+DEFAULT_FOLLOWUP_ANSWER = "Focus on practical experience and problem-solving approaches."
+for _question_type, _templates in FOLLOWUP_PROMPTS.items():
+    prompt_registry.register(_question_type, _templates, default=DEFAULT_FOLLOWUP_PROMPT)
+for _prompt_type, _weights in parse_weights(os.environ.get("PROMPT_VARIANTS", "")).items():
+    prompt_registry.set_weights(_prompt_type, _weights)
+
+FOLLOWUP_PARAMETERS = {**GENERATION_PARAMETERS, "max_new_tokens": 150}
+
+@metrics.timed("followup_prompt")
+def build_followup_prompt(role: str, skills: str, level: str, question_type: str) -> str:
+    """Fill in the follow-up prompt template for a question type and level"""
+    if question_type not in FOLLOWUP_PROMPTS:
+        return DEFAULT_FOLLOWUP_PROMPT.format(role=role, skills=skills, level=level, question_type=question_type)
+    variant = prompt_variant(question_type, role, skills, level)
+    # Follow-up prompts don't depend on the category, so one compiled copy serves all
+    compiled = prompt_registry.get(question_type, "default", level, variant)
+    fields = {"role": role, "skills": skills, "question_type": question_type}
+    if metrics.ENABLED:
+        metrics.PROMPT_TOKENS.observe(question_type, variant, value=compiled.count_tokens(**fields))
+    return compiled.render(**fields)
+
+def followup_cache_key(role: str, skills: str, level: str, question_type: str, round_number: int = 0) -> str:
+    """Cache key of the model output for a follow-up request; later rounds get answers of their own"""
+    extra = {"question_type": question_type}
+    if round_number:
+        extra["round"] = round_number
+    if question_type in FOLLOWUP_PROMPTS:
+        variant = prompt_variant(question_type, role, skills, level)
+        if variant != DEFAULT_VARIANT:
+            extra["prompt_variant"] = variant
+    return make_cache_key(role, skills, level, FOLLOWUP_PARAMETERS, model=generation_backend.model_id, **extra)
+
+@metrics.timed("followup")
+def generate_followup_questions(role, skills, level, question_type, use_api=True, priority=INTERACTIVE):
+    """Generate follow-up questions based on type and level"""
+    fallback = FOLLOWUP_GENERATORS.get(question_type)
+    if fallback is None:
+        return DEFAULT_FOLLOWUP_ANSWER
+    
+    if use_api:
+        cache_key = followup_cache_key(role, skills, level, question_type)
+        prompt = build_followup_prompt(role, skills, level, question_type)
+        questions = generate_with_model(cache_key, prompt, FOLLOWUP_PARAMETERS, priority)
+        if questions is not None:
+            metrics.ANSWERS.inc("followup", "model")
+            return questions
+    
+    # Only the requested type's fallback is evaluated
+    metrics.ANSWERS.inc("followup", "fallback")
+    return fallback(role, skills, level)
+
+@metrics.timed("followup")
+async def generate_followup_questions_async(role, skills, level, question_type, use_api=True, priority=INTERACTIVE):
+    """Async version of generate_followup_questions for the Gradio event loop"""
+    fallback = FOLLOWUP_GENERATORS.get(question_type)
+    if fallback is None:
+        return DEFAULT_FOLLOWUP_ANSWER
+    
+    if use_api:
+        cache_key = followup_cache_key(role, skills, level, question_type)
+        prompt = build_followup_prompt(role, skills, level, question_type)
+        questions = await agenerate_with_model(cache_key, prompt, FOLLOWUP_PARAMETERS, priority)
+        if questions is not None:
+            metrics.ANSWERS.inc("followup", "model")
+            return questions
+    
+    metrics.ANSWERS.inc("followup", "fallback")
+    return fallback(role, skills, level)
+
+FOLLOWUPS_PER_ROUND = 3
+
+def followup_candidates(role: str, skills: str, level: str, question_type: str) -> Iterator[str]:
+    """Rule-based follow-ups of a type: the requested level's first, then the other levels'"""
+    fallback = FOLLOWUP_GENERATORS[question_type]
+    for candidate_level in [level] + [other for other in LEVEL_MODIFIERS if other != level]:
+        yield from split_questions(fallback(role, skills, candidate_level))
+
+def _new_followups(answer: Optional[str], role: str, skills: str, level: str, question_type: str,
+                   seen_questions: DedupIndex) -> List[str]:
+    candidates = itertools.chain(
+        split_questions(answer) if answer is not None else (), followup_candidates(role, skills, level, question_type)
+    )
+    questions = []
+    for question in candidates:
+        if seen_questions.add_if_new(question):
+            questions.append(question)
+            if len(questions) == FOLLOWUPS_PER_ROUND:
+                break
+    return questions
+
+@metrics.timed("followup")
+def generate_followup_round(role, skills, level, question_type, seen_questions, round_number=0,
+                            use_api=True, priority=INTERACTIVE) -> List[str]:
+    """Follow-up questions of a type that ``seen_questions`` doesn't hold yet; they are added to it
+
+    Round 0 uses the same model answer as generate_followup_questions; later
+    rounds ask the model again. Questions already seen are skipped and the
+    round is topped up from the rule-based follow-ups of every level, so the
+    result is empty only once those run out too.
+    """
+    if question_type not in FOLLOWUP_GENERATORS:
+        return []
+    answer = None
+    if use_api:
+        cache_key = followup_cache_key(role, skills, level, question_type, round_number)
+        prompt = build_followup_prompt(role, skills, level, question_type)
+        answer = generate_with_model(cache_key, prompt, FOLLOWUP_PARAMETERS, priority)
+    metrics.ANSWERS.inc("followup", "model" if answer is not None else "fallback")
+    return _new_followups(answer, role, skills, level, question_type, seen_questions)
+
+@metrics.timed("followup")
+async def agenerate_followup_round(role, skills, level, question_type, seen_questions, round_number=0,
+                                   use_api=True, priority=INTERACTIVE) -> List[str]:
+    """Async version of generate_followup_round"""
+    if question_type not in FOLLOWUP_GENERATORS:
+        return []
+    answer = None
+    if use_api:
+        cache_key = followup_cache_key(role, skills, level, question_type, round_number)
+        prompt = build_followup_prompt(role, skills, level, question_type)
+        answer = await agenerate_with_model(cache_key, prompt, FOLLOWUP_PARAMETERS, priority)
+    metrics.ANSWERS.inc("followup", "model" if answer is not None else "fallback")
+    return _new_followups(answer, role, skills, level, question_type, seen_questions)
+
+@metrics.timed("followup_fallback")
+def get_behavioral_fallback(role: str, level: str) -> str:
+    """Fallback behavioral questions"""
+    if level == "Entry/Junior":
+        return "1. Describe a time you had to learn something new quickly.\n2. How do you handle feedback on your work?\n3. Tell me about a team project you worked on and your contribution."
+    elif level == "Mid-Level":
+        return "1. Describe a challenging project and how you overcame obstacles.\n2. How do you handle conflicting priorities?\n3. Tell me about a time you had to convince others of your technical approach."
+    elif level == "Senior":
+        return "1. How do you mentor junior team members?\n2. Describe a time you made a difficult technical decision.\n3. How do you handle disagreements about technical direction?"
+    else:
+        return "1. How do you build and maintain high-performing teams?\n2. Describe your approach to stakeholder management.\n3. How do you align technical strategy with business goals?"
+
+@metrics.timed("followup_fallback")
+def get_technical_fallback(role: str, skills: str, level: str) -> str:
+    """Fallback technical questions"""
+    primary_skill = parse_skills(skills, JOB_CATEGORIES.get(role)).primary or "relevant technology"
+    
+    if level == "Entry/Junior":
+        return f"1. Explain basic concepts of {primary_skill}.\n2. What are common use cases for {primary_skill}?\n3. How would you troubleshoot a basic issue with {primary_skill}?"
+    elif level == "Mid-Level":
+        return f"1. What advanced features of {primary_skill} have you used?\n2. How do you optimize performance with {primary_skill}?\n3. What are the limitations of {primary_skill} and how do you work around them?"
+    elif level == "Senior":
+        return f"1. Design a system architecture using {primary_skill}.\n2. How would you scale {primary_skill} for high traffic?\n3. What best practices do you enforce for {primary_skill} usage?"
+    else:
+        return f"1. How do you evaluate {primary_skill} against alternatives?\n2. What's the long-term strategy for {primary_skill} in an organization?\n3. How do you manage technical debt with {primary_skill}?"
+
+@metrics.timed("followup_fallback")
+def get_scenario_fallback(role: str, level: str) -> str:
+    """Fallback scenario questions"""
+    if level == "Entry/Junior":
+        return "1. You're given a task you don't know how to do. What's your approach?\n2. You find a bug in code you didn't write. What do you do?\n3. You're stuck on a problem. How do you proceed?"
+    elif level == "Mid-Level":
+        return "1. A critical production issue occurs. Describe your troubleshooting process.\n2. You need to estimate a complex project. What's your approach?\n3. Requirements change mid-project. How do you handle it?"
+    elif level == "Senior":
+        return "1. Two teams have conflicting technical approaches. How do you resolve it?\n2. You need to migrate a critical system with zero downtime. Plan it.\n3. Technical debt is impacting velocity. What's your remediation plan?"
+    else:
+        return "1. Business wants to enter a new market. What's your technical strategy?\n2. You need to build a new engineering team. What's your plan?\n3. Multiple projects are competing for resources. How do you prioritize?"
+
+@metrics.timed("followup_fallback")
+def get_leadership_fallback(role: str, level: str) -> str:
+    """Fallback leadership questions"""
+    if level == "Entry/Junior":
+        return "1. How do you contribute to team success?\n2. Describe your ideal team environment.\n3. How do you handle working with diverse team members?"
+    elif level == "Mid-Level":
+        return "1. How do you help junior team members grow?\n2. Describe your approach to code reviews and knowledge sharing.\n3. How do you build consensus on technical decisions?"
+    elif level == "Senior":
+        return "1. How do you develop technical talent in your team?\n2. Describe your approach to technical strategy and roadmap.\n3. How do you balance innovation with stability?"
+    else:
+        return "1. How do you build engineering culture and values?\n2. Describe your approach to executive communication.\n3. How do you measure and improve team performance?"
+
+# Follow-up dispatch registry: question type -> fallback generator(role, skills, level)
+FOLLOWUP_GENERATORS = {
+    "behavioral": lambda role, skills, level: get_behavioral_fallback(role, level),
+    "technical_depth": get_technical_fallback,
+    "scenario": lambda role, skills, level: get_scenario_fallback(role, level),
+    "leadership": lambda role, skills, level: get_leadership_fallback(role, level)
+}
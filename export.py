@@ -0,0 +1,250 @@
+import argparse
+import atexit
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+from results import QuestionPack
+
+FORMATS = ("md", "html", "pdf")
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", 0)) or os.cpu_count() or 1
+# Download archives kept on disk; older ones are deleted as new ones are written
+TEMPFILE_KEEP = 16
+
+_HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>body {{ font-family: sans-serif; max-width: 46em; margin: 2em auto; line-height: 1.5; }}</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+_pool: Optional[ProcessPoolExecutor] = None
+_tempdir: Optional[tempfile.TemporaryDirectory] = None
+_tempfiles = deque()
+_tempfiles_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by exports, started on first use"""
+    global _pool
+    if _pool is None:
+        # Spawned, not forked: the UI process has event loop, client and profiler threads a fork would copy mid-state
+        _pool = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+class ExportSummary:
+    """Counters reported at the end of an export"""
+
+    __slots__ = ("packs", "files", "bytes", "elapsed")
+
+    def __init__(self):
+        self.packs = 0
+        self.files = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "pack"
+
+
+def _pdf_escape(text: str) -> str:
+    # The built-in PDF fonts only cover Latin-1
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def markdown_to_pdf(markdown_text: str) -> bytes:
+    """Lay out Markdown headings, paragraphs and list items as a plain Letter-size PDF
+
+    Only what rendered packs use is supported: '#' headings, '**' emphasis
+    (dropped) and wrapped text in the built-in Helvetica fonts.
+    """
+    width, height, margin = 612, 792, 72
+    pages, lines, y = [], [], height - margin
+    for raw in markdown_text.splitlines():
+        heading = re.match(r"(#+)\s+(.*)", raw)
+        if heading:
+            font, size, text = "F2", (18 if len(heading.group(1)) == 1 else 14), heading.group(2)
+        else:
+            font, size, text = "F1", 11, raw.replace("**", "").rstrip()
+        leading = size * 1.4
+        # Helvetica averages about half an em per character
+        wrapped = textwrap.wrap(text, int((width - 2 * margin) / (size * 0.5))) or [""]
+        for number, part in enumerate(wrapped):
+            if y - leading < margin:
+                pages.append(lines)
+                lines, y = [], height - margin
+            y -= leading
+            indent = 14 if number and re.match(r"(\d+\.|-) ", text) else 0
+            lines.append(f"BT /{font} {size} Tf {margin + indent} {y:.1f} Td ({_pdf_escape(part)}) Tj ET")
+    pages.append(lines)
+
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        stream = "\n".join(page).encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("latin-1")
+        out += body if isinstance(body, bytes) else body.encode("latin-1")
+        out += b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def render_documents(pack_data: Dict, formats: Sequence[str]) -> Dict[str, bytes]:
+    """Render one pack (as QuestionPack.to_dict()) in each format; runs in the pool's worker processes"""
+    pack = QuestionPack.from_dict(pack_data)
+    documents = {}
+    if "md" in formats:
+        documents["md"] = pack.markdown.encode("utf-8")
+    if "html" in formats:
+        import markdown
+
+        # Role, skills and model text are untrusted, so any HTML in them is shown as text
+        body = markdown.markdown(html.escape(pack.markdown, quote=False))
+        title = html.escape(f"Interview Questions for {pack.role}")
+        documents["html"] = _HTML_PAGE.format(title=title, body=body).encode("utf-8")
+    if "pdf" in formats:
+        documents["pdf"] = markdown_to_pdf(pack.markdown)
+    return documents
+
+
+def export_zip(
+    packs: Iterable[QuestionPack],
+    path: str,
+    formats: Sequence[str] = ("md",),
+    pool: Optional[ProcessPoolExecutor] = None,
+    max_pending: Optional[int] = None,
+) -> ExportSummary:
+    """Render packs on a process pool and stream the documents into a zip archive at ``path``
+
+    Packs are consumed lazily and at most ``max_pending`` (default four per
+    worker) are rendering at a time; each pack's documents are written as soon
+    as it and the packs before it are done, so memory use doesn't grow with
+    the number of packs.
+    """
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"unknown export format(s): {', '.join(unknown)}")
+    pool = pool or get_pool()
+    max_pending = max_pending or EXPORT_WORKERS * 4
+    summary = ExportSummary()
+    start = time.perf_counter()
+    pending = deque()
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        def write(index: int, pack: QuestionPack, future):
+            stem = f"{index:04d}-{_slug(pack.role)}-{_slug(pack.level)}"
+            for ext, data in future.result().items():
+                archive.writestr(f"{stem}.{ext}", data)
+                summary.files += 1
+                summary.bytes += len(data)
+
+        for index, pack in enumerate(packs, start=1):
+            summary.packs += 1
+            pending.append((index, pack, pool.submit(render_documents, pack.to_dict(), tuple(formats))))
+            while len(pending) >= max_pending:
+                write(*pending.popleft())
+        while pending:
+            write(*pending.popleft())
+
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def export_to_tempfile(packs: Iterable[QuestionPack], formats: Sequence[str] = FORMATS) -> str:
+    """Export to a new zip file and return its path, for download links
+
+    The files live in one temporary directory per process, removed at exit;
+    only the last TEMPFILE_KEEP of them are kept until then.
+    """
+    global _tempdir
+    with _tempfiles_lock:
+        if _tempdir is None:
+            _tempdir = tempfile.TemporaryDirectory(prefix="interview-questions-")
+            atexit.register(_tempdir.cleanup)
+        fd, path = tempfile.mkstemp(suffix=".zip", dir=_tempdir.name)
+        os.close(fd)
+        _tempfiles.append(path)
+        stale = [_tempfiles.popleft() for _ in range(len(_tempfiles) - TEMPFILE_KEEP)]
+    for old in stale:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    try:
+        export_zip(packs, path, formats)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def iter_jsonl_packs(path: str) -> Iterator[QuestionPack]:
+    """Stream the packs from `app.py batch --structured` output, skipping failed and text-only rows"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if "pack" in record:
+                yield QuestionPack.from_dict(record["pack"])
+
+
+def main(argv) -> int:
+    """Entry point for `python app.py export packs.jsonl packs.zip`"""
+    parser = argparse.ArgumentParser(
+        prog="app.py export",
+        description="Render the packs written by `app.py batch --structured` into a zip of documents",
+    )
+    parser.add_argument("input", help="JSON Lines file from `app.py batch --structured`")
+    parser.add_argument("output", help="zip archive to write")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args(argv)
+
+    try:
+        summary = export_zip(iter_jsonl_packs(args.input), args.output, args.formats)
+    except (OSError, ValueError) as e:
+        print(f"Export Error: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(summary.as_dict()), file=sys.stderr)
+    return 0
@@ -0,0 +1,350 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from inference_client import InferenceError
+
+
+class UpstreamTimeoutError(InferenceError):
+    """Raised when no upstream attempt answered within the adaptive timeout"""
+
+
+class LatencyTracker:
+    """Durations of the most recent successful upstream calls"""
+
+    def __init__(self, window: int = 256):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile (0-1) of the window; None before any call was observed"""
+        with self._lock:
+            values = sorted(self._samples)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Hedger:
+    """Hedged upstream calls with a timeout adapted to observed latency
+
+    Once ``min_samples`` calls have been observed, a call still unanswered at
+    the ``hedge_percentile`` latency gets a duplicate sent (if ``hedge`` is on
+    and fewer than ``budget`` of calls have been hedged so far), and whichever
+    attempt answers first is used. A call with no answer after
+    ``timeout_factor`` times the p99 latency, and never later than ``slo``
+    seconds, fails with UpstreamTimeoutError so the caller can use the
+    fallback. Attempts still running then finish in the background, so a
+    late answer can still be cached.
+    """
+
+    def __init__(
+        self,
+        hedge: bool = True,
+        slo: float = 30.0,
+        hedge_percentile: float = 0.95,
+        timeout_factor: float = 3.0,
+        min_timeout: float = 0.5,
+        budget: float = 0.1,
+        min_samples: int = 20,
+        workers: int = 64,
+    ):
+        self.hedge = hedge
+        self.slo = slo
+        self.hedge_percentile = hedge_percentile
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.budget = budget
+        self.min_samples = min_samples
+        self.workers = workers
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+        self.timeouts = 0
+        self._pool = None
+        self._background = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["Hedger"]:
+        """Build a hedger from HEDGE_* / UPSTREAM_* variables; None unless HEDGE_ENABLED or UPSTREAM_SLO is set"""
+        hedge = os.environ.get("HEDGE_ENABLED", "").lower() in ("1", "true", "yes", "on")
+        slo = float(os.environ.get("UPSTREAM_SLO", 0))
+        if not hedge and slo <= 0:
+            return None
+        return cls(
+            hedge=hedge,
+            slo=slo if slo > 0 else float(os.environ.get("HF_TOTAL_TIMEOUT", 30.0)),
+            hedge_percentile=float(os.environ.get("HEDGE_PERCENTILE", 95)) / 100,
+            timeout_factor=float(os.environ.get("UPSTREAM_TIMEOUT_FACTOR", 3.0)),
+            budget=float(os.environ.get("HEDGE_BUDGET", 0.1)),
+            min_samples=int(os.environ.get("HEDGE_MIN_SAMPLES", 20)),
+        )
+
+    def observe(self, seconds: float):
+        """Record how long a successful upstream call took"""
+        self.latency.observe(seconds)
+
+    def timeout(self) -> float:
+        """Seconds to wait for an answer: a multiple of the p99 latency, within [min_timeout, slo]"""
+        if len(self.latency) < self.min_samples:
+            return self.slo
+        return min(self.slo, max(self.min_timeout, self.timeout_factor * self.latency.percentile(0.99)))
+
+    def hedge_delay(self, timeout: float) -> Optional[float]:
+        """Seconds after which a duplicate is sent; None while hedging is off or latency is unknown"""
+        if not self.hedge or len(self.latency) < self.min_samples:
+            return None
+        # Late enough to skip most calls, early enough for a typical duplicate to beat the timeout
+        delay = min(self.latency.percentile(self.hedge_percentile), timeout - self.latency.percentile(0.5))
+        return delay if delay > 0 else None
+
+    def _start(self):
+        with self._lock:
+            self.calls += 1
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged >= self.budget * self.calls:
+                self.over_budget += 1
+                return False
+            self.hedged += 1
+            return True
+
+    def _finish(self, attempt: int, result):
+        if attempt:
+            with self._lock:
+                self.hedge_wins += 1
+        return result
+
+    def _timed_out(self, timeout: float, error: Optional[BaseException]):
+        if error is not None:
+            raise error
+        with self._lock:
+            self.timeouts += 1
+        raise UpstreamTimeoutError(f"No upstream answer within {timeout:.2f}s")
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upstream")
+        return self._pool
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) on a worker thread, hedged and bounded by the adaptive timeout"""
+        self._start()
+        timeout = self.timeout()
+        deadline = time.monotonic() + timeout
+        delay = self.hedge_delay(timeout)
+        pool = self._get_pool()
+        attempts = [pool.submit(fn, *args)]
+        if delay is not None:
+            done, _ = wait(attempts, timeout=delay)
+            if not done and self._take_hedge():
+                attempts.append(pool.submit(fn, *args))
+
+        pending = set(attempts)
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return self._finish(attempts.index(future), future.result())
+                error = future.exception()
+        self._timed_out(timeout, None if pending else error)
+
+    async def acall(self, fn: Callable[..., Any], *args) -> Any:
+        """Async version of call(); fn is a coroutine function
+
+        The attempt that loses a race is cancelled; attempts still running at
+        the timeout carry on as background tasks.
+        """
+        self._start()
+        timeout = self.timeout()
+        deadline = time.monotonic() + timeout
+        delay = self.hedge_delay(timeout)
+        attempts = [asyncio.ensure_future(fn(*args))]
+        pending = set(attempts)
+        error = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._take_hedge():
+                    attempts.append(asyncio.ensure_future(fn(*args)))
+                    pending = set(attempts)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        for loser in pending:
+                            loser.cancel()
+                        return self._finish(attempts.index(task), task.result())
+                    error = task.exception()
+        except asyncio.CancelledError:
+            for task in pending:
+                task.cancel()
+            raise
+        for task in pending:
+            # Keep a reference until the task ends, and consume its outcome so it isn't logged as unhandled
+            self._background.add(task)
+            task.add_done_callback(self._discard)
+        self._timed_out(timeout, None if pending else error)
+
+    def stream(self, open_stream: Callable[..., Iterator], *args) -> Iterator:
+        """Iterate open_stream(*args), with the wait for its first chunk hedged and bounded like call()
+
+        Each attempt opens its own stream on a worker thread; the first to
+        produce a chunk is iterated by the caller and the others are closed.
+        Latency here is time to first chunk, so a streaming hedger should not
+        also time whole calls.
+        """
+        self._start()
+        timeout = self.timeout()
+        deadline = time.monotonic() + timeout
+        delay = self.hedge_delay(timeout)
+
+        def first_chunk():
+            start = time.monotonic()
+            stream = open_stream(*args)
+            try:
+                chunk = next(stream)
+            except StopIteration:
+                chunk = None
+            except BaseException:
+                stream.close()
+                raise
+            self.observe(time.monotonic() - start)
+            return chunk, stream
+
+        pool = self._get_pool()
+        attempts = [pool.submit(first_chunk)]
+        if delay is not None:
+            done, _ = wait(attempts, timeout=delay)
+            if not done and self._take_hedge():
+                attempts.append(pool.submit(first_chunk))
+
+        pending = set(attempts)
+        winner = error = None
+        while pending and winner is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                elif winner is None:
+                    winner = future
+        for future in attempts:
+            if future is not winner:
+                # Streams that answer after the race, or after the timeout, are closed when they do
+                future.cancel()
+                future.add_done_callback(self._close_attempt)
+        if winner is None:
+            self._timed_out(timeout, None if pending else error)
+        chunk, stream = self._finish(attempts.index(winner), winner.result())
+        try:
+            if chunk is not None:
+                yield chunk
+                yield from stream
+        finally:
+            stream.close()
+
+    @staticmethod
+    def _close_attempt(future):
+        if not future.cancelled() and future.exception() is None:
+            future.result()[1].close()
+
+    async def astream(self, open_stream: Callable[..., AsyncIterator], *args) -> AsyncIterator:
+        """Async version of stream(); open_stream is an async generator function
+
+        Attempts that lose the race or are still waiting at the timeout are
+        cancelled and their streams closed.
+        """
+        self._start()
+        timeout = self.timeout()
+        deadline = time.monotonic() + timeout
+        delay = self.hedge_delay(timeout)
+
+        async def first_chunk():
+            start = time.monotonic()
+            stream = open_stream(*args)
+            try:
+                chunk = await stream.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+            except BaseException:
+                await stream.aclose()
+                raise
+            self.observe(time.monotonic() - start)
+            return chunk, stream
+
+        attempts = [asyncio.ensure_future(first_chunk())]
+        pending = set(attempts)
+        winner = error = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._take_hedge():
+                    attempts.append(asyncio.ensure_future(first_chunk()))
+                    pending = set(attempts)
+            while pending and winner is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task
+        finally:
+            losers = [task for task in attempts if task is not winner]
+            for task in losers:
+                task.cancel()
+            await asyncio.gather(*losers, return_exceptions=True)
+            for task in losers:
+                if not task.cancelled() and task.exception() is None:
+                    await task.result()[1].aclose()
+        if winner is None:
+            self._timed_out(timeout, None if pending else error)
+        chunk, stream = self._finish(attempts.index(winner), winner.result())
+        try:
+            if chunk is not None:
+                yield chunk
+                async for chunk in stream:
+                    yield chunk
+        finally:
+            await stream.aclose()
+
+    def _discard(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "calls": self.calls, "hedged": self.hedged, "hedge_wins": self.hedge_wins,
+                "over_budget": self.over_budget, "timeouts": self.timeouts,
+            }
@@ -0,0 +1,179 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dedup import DedupIndex
+
+QUESTIONS = "questions"
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*\S)")
+
+
+def numbered_questions(text: str) -> List[str]:
+    """The numbered lines of a rendered pack or follow-up list, without their numbers"""
+    return [match.group(1) for match in map(_NUMBERED.match, text.splitlines()) if match]
+
+
+class HistoryEntry:
+    """One result shown in a session: the main questions or a round of follow-ups"""
+
+    __slots__ = ("role", "skills", "level", "kind", "text", "questions", "created")
+
+    def __init__(self, role: str, skills: str, level: str, kind: str, text: str,
+                 questions: Sequence[str], created: Optional[float] = None):
+        self.role = role
+        self.skills = skills
+        self.level = level
+        self.kind = kind
+        self.text = text
+        self.questions = tuple(questions)
+        self.created = created if created is not None else time.time()
+
+    @property
+    def view(self) -> Tuple[str, str, str]:
+        return (self.role, self.skills, self.level)
+
+
+class SessionHistory:
+    """The most recent results of one UI session, oldest first, in a ring buffer
+
+    Keeps a near-duplicate index of every question still in the buffer, so
+    new questions can be checked against all those already served. The index
+    is rebuilt when an entry falls out of the buffer.
+    """
+
+    def __init__(self, capacity: int = 50, threshold: float = 0.7):
+        self.entries = deque(maxlen=capacity)
+        self.threshold = threshold
+        self._served: Optional[DedupIndex] = None
+        self._lock = threading.Lock()
+
+    def add(self, entry: HistoryEntry):
+        with self._lock:
+            if len(self.entries) == self.entries.maxlen:
+                self._served = None
+            self.entries.append(entry)
+            if self._served is not None:
+                for question in entry.questions:
+                    self._served.add_if_new(question)
+
+    def served(self) -> DedupIndex:
+        """Index of the questions served so far; checking a question with add_if_new also marks it served"""
+        with self._lock:
+            if self._served is None:
+                self._served = DedupIndex(self.threshold)
+                for entry in self.entries:
+                    for question in entry.questions:
+                        self._served.add_if_new(question)
+            return self._served
+
+    def latest(self, role: str, skills: str, level: str, kind: str = QUESTIONS) -> Optional[HistoryEntry]:
+        with self._lock:
+            for entry in reversed(self.entries):
+                if entry.kind == kind and entry.view == (role, skills, level):
+                    return entry
+        return None
+
+    def followups(self, role: str, skills: str, level: str) -> List[HistoryEntry]:
+        """Follow-up rounds shown for a role, skills and level, oldest first"""
+        with self._lock:
+            return [entry for entry in self.entries if entry.kind != QUESTIONS and entry.view == (role, skills, level)]
+
+    def rounds(self, role: str, skills: str, level: str, kind: str) -> int:
+        """How many times results of this kind were shown for a role, skills and level"""
+        with self._lock:
+            return sum(1 for entry in self.entries if entry.kind == kind and entry.view == (role, skills, level))
+
+
+class HistoryStore:
+    """Session histories by session id
+
+    The ``max_sessions`` most recently used sessions are kept in memory. With
+    a SQLite ``path`` every entry is also written to the file, and a session
+    not in memory is loaded from it, so histories survive restarts.
+    """
+
+    def __init__(self, capacity: int = 50, max_sessions: int = 1000, path: Optional[str] = None, threshold: float = 0.7):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self.threshold = threshold
+        self.path = path
+        self._sessions: "OrderedDict[str, SessionHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS history (session TEXT NOT NULL, role TEXT, skills TEXT, level TEXT,"
+                " kind TEXT, text TEXT, questions TEXT, created REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS history_session ON history (session)")
+
+    @classmethod
+    def from_env(cls, threshold: float = 0.7) -> "HistoryStore":
+        """Build a store from HISTORY_* environment variables"""
+        return cls(
+            capacity=int(os.environ.get("HISTORY_SIZE", 50)),
+            max_sessions=int(os.environ.get("HISTORY_SESSIONS", 1000)),
+            path=os.environ.get("HISTORY_DB") or None,
+            threshold=threshold,
+        )
+
+    def session(self, session_id: str) -> SessionHistory:
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is not None:
+                self._sessions.move_to_end(session_id)
+                return history
+            history = SessionHistory(self.capacity, self.threshold)
+            for entry in self._load(session_id):
+                history.add(entry)
+            self._sessions[session_id] = history
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return history
+
+    def record(self, session_id: str, role: str, skills: str, level: str, kind: str, text: str,
+               questions: Optional[Sequence[str]] = None) -> HistoryEntry:
+        """Add a shown result to a session; questions default to the numbered lines of the text"""
+        entry = HistoryEntry(role, skills, level, kind, text,
+                             numbered_questions(text) if questions is None else questions)
+        self.session(session_id).add(entry)
+        if self._conn is not None:
+            self._save(session_id, entry)
+        return entry
+
+    def _load(self, session_id: str) -> List[HistoryEntry]:
+        if self._conn is None:
+            return []
+        rows = self._conn.execute(
+            "SELECT role, skills, level, kind, text, questions, created FROM history"
+            " WHERE session = ? ORDER BY rowid DESC LIMIT ?",
+            (session_id, self.capacity),
+        ).fetchall()
+        return [HistoryEntry(role, skills, level, kind, text, questions.split("\n") if questions else (), created)
+                for role, skills, level, kind, text, questions, created in reversed(rows)]
+
+    def _save(self, session_id: str, entry: HistoryEntry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO history (session, role, skills, level, kind, text, questions, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, entry.role, entry.skills, entry.level, entry.kind, entry.text,
+                 "\n".join(entry.questions), entry.created),
+            )
+            # Only the ring buffer's worth of entries is ever loaded, so older rows are dropped
+            self._conn.execute(
+                "DELETE FROM history WHERE session = ? AND rowid NOT IN"
+                " (SELECT rowid FROM history WHERE session = ? ORDER BY rowid DESC LIMIT ?)",
+                (session_id, session_id, self.capacity),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "entries": sum(len(h.entries) for h in self._sessions.values())}
@@ -0,0 +1,545 @@
+"""Clients for the Hugging Face Inference API
+
+InferenceClient (requests) and AsyncInferenceClient (aiohttp) share one retry
+policy: transient failures are retried with backoff within HF_TOTAL_TIMEOUT,
+a circuit breaker stops calls to an unhealthy endpoint, and a 429 starts a
+cool-down, kept in a store so every worker process backs off together.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import metrics
+
+
+class InferenceError(Exception):
+    """Raised when the inference endpoint cannot produce generated text"""
+
+
+class CircuitOpenError(InferenceError):
+    """Raised when the circuit breaker is rejecting calls to the endpoint"""
+
+
+class RateLimitedError(InferenceError):
+    """Raised while the endpoint's rate-limit cool-down (after a 429) is in effect"""
+
+
+class UpstreamCooldown:
+    """Back-off window set when the endpoint answers 429 Too Many Requests
+
+    The deadline is kept in a store (see store.py), so with a shared store every
+    worker process holds off, not just the one that was rate limited.
+    """
+
+    def __init__(self, store, key: str = "upstream:cooldown"):
+        self.store = store
+        self.key = key
+
+    def remaining(self) -> float:
+        until = self.store.get(self.key)
+        return max(0.0, float(until) - time.time()) if until is not None else 0.0
+
+    def start(self, seconds: float):
+        if seconds > 0:
+            self.store.set(self.key, repr(time.time() + seconds), ttl=seconds)
+
+
+class CircuitBreaker:
+    """Stop calling an unhealthy endpoint until a cool-down period has passed"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be made; lets one probe through after the cool-down"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Cool-down elapsed: allow a single probe request
+            if self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """End a call that neither succeeded nor failed, e.g. a cancelled one
+
+        Lets another probe through if it was the half-open probe; the state
+        and failure count are left as they were.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff delay for a retry attempt"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_event_stream(headers) -> bool:
+    """True if a response is a server-sent events stream"""
+    return headers.get("Content-Type", "").startswith("text/event-stream")
+
+
+def iter_stream_lines(response) -> Iterator[str]:
+    """Split a streamed requests response into lines as soon as bytes arrive"""
+    read1 = getattr(response.raw, "read1", None)
+    if read1 is None:
+        # urllib3 < 2 has no read1; single-byte chunks avoid waiting for a full buffer
+        yield from response.iter_lines(chunk_size=1, decode_unicode=True)
+        return
+    pending = b""
+    while True:
+        data = read1(8192)
+        if not data:
+            break
+        *lines, pending = (pending + data).split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if pending:
+        yield pending.decode("utf-8")
+
+
+def parse_stream_event(line: str) -> Optional[str]:
+    """Return the token text carried by one server-sent event line, if any"""
+    line = line.strip()
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    try:
+        event = json.loads(data)
+    except ValueError as e:
+        raise InferenceError("Malformed stream event") from e
+    if "error" in event:
+        raise InferenceError(f"Stream error: {event['error']}")
+    token = event.get("token") or {}
+    if token.get("special"):
+        return None
+    return token.get("text")
+
+
+def extract_generated_text(result: Any) -> Optional[str]:
+    """Pull the generated text out of an Inference API response payload"""
+    if isinstance(result, list) and len(result) > 0:
+        if isinstance(result[0], dict) and "generated_text" in result[0]:
+            return result[0]["generated_text"].strip()
+    return None
+
+
+class _RetryPolicy:
+    """Timeouts, retry and response handling shared by the sync and async clients"""
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        url: str,
+        token: Optional[str] = None,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        total_timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+        max_loading_wait: float = 10.0,
+        breaker: Optional[CircuitBreaker] = None,
+        cooldown: Optional[UpstreamCooldown] = None,
+    ):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_loading_wait = max_loading_wait
+        self.breaker = breaker or CircuitBreaker()
+        self.cooldown = cooldown
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    @staticmethod
+    def env_settings() -> Dict[str, Any]:
+        """Client settings read from HF_* environment variables"""
+        return {
+            "token": os.environ.get("HF_API_TOKEN"),
+            "connect_timeout": float(os.environ.get("HF_CONNECT_TIMEOUT", 3.05)),
+            "read_timeout": float(os.environ.get("HF_READ_TIMEOUT", 10.0)),
+            "total_timeout": float(os.environ.get("HF_TOTAL_TIMEOUT", 30.0)),
+            "max_retries": int(os.environ.get("HF_MAX_RETRIES", 2)),
+        }
+
+    def is_available(self) -> bool:
+        """False while the circuit breaker is open or a rate-limit cool-down is running"""
+        if self.cooldown is not None and self.cooldown.remaining() > 0:
+            return False
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def _check_allowed(self):
+        if self.cooldown is not None:
+            remaining = self.cooldown.remaining()
+            if remaining > 0:
+                metrics.UPSTREAM_RESPONSES.inc("rate_limited")
+                raise RateLimitedError(f"Rate limited by {self.url} for another {remaining:.1f}s")
+        if not self.breaker.allow_request():
+            metrics.UPSTREAM_RESPONSES.inc("circuit_open")
+            raise CircuitOpenError(f"Circuit open for {self.url}")
+
+    def _read_response(self, response) -> Optional[str]:
+        """Return generated text, None for a retryable status, or raise InferenceError"""
+        if response.status_code == 200:
+            try:
+                text = extract_generated_text(response.json())
+            except ValueError:
+                text = None
+            if text is None:
+                raise InferenceError("Unexpected response payload")
+            return text
+        if response.status_code not in self.RETRY_STATUSES:
+            raise InferenceError(f"HTTP {response.status_code}")
+        return None
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        """Delay before the next attempt: model loading time, Retry-After, or backoff"""
+        if response is not None:
+            delay = self._server_delay(response)
+            if delay is not None:
+                return delay
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+    def _retry_wait(self, attempt: int, response=None) -> float:
+        """Delay before the next attempt, at least as long as any rate-limit cool-down still running"""
+        delay = self._retry_delay(attempt, response)
+        if self.cooldown is not None:
+            delay = max(delay, self.cooldown.remaining())
+        return delay
+
+    def _note_rate_limit(self, response, attempt: int):
+        """Start the shared cool-down after a 429 so other callers skip the endpoint meanwhile"""
+        if self.cooldown is not None and response.status_code == 429:
+            self.cooldown.start(self._retry_delay(attempt, response))
+
+    def _server_delay(self, response) -> Optional[float]:
+        if response.status_code == 503:
+            try:
+                estimated = float(response.json().get("estimated_time"))
+            except (ValueError, TypeError, AttributeError):
+                estimated = None
+            if estimated is not None:
+                # Add jitter so waiting clients don't all retry at the same instant
+                return min(estimated, self.max_loading_wait) * random.uniform(1.0, 1.2)
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_loading_wait)
+            except ValueError:
+                return None
+        return None
+
+
+class InferenceClient(_RetryPolicy):
+    """Pooled, retrying client for the Hugging Face Inference API"""
+
+    def __init__(self, url: str, pool_size: int = 10, **kwargs):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        super().__init__(url, **kwargs)
+        self.session = requests.Session()
+        # Keep-alive connections are reused across calls and worker threads
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+
+    @classmethod
+    def from_env(cls, url: str, **kwargs) -> "InferenceClient":
+        """Build a client using HF_* environment variables for tuning"""
+        settings = cls.env_settings()
+        settings["pool_size"] = int(os.environ.get("HF_POOL_SIZE", 10))
+        settings.update(kwargs)
+        return cls(url, **settings)
+
+    def generate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        """Generate text for a prompt, retrying transient failures"""
+        self._check_allowed()
+        try:
+            response = self._post_with_retries({"inputs": prompt, "parameters": parameters})
+            text = self._read_response(response)
+        except InferenceError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Interrupted (KeyboardInterrupt, SystemExit) before an outcome
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        return text
+
+    def stream(self, prompt: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Yield generated text chunks as the server streams them
+
+        Retries happen only before the first byte. Endpoints that don't stream
+        answer with a normal JSON payload, which is yielded as a single chunk.
+        """
+        import requests
+
+        self._check_allowed()
+        try:
+            response = self._post_with_retries(
+                {"inputs": prompt, "parameters": parameters, "stream": True}, stream=True
+            )
+            with response:
+                if not is_event_stream(response.headers):
+                    yield self._read_response(response)
+                else:
+                    for line in iter_stream_lines(response):
+                        chunk = parse_stream_event(line)
+                        if chunk:
+                            yield chunk
+        except GeneratorExit:
+            # The consumer stopped reading; that says nothing about endpoint health
+            self.breaker.release_probe()
+            raise
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            raise InferenceError(f"{type(e).__name__}: {e}") from e
+        except InferenceError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+    def _post_with_retries(self, payload: Dict[str, Any], stream: bool = False):
+        """POST the payload, retrying transient failures; returns a 200 response"""
+        import requests
+
+        deadline = time.monotonic() + self.total_timeout
+        last_error = "no attempts made"
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            # No attempt may outlast the total timeout; requests bounds the connect and each read
+            left = deadline - time.monotonic()
+            timeout = (min(self.connect_timeout, left), min(self.read_timeout, left))
+            try:
+                response = self.session.post(self.url, json=payload, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.UPSTREAM_RESPONSES.inc(type(e).__name__)
+                last_error = f"{type(e).__name__}: {e}"
+            except requests.RequestException as e:
+                metrics.UPSTREAM_RESPONSES.inc(type(e).__name__)
+                raise InferenceError(f"{type(e).__name__}: {e}") from e
+            else:
+                metrics.UPSTREAM_RESPONSES.inc(str(response.status_code))
+                if response.status_code == 200:
+                    return response
+                self._note_rate_limit(response, attempt)
+                last_error = f"HTTP {response.status_code}"
+                if response.status_code not in self.RETRY_STATUSES:
+                    response.close()
+                    raise InferenceError(last_error)
+
+            if attempt == self.max_retries:
+                break
+            delay = self._retry_wait(attempt, response)
+            if response is not None:
+                response.close()
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+        raise InferenceError(f"Giving up after {attempt + 1} attempt(s): {last_error}")
+
+
+class _BufferedResponse:
+    """Fully-read async response exposing the parts of the requests.Response API we use"""
+
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code: int, headers, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class AsyncInferenceClient(_RetryPolicy):
+    """asyncio counterpart of InferenceClient with a cap on in-flight requests"""
+
+    def __init__(self, url: str, max_concurrency: int = 16, **kwargs):
+        super().__init__(url, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._session = None
+
+    @classmethod
+    def from_env(cls, url: str, **kwargs) -> "AsyncInferenceClient":
+        """Build a client using HF_* environment variables for tuning"""
+        settings = cls.env_settings()
+        settings["max_concurrency"] = int(os.environ.get("HF_MAX_CONCURRENCY", 16))
+        settings.update(kwargs)
+        return cls(url, **settings)
+
+    async def _ensure_session(self):
+        # aiohttp sessions are bound to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            import aiohttp
+
+            previous = self._session
+            self._loop = loop
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                # The connector limit is what caps concurrent upstream requests
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout,
+                ),
+            )
+            if previous is not None and not previous.closed:
+                # Its loop has usually finished already; closing it here still releases the connector
+                await previous.close()
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._loop = None
+
+    async def generate(self, prompt: str, parameters: Dict[str, Any]) -> str:
+        """Generate text for a prompt, retrying transient failures"""
+        import aiohttp
+
+        self._check_allowed()
+        try:
+            response = await self._post_with_retries({"inputs": prompt, "parameters": parameters})
+            async with response:
+                content = await response.read()
+            text = self._read_response(_BufferedResponse(response.status, response.headers, content))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure()
+            raise InferenceError(f"{type(e).__name__}: {e}") from e
+        except InferenceError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (a lost hedge race, a timed-out request) before an outcome
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        return text
+
+    async def stream(self, prompt: str, parameters: Dict[str, Any]) -> AsyncIterator[str]:
+        """Async version of InferenceClient.stream"""
+        import aiohttp
+
+        self._check_allowed()
+        try:
+            response = await self._post_with_retries(
+                {"inputs": prompt, "parameters": parameters, "stream": True}
+            )
+            async with response:
+                if not is_event_stream(response.headers):
+                    content = await response.read()
+                    yield self._read_response(_BufferedResponse(response.status, response.headers, content))
+                else:
+                    async for raw_line in response.content:
+                        chunk = parse_stream_event(raw_line.decode("utf-8"))
+                        if chunk:
+                            yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer stopped reading; that says nothing about endpoint health
+            self.breaker.release_probe()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure()
+            raise InferenceError(f"{type(e).__name__}: {e}") from e
+        except InferenceError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+    async def _post_with_retries(self, payload: Dict[str, Any]):
+        """POST the payload, retrying transient failures; returns an unread 200 response"""
+        import aiohttp
+
+        session = await self._ensure_session()
+        deadline = time.monotonic() + self.total_timeout
+        last_error = "no attempts made"
+
+        for attempt in range(self.max_retries + 1):
+            buffered = None
+            try:
+                # Bounded by the time left until the response headers; the body by sock_read
+                response = await asyncio.wait_for(session.post(self.url, json=payload), deadline - time.monotonic())
+                metrics.UPSTREAM_RESPONSES.inc(str(response.status))
+                if response.status == 200:
+                    return response
+                async with response:
+                    buffered = _BufferedResponse(response.status, response.headers, await response.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                metrics.UPSTREAM_RESPONSES.inc(type(e).__name__)
+                last_error = f"{type(e).__name__}: {e}"
+            except aiohttp.ClientError as e:
+                metrics.UPSTREAM_RESPONSES.inc(type(e).__name__)
+                raise InferenceError(f"{type(e).__name__}: {e}") from e
+            else:
+                self._note_rate_limit(buffered, attempt)
+                last_error = f"HTTP {buffered.status_code}"
+                if buffered.status_code not in self.RETRY_STATUSES:
+                    raise InferenceError(last_error)
+
+            if attempt == self.max_retries:
+                break
+            delay = self._retry_wait(attempt, buffered)
+            if time.monotonic() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+
+        raise InferenceError(f"Giving up after {attempt + 1} attempt(s): {last_error}")
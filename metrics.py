@@ -0,0 +1,252 @@
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; from sub-millisecond rendering up to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Latency histogram keyed by label values"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label: bucket counts (last slot is +Inf), sum, count
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for label_values, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {total!r}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {count}"
+
+
+class CallbackMetric:
+    """Metric whose values are read from a callback at scrape time
+
+    The callback returns a number, or a dict of label value -> number for a
+    metric with one label.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable, label: str = None):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.labels = (label,) if label else ()
+
+    def render(self) -> Iterator[str]:
+        values = self.fn()
+        if not self.labels:
+            yield f"{self.name} {_format_value(values)}"
+            return
+        for label_value, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labels, (label_value,))} {_format_value(value)}"
+
+
+class _NullMetric:
+    """Stand-in used when metrics are disabled; every call is a no-op"""
+
+    def inc(self, *label_values, amount: float = 1):
+        pass
+
+    def observe(self, *label_values, value: float):
+        pass
+
+
+NULL_METRIC = _NullMetric()
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics = []
+
+    def _register(self, metric):
+        if not self.enabled:
+            return NULL_METRIC
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, help: str, fn: Callable, kind: str = "gauge", label: str = None):
+        return self._register(CallbackMetric(name, help, kind, fn, label))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def enabled_from_env() -> bool:
+    return os.environ.get("METRICS_ENABLED", "").lower() in ("1", "true", "yes", "on")
+
+
+REGISTRY = MetricsRegistry(enabled=enabled_from_env())
+ENABLED = REGISTRY.enabled
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "interview_stage_latency_seconds", "Time spent in each stage of answering a request", ("stage",)
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "interview_upstream_responses_total", "Inference API attempts by HTTP status or transport error", ("status",)
+)
+ANSWERS = REGISTRY.counter(
+    "interview_answers_total", "Answers returned, by request kind and source (model or fallback)", ("kind", "source")
+)
+PROMPT_TOKENS = REGISTRY.histogram(
+    "interview_prompt_tokens", "Size of prompts sent to the model, by prompt type and A/B variant", ("type", "variant"),
+    buckets=(16, 32, 48, 64, 96, 128, 192, 256, 384, 512),
+)
+LIMITER_REJECTIONS = REGISTRY.counter(
+    "interview_limiter_rejections_total", "Upstream calls sent to the fallback by the rate limiter, by priority and reason",
+    ("priority", "reason"),
+)
+
+
+def timed(stage: str) -> Callable:
+    """Decorator recording a function's wall time in STAGE_LATENCY
+
+    Generators are timed from the first next() until they finish or are closed.
+    When metrics are disabled the function is returned unwrapped.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+        observe = STAGE_LATENCY.observe
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def async_gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                inner = fn(*args, **kwargs)
+                try:
+                    async for item in inner:
+                        yield item
+                finally:
+                    # Unlike yield from, async for doesn't close the inner generator for us
+                    await inner.aclose()
+                    observe(stage, value=time.perf_counter() - start)
+            return async_gen_wrapper
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    yield from fn(*args, **kwargs)
+                finally:
+                    observe(stage, value=time.perf_counter() - start)
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    observe(stage, value=time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, value=time.perf_counter() - start)
+        return wrapper
+
+    return decorate
+
+
+def register_stats(name: str, help: str, fn: Callable[[], Dict[str, float]], label: str, kind: str = "counter"):
+    """Expose a component's stats() dict (cache, single-flight, ...) as one labelled metric"""
+    REGISTRY.callback(name, help, fn, kind=kind, label=label)
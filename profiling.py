@@ -0,0 +1,325 @@
+"""Sampling profiler for slow UI requests
+
+Off unless PROFILE_SLOW_MS is set. While a profiled handler runs, a
+background thread samples its stack every PROFILE_INTERVAL_MS; requests that
+take longer than PROFILE_SLOW_MS keep their samples, the last PROFILE_KEEP
+of them, for download as speedscope JSON or folded stacks for flamegraph
+tools. Faster requests are discarded.
+"""
+import functools
+import gc
+import inspect
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import types
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", 0))
+ENABLED = SLOW_MS > 0
+INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS", 5)) / 1000
+KEEP = int(os.environ.get("PROFILE_KEEP", 20))
+
+
+async def _agen():
+    yield
+
+
+# How to step along an await chain, by type: (frame, what it is awaiting) for
+# coroutines and generators, which cover nearly every link
+_LINKS = {
+    types.CoroutineType: lambda coro: (coro.cr_frame, coro.cr_await),
+    types.AsyncGeneratorType: lambda agen: (agen.ag_frame, agen.ag_await),
+    types.GeneratorType: lambda gen: (gen.gi_frame, gen.gi_yieldfrom),
+}
+# `async for` awaits an asend/athrow object, which only refers to its generator internally
+_AGEN_WRAPPERS = (type(_agen().asend(None)), type(_agen().athrow(GeneratorExit)))
+
+
+def _generator_of(wrapper, seen: dict, found: dict):
+    """The async generator behind an asend/athrow object, looked up once per object
+
+    ``seen`` holds the lookups of the previous sample and ``found`` collects
+    this sample's, so only the wrappers still on the chain are kept.
+    """
+    key = id(wrapper)
+    entry = seen.get(key)
+    if entry is None or entry[0] is not wrapper:
+        entry = (wrapper, next((ref for ref in gc.get_referents(wrapper) if hasattr(ref, "ag_frame")), None))
+    found[key] = entry
+    return entry[1]
+
+
+def _await_chain(awaitable, seen: dict, found: dict) -> list:
+    """Frames of a coroutine or async generator and of whatever it is awaiting, outermost first"""
+    frames = []
+    while awaitable is not None:
+        link = _LINKS.get(type(awaitable))
+        if link is not None:
+            frame, awaitable = link(awaitable)
+            if frame is not None:
+                frames.append(frame)
+        elif isinstance(awaitable, _AGEN_WRAPPERS):
+            awaitable = _generator_of(awaitable, seen, found)
+        elif hasattr(awaitable, "get_coro"):
+            awaitable = awaitable.get_coro()
+        else:
+            # Coroutine-like objects of other types, e.g. from Cython
+            frame = (getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None)
+                     or getattr(awaitable, "gi_frame", None))
+            if frame is None:
+                break
+            frames.append(frame)
+            awaitable = next((inner for inner in (getattr(awaitable, attr, None)
+                                                  for attr in ("cr_await", "ag_await", "gi_yieldfrom"))
+                              if inner is not None), None)
+    return frames
+
+
+def _thread_frames(thread_id: int, stop) -> list:
+    """Frames of a thread's current stack below ``stop``, outermost first; empty if ``stop`` isn't on it"""
+    frame = sys._current_frames().get(thread_id)
+    frames = []
+    while frame is not None and frame is not stop:
+        frames.append(frame)
+        frame = frame.f_back
+    if frame is None:
+        return []
+    frames.reverse()
+    return frames
+
+
+class _Active:
+    """A handler call being sampled"""
+
+    __slots__ = ("name", "thread_id", "root", "frame", "samples", "times", "started", "wall", "generators")
+
+    def __init__(self, name: str, root=None, frame=None):
+        self.name = name
+        self.thread_id = threading.get_ident()
+        # Async handlers are sampled through their await chain, sync ones through their thread's stack
+        self.root = root
+        self.frame = frame
+        self.samples: List[tuple] = []
+        self.times: List[float] = []
+        self.started = time.perf_counter()
+        self.wall = time.time()
+        self.generators: Dict[int, tuple] = {}
+
+    def sample(self) -> Optional[tuple]:
+        if self.root is None:
+            frames = _thread_frames(self.thread_id, self.frame)
+        else:
+            found = {}
+            frames = _await_chain(self.root, self.generators, found)
+            self.generators = found
+            if frames:
+                # When the handler is on the CPU its thread's stack continues below the await chain
+                frames += _thread_frames(self.thread_id, frames[-1])
+        if frames:
+            return tuple(frame.f_code for frame in frames)
+        return None
+
+
+class Profile:
+    """Stack samples of one slow request"""
+
+    __slots__ = ("id", "name", "started", "duration", "samples", "times")
+
+    def __init__(self, profile_id: int, name: str, started: float, duration: float, samples, times):
+        self.id = profile_id
+        self.name = name
+        self.started = started
+        self.duration = duration
+        self.samples: List[tuple] = samples
+        # Seconds into the request each sample was taken
+        self.times: List[float] = times
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id, "name": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "duration_ms": round(self.duration * 1000, 1), "samples": len(self.samples),
+        }
+
+    @staticmethod
+    def _frame_name(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def folded(self) -> str:
+        """Collapsed stacks ("outer;inner count" per line), as read by flamegraph.pl, inferno and speedscope"""
+        counts: Dict[tuple, int] = {}
+        for stack in self.samples:
+            counts[stack] = counts.get(stack, 0) + 1
+        return "".join(f"{';'.join(map(self._frame_name, stack))} {count}\n" for stack, count in counts.items())
+
+    def speedscope(self) -> Dict:
+        """The profile in speedscope's file format (https://www.speedscope.app)"""
+        index: Dict[object, int] = {}
+        frames = []
+        samples = []
+        for stack in self.samples:
+            ids = []
+            for code in stack:
+                if code not in index:
+                    index[code] = len(frames)
+                    frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+                ids.append(index[code])
+            samples.append(ids)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.name} #{self.id}",
+            "activeProfileIndex": 0,
+            "exporter": "interview-question-generator",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": samples,
+                # Each sample stands for the time since the previous one, which stretches under GIL contention
+                "weights": [end - start for start, end in zip([0.0] + self.times, self.times)],
+            }],
+        }
+
+
+class SlowRequestProfiler:
+    """Samples every running handler; keeps the samples of the last ``keep`` requests over ``threshold`` seconds
+
+    One daemon thread does the sampling, and only while a handler is running.
+    """
+
+    def __init__(self, threshold: float, interval: float = 0.005, keep: int = 20):
+        self.threshold = threshold
+        self.interval = interval
+        self.profiles = deque(maxlen=keep)
+        self.requests = 0
+        self.captured = 0
+        self._active: Dict[int, _Active] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    def start(self, name: str, root=None, frame=None) -> _Active:
+        active = _Active(name, root, frame)
+        with self._lock:
+            self.requests += 1
+            self._active[id(active)] = active
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return active
+
+    def stop(self, active: _Active) -> Optional[Profile]:
+        duration = time.perf_counter() - active.started
+        with self._lock:
+            self._active.pop(id(active), None)
+            if duration < self.threshold or not active.samples:
+                return None
+            self.captured += 1
+            count = min(len(active.samples), len(active.times))
+            profile = Profile(next(self._ids), active.name, active.wall, duration, active.samples[:count],
+                              [at - active.started for at in active.times[:count]])
+            self.profiles.append(profile)
+        return profile
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._wakeup.wait()
+                running = list(self._active.values())
+            for active in running:
+                stack = active.sample()
+                if stack is not None:
+                    active.samples.append(stack)
+                    active.times.append(time.perf_counter())
+            time.sleep(self.interval)
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        with self._lock:
+            return next((profile for profile in self.profiles if profile.id == profile_id), None)
+
+    def summaries(self) -> List[Dict]:
+        """Kept profiles, newest first"""
+        with self._lock:
+            return [profile.summary() for profile in reversed(self.profiles)]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.requests, "captured": self.captured, "kept": len(self.profiles)}
+
+
+PROFILER = SlowRequestProfiler(SLOW_MS / 1000, INTERVAL, KEEP) if ENABLED else None
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """Decorator sampling a handler's stack while it runs; see SlowRequestProfiler
+
+    Works on sync and async functions and generators. Gradio inspects
+    handlers' signatures and kind, so the wrapper keeps both. When profiling
+    is disabled the function is returned unwrapped.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def async_gen_wrapper(*args, **kwargs):
+                inner = fn(*args, **kwargs)
+                active = PROFILER.start(label, root=inner)
+                try:
+                    async for item in inner:
+                        yield item
+                finally:
+                    await inner.aclose()
+                    PROFILER.stop(active)
+            return async_gen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                inner = fn(*args, **kwargs)
+                active = PROFILER.start(label, root=inner)
+                try:
+                    return await inner
+                finally:
+                    PROFILER.stop(active)
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                inner = fn(*args, **kwargs)
+                active = PROFILER.start(label, root=inner)
+                try:
+                    yield from inner
+                finally:
+                    PROFILER.stop(active)
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            active = PROFILER.start(label, frame=sys._getframe())
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.stop(active)
+        return wrapper
+
+    return decorate
+
+
+def dumps_speedscope(profile: Profile) -> bytes:
+    return json.dumps(profile.speedscope(), separators=(",", ":")).encode("utf-8")
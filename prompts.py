@@ -0,0 +1,199 @@
+import argparse
+import functools
+import json
+import os
+import re
+import sys
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_VARIANT = "a"
+MAX_COMPILED = 4096
+PROMPT_TOKENIZER = os.environ.get("PROMPT_TOKENIZER")
+
+_FIELD = re.compile(r"\{(\w+)\}")
+_SPACES = re.compile(r"[ \t]+")
+# Rough stand-in for a subword tokenizer: words, punctuation marks, line breaks and
+# runs of spaces (which BPE tokenizers encode as tokens of their own)
+_TOKEN = re.compile(r"\w+|[^\w\s]|\n| {2,}")
+
+
+def minimize_whitespace(text: str) -> str:
+    """Strip indentation and blank lines, and collapse runs of spaces"""
+    lines = (_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tokenizer(name: str):
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(name)
+
+
+def count_tokens(text: str) -> int:
+    """Prompt length in tokens
+
+    Uses the Hugging Face tokenizer named by PROMPT_TOKENIZER (e.g.
+    google/flan-t5-small; needs `pip install transformers`) when set, else
+    estimates from words, punctuation and whitespace runs, which is close
+    enough to compare prompts.
+    """
+    if PROMPT_TOKENIZER:
+        return len(_load_tokenizer(PROMPT_TOKENIZER).encode(text))
+    return len(_TOKEN.findall(text))
+
+
+class CompiledPrompt:
+    """A whitespace-minimized template with its static fields filled in, split around the per-request ones"""
+
+    __slots__ = ("parts", "fields", "static_tokens", "raw_tokens")
+
+    def __init__(self, template: str, context: Dict[str, str]):
+        # The template as written, with static fields filled and per-request ones left out, for comparison
+        self.raw_tokens = count_tokens(_FIELD.sub(lambda match: context.get(match.group(1), ""), template))
+        text = minimize_whitespace(template)
+        parts = []
+        position = 0
+        for match in _FIELD.finditer(text):
+            name = match.group(1)
+            if name in context:
+                continue
+            parts.append(text[position:match.start()].format(**context))
+            parts.append((name,))
+            position = match.end()
+        parts.append(text[position:].format(**context))
+        self.parts: Tuple = tuple(parts)
+        self.fields = tuple(part[0] for part in parts if part.__class__ is tuple)
+        self.static_tokens = count_tokens("".join(part for part in parts if part.__class__ is str))
+
+    def render(self, **values) -> str:
+        return "".join([part if part.__class__ is str else values[part[0]] for part in self.parts])
+
+    def count_tokens(self, **values) -> int:
+        """Tokens in the rendered prompt, counting only the per-request text"""
+        return self.static_tokens + sum(count_tokens(values[name]) for name in self.fields)
+
+
+class PromptRegistry:
+    """Prompt templates by type and A/B variant, compiled once per (category, level)
+
+    A template is either one string or a dict of strings by level. Fields
+    that ``context(category, level)`` returns are filled in when a template is
+    compiled; the rest (role, skills, ...) are filled per request. Requests
+    are split between a type's variants by weight, deterministically, so the
+    same request always gets the same prompt.
+    """
+
+    def __init__(self, context: Callable[[str, str], Dict[str, str]]):
+        self.context = context
+        self._templates: Dict[str, Dict[str, Union[str, Dict[str, str]]]] = {}
+        self._defaults: Dict[str, str] = {}
+        self._weights: Dict[str, List[Tuple[str, float]]] = {}
+        self._compiled: Dict[Tuple[str, str, str, str], CompiledPrompt] = {}
+
+    def register(
+        self, prompt_type: str, template: Union[str, Dict[str, str]], variant: str = DEFAULT_VARIANT,
+        default: Optional[str] = None,
+    ):
+        """Add a template; ``default`` is used for levels a per-level template doesn't cover"""
+        self._templates.setdefault(prompt_type, {})[variant] = template
+        if default is not None:
+            self._defaults[prompt_type] = default
+        self._compiled = {key: value for key, value in self._compiled.items() if key[0] != prompt_type}
+
+    def types(self) -> List[str]:
+        return list(self._templates)
+
+    def variants(self, prompt_type: str) -> List[str]:
+        return list(self._templates.get(prompt_type, ()))
+
+    def set_weights(self, prompt_type: str, weights: Dict[str, float]):
+        """Share of requests each variant gets; variants not listed get none"""
+        unknown = [variant for variant in weights if variant not in self.variants(prompt_type)]
+        if unknown:
+            raise ValueError(f"unknown {prompt_type} prompt variant(s): {', '.join(unknown)}")
+        self._weights[prompt_type] = [(variant, weight) for variant, weight in weights.items() if weight > 0]
+
+    def choose_variant(self, prompt_type: str, request_key: str) -> str:
+        weights = self._weights.get(prompt_type)
+        if not weights:
+            return DEFAULT_VARIANT
+        point = zlib.crc32(request_key.encode("utf-8")) / 2 ** 32 * sum(weight for _, weight in weights)
+        for variant, weight in weights:
+            point -= weight
+            if point < 0:
+                return variant
+        return weights[-1][0]
+
+    def get(self, prompt_type: str, category: str, level: str, variant: str = DEFAULT_VARIANT) -> CompiledPrompt:
+        key = (prompt_type, category, level, variant)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            template = self._templates[prompt_type][variant]
+            if isinstance(template, dict):
+                template = template.get(level, self._defaults.get(prompt_type))
+            compiled = CompiledPrompt(template, self.context(category, level))
+            # Levels come from requests, so the cache is bounded in case of arbitrary ones
+            if len(self._compiled) < MAX_COMPILED:
+                self._compiled[key] = compiled
+        return compiled
+
+    def render(self, prompt_type: str, category: str, level: str, variant: str = DEFAULT_VARIANT, **values) -> str:
+        return self.get(prompt_type, category, level, variant).render(**values)
+
+    def report(self, categories: Iterable[str], levels: Iterable[str]) -> List[Dict]:
+        """Static prompt size of every (type, variant, category, level), before and after minimization
+
+        Prompts that come out the same for every category get one row, with
+        category "*".
+        """
+        categories = list(categories)
+        rows = []
+        for prompt_type, variants in self._templates.items():
+            for variant in variants:
+                for level in levels:
+                    compiled = {category: self.get(prompt_type, category, level, variant) for category in categories}
+                    if len({prompt.parts for prompt in compiled.values()}) == 1:
+                        compiled = {"*": next(iter(compiled.values()))}
+                    for category, prompt in compiled.items():
+                        rows.append({
+                            "type": prompt_type, "variant": variant, "category": category, "level": level,
+                            "tokens": prompt.static_tokens, "raw_tokens": prompt.raw_tokens,
+                            "fields": list(prompt.fields),
+                        })
+        return rows
+
+
+def parse_weights(text: str) -> Dict[str, Dict[str, float]]:
+    """Parse PROMPT_VARIANTS, e.g. "questions=a:50,b:50;behavioral=b:1", into weights by type"""
+    weights = {}
+    for group in filter(None, (group.strip() for group in text.split(";"))):
+        prompt_type, _, spec = group.partition("=")
+        weights[prompt_type.strip()] = {
+            variant.strip(): float(weight or 1)
+            for variant, _, weight in (item.partition(":") for item in spec.split(",") if item.strip())
+        }
+    return weights
+
+
+def main(argv, registry: PromptRegistry, categories: Iterable[str], levels: Iterable[str]) -> int:
+    """Entry point for `python app.py prompts`: prompt sizes per combination"""
+    parser = argparse.ArgumentParser(prog="app.py prompts", description="Report prompt sizes per type, variant, category and level")
+    parser.add_argument("--type", dest="prompt_type", help="only this prompt type")
+    parser.add_argument("--json", action="store_true", help="print JSON rows instead of a table")
+    args = parser.parse_args(argv)
+
+    rows = registry.report(list(categories), list(levels))
+    if args.prompt_type:
+        rows = [row for row in rows if row["type"] == args.prompt_type]
+    if args.json:
+        json.dump(rows, sys.stdout, indent=1)
+        print()
+        return 0
+    print(f"{'type':<16} {'variant':<8} {'category':<18} {'level':<15} {'tokens':>7} {'raw':>5} {'saved':>6}")
+    for row in rows:
+        saved = 1 - row["tokens"] / row["raw_tokens"] if row["raw_tokens"] else 0.0
+        print(f"{row['type']:<16} {row['variant']:<8} {row['category']:<18} {row['level']:<15} "
+              f"{row['tokens']:>7} {row['raw_tokens']:>5} {saved:>6.0%}")
+    return 0
@@ -0,0 +1,303 @@
+"""Rule-based interview questions by role category and experience level
+
+The bank is declared as plain templates and compiled once at import time;
+get_question_set looks up the compiled questions for a category and level.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Levels in the order they are declared in the bank. Any level that is not
+# listed explicitly resolves to the last one, mirroring the old `else` branch.
+BANK_LEVELS = ("Entry/Junior", "Mid-Level", "Senior", "Lead/Principal")
+DEFAULT_LEVEL = BANK_LEVELS[-1]
+DEFAULT_GROUP = "default"
+
+# Declarative question bank: group -> categories and per-level templates.
+# Slots are written as {role} or {skill|default text}; everything else is static.
+QUESTION_BANK = {
+    "software": {
+        "categories": ["software_dev", "frontend", "backend", "mobile"],
+        "levels": {
+            "Entry/Junior": [
+                "1. Explain the difference between {skill|object-oriented} and procedural programming.",
+                "2. Walk me through how you would debug a simple application issue.",
+                "3. What version control system have you used and how do you write good commit messages?",
+                "4. Explain basic data structures like arrays, lists, and when to use each.",
+                "5. How do you approach learning a new programming language or framework?",
+            ],
+            "Mid-Level": [
+                "1. Design a REST API for a {skill|typical} application and explain your choices.",
+                "2. How do you optimize application performance and handle scaling issues?",
+                "3. Describe your experience with testing frameworks and writing maintainable tests.",
+                "4. Explain how you would refactor legacy code while maintaining functionality.",
+                "5. What design patterns have you implemented and what problems did they solve?",
+            ],
+            "Senior": [
+                "1. Design a scalable microservices architecture for a high-traffic application.",
+                "2. How do you establish coding standards and ensure code quality across teams?",
+                "3. Describe your approach to mentoring junior developers and code reviews.",
+                "4. How do you make technical decisions that balance business needs and technical debt?",
+                "5. What's your strategy for leading a technical migration or major refactoring?",
+            ],
+            "Lead/Principal": [
+                "1. Define technical vision and architecture roadmap for a complex product suite.",
+                "2. How do you align engineering initiatives with business strategy and OKRs?",
+                "3. Describe your approach to building and scaling high-performing engineering teams.",
+                "4. How do you evaluate new technologies and make build vs. buy decisions?",
+                "5. What metrics do you track to measure engineering productivity and system health?",
+            ],
+        },
+    },
+    "data_ml": {
+        "categories": ["data_science", "ml_engineer", "ai_engineer"],
+        "levels": {
+            "Entry/Junior": [
+                "1. Explain basic ML concepts like overfitting, underfitting, and cross-validation.",
+                "2. How do you handle missing data in a dataset?",
+                "3. Describe the difference between supervised and unsupervised learning.",
+                "4. What libraries have you used for data analysis and visualization?",
+                "5. Walk me through a simple linear regression model implementation.",
+            ],
+            "Mid-Level": [
+                "1. How do you select the right algorithm for a given business problem?",
+                "2. Describe your process for feature engineering and selection.",
+                "3. How do you evaluate model performance beyond accuracy (precision, recall, F1)?",
+                "4. Explain techniques for handling imbalanced datasets.",
+                "5. What's your experience with model deployment and monitoring?",
+            ],
+            "Senior": [
+                "1. Design an end-to-end ML pipeline for a production system.",
+                "2. How do you establish MLOps practices and model governance?",
+                "3. Describe your approach to A/B testing and model experimentation.",
+                "4. How do you mentor junior data scientists and establish best practices?",
+                "5. What strategies do you use for model explainability and fairness?",
+            ],
+            "Lead/Principal": [
+                "1. Define AI/ML strategy aligned with business objectives.",
+                "2. How do you build and scale data science teams and capabilities?",
+                "3. Design a data platform that supports ML at enterprise scale.",
+                "4. How do you measure ROI and business impact of ML initiatives?",
+                "5. What's your approach to ethical AI and responsible machine learning?",
+            ],
+        },
+    },
+    "security": {
+        "categories": ["cybersecurity", "pentesting", "soc"],
+        "levels": {
+            "Entry/Junior": [
+                "1. Explain basic security concepts: CIA triad, defense in depth.",
+                "2. What common vulnerabilities should every developer know about?",
+                "3. How do you stay updated with security news and threats?",
+                "4. Describe basic network security concepts (firewalls, VPNs).",
+                "5. What tools have you used for vulnerability scanning?",
+            ],
+            "Mid-Level": [
+                "1. How do you conduct a security assessment of a web application?",
+                "2. Describe your experience with SIEM tools and log analysis.",
+                "3. How do you handle a security incident from detection to resolution?",
+                "4. Explain different types of encryption and when to use each.",
+                "5. What's your approach to security monitoring and alerting?",
+            ],
+            "Senior": [
+                "1. Design a comprehensive security program for an organization.",
+                "2. How do you build and lead incident response teams?",
+                "3. Describe your approach to security architecture and secure SDLC.",
+                "4. How do you establish security metrics and report to executives?",
+                "5. What's your strategy for third-party risk management?",
+            ],
+            "Lead/Principal": [
+                "1. Develop enterprise-wide cybersecurity strategy and roadmap.",
+                "2. How do you align security initiatives with business objectives?",
+                "3. Design a security operations center (SOC) for a global organization.",
+                "4. How do you manage security compliance across multiple regulations?",
+                "5. What's your approach to security culture and awareness programs?",
+            ],
+        },
+    },
+    "devops_cloud": {
+        "categories": ["devops", "cloud", "sre"],
+        "levels": {
+            "Entry/Junior": [
+                "1. Explain basic concepts: containers, VMs, and their differences.",
+                "2. What's your experience with basic Linux administration?",
+                "3. How do you write a simple Dockerfile and docker-compose file?",
+                "4. Describe basic CI/CD concepts and why they're important.",
+                "5. What monitoring tools have you used?",
+            ],
+            "Mid-Level": [
+                "1. Design a CI/CD pipeline for a microservices application.",
+                "2. How do you implement Infrastructure as Code?",
+                "3. Describe your experience with container orchestration.",
+                "4. How do you ensure high availability and disaster recovery?",
+                "5. What's your approach to monitoring and alerting?",
+            ],
+            "Senior": [
+                "1. Design cloud architecture for a globally distributed application.",
+                "2. How do you establish SLOs, SLIs, and error budgets?",
+                "3. Describe your approach to cost optimization in cloud environments.",
+                "4. How do you mentor junior engineers and establish DevOps practices?",
+                "5. What's your strategy for platform engineering and internal tools?",
+            ],
+            "Lead/Principal": [
+                "1. Define cloud and platform strategy for an enterprise.",
+                "2. How do you build and scale platform engineering teams?",
+                "3. Design a multi-cloud strategy with cost and performance optimization.",
+                "4. How do you measure and improve developer productivity?",
+                "5. What's your approach to platform reliability and incident management?",
+            ],
+        },
+    },
+    "database": {
+        "categories": ["database"],
+        "levels": {
+            "Entry/Junior": [
+                "1. Explain basic SQL concepts: joins, indexes, transactions.",
+                "2. How do you write efficient SELECT queries?",
+                "3. What's the difference between SQL and NoSQL databases?",
+                "4. How do you backup and restore a database?",
+                "5. What tools have you used for database administration?",
+            ],
+            "Mid-Level": [
+                "1. How do you optimize slow-running queries?",
+                "2. Design a database schema for a typical e-commerce application.",
+                "3. Describe your experience with database replication.",
+                "4. How do you implement database security and access controls?",
+                "5. What's your approach to database performance monitoring?",
+            ],
+            "Senior": [
+                "1. Design database architecture for a high-traffic application.",
+                "2. How do you plan and execute database migrations?",
+                "3. Describe your approach to database capacity planning.",
+                "4. How do you establish database standards and best practices?",
+                "5. What's your strategy for data lifecycle management?",
+            ],
+            "Lead/Principal": [
+                "1. Define data architecture strategy for an enterprise.",
+                "2. How do you build and lead database engineering teams?",
+                "3. Design a data platform supporting multiple business units.",
+                "4. How do you align database strategy with business goals?",
+                "5. What's your approach to data governance and quality?",
+            ],
+        },
+    },
+    # Default questions for every other category
+    DEFAULT_GROUP: {
+        "categories": [DEFAULT_GROUP],
+        "levels": {
+            "Entry/Junior": [
+                "1. What attracts you to this {role} position?",
+                "2. Describe your educational background and relevant coursework.",
+                "3. What projects have you completed using {skill|relevant skills}?",
+                "4. How do you approach learning new technologies?",
+                "5. Where do you see yourself in 3 years in this field?",
+            ],
+            "Mid-Level": [
+                "1. Describe a challenging project where you used {skill|key skills}.",
+                "2. How do you collaborate with team members on technical projects?",
+                "3. What's your process for troubleshooting complex issues?",
+                "4. How do you stay current with industry trends?",
+                "5. Describe a time you improved an existing process or system.",
+            ],
+            "Senior": [
+                "1. How do you mentor and develop junior team members?",
+                "2. Describe a technical decision you made that significantly impacted the business.",
+                "3. How do you balance technical debt with new feature development?",
+                "4. What's your approach to architectural design and documentation?",
+                "5. How do you handle conflicting priorities in technical projects?",
+            ],
+            "Lead/Principal": [
+                "1. How do you develop and communicate technical vision?",
+                "2. Describe your experience building and leading high-performing teams.",
+                "3. How do you align technical strategy with business objectives?",
+                "4. What's your approach to stakeholder management and communication?",
+                "5. How do you drive innovation while maintaining system stability?",
+            ],
+        },
+    },
+}
+
+_SLOT_PATTERN = re.compile(r"\{(role|skill)(?:\|([^}]*))?\}")
+
+
+class CompiledQuestion:
+    """A question template split into static text and role/skill slots"""
+
+    __slots__ = ("parts", "uses_skill", "single_slot")
+
+    def __init__(self, template: str):
+        parts = []
+        position = 0
+        for match in _SLOT_PATTERN.finditer(template):
+            parts.append(template[position:match.start()])
+            # Slots are stored as (name, default) tuples; text is stored as str
+            parts.append((match.group(1), match.group(2) or ""))
+            position = match.end()
+        parts.append(template[position:])
+
+        self.parts: Tuple = tuple(parts)
+        self.uses_skill = any(part.__class__ is tuple and part[0] == "skill" for part in parts)
+        # Templates with one slot (the common case) render with two concatenations
+        self.single_slot = len(parts) == 3
+
+    def render(self, role: str, skill: Optional[str]) -> str:
+        parts = self.parts
+        if self.single_slot:
+            prefix, (name, default), suffix = parts
+            return prefix + (role if name == "role" else skill or default) + suffix
+        return "".join([
+            part if part.__class__ is str else (role if part[0] == "role" else skill or part[1])
+            for part in parts
+        ])
+
+
+def compile_question(template: str):
+    """Compile a template, returning plain strings for questions without slots"""
+    if not _SLOT_PATTERN.search(template):
+        return template
+    return CompiledQuestion(template)
+
+
+class QuestionSet:
+    """Precompiled questions for one (category, level) pair"""
+
+    __slots__ = ("items", "static", "uses_skill")
+
+    def __init__(self, templates: List[str]):
+        self.items: Tuple = tuple(compile_question(t) for t in templates)
+        compiled = [item for item in self.items if item.__class__ is CompiledQuestion]
+        # Fully static sets render as a copy of the same shared strings
+        self.static: Optional[Tuple[str, ...]] = None if compiled else self.items
+        self.uses_skill = any(item.uses_skill for item in compiled)
+
+    def render(self, role: str, skill: Optional[str]) -> List[str]:
+        if self.static is not None:
+            return list(self.static)
+        return [
+            item if item.__class__ is str else item.render(role, skill)
+            for item in self.items
+        ]
+
+
+def build_index(bank: Dict = QUESTION_BANK) -> Dict[str, Dict[str, QuestionSet]]:
+    """Compile the question bank into a category -> level -> questions table"""
+    index = {}
+    for group in bank.values():
+        compiled = {level: QuestionSet(templates) for level, templates in group["levels"].items()}
+        for category in group["categories"]:
+            index[category] = compiled
+    return index
+
+
+# Compiled once at import time
+QUESTION_INDEX = build_index()
+_DEFAULT_LEVELS = QUESTION_INDEX[DEFAULT_GROUP]
+
+
+def get_question_set(category: str, level: str) -> QuestionSet:
+    """Look up the compiled questions for a category and level"""
+    levels = QUESTION_INDEX.get(category, _DEFAULT_LEVELS)
+    question_set = levels.get(level)
+    if question_set is None:
+        question_set = levels[DEFAULT_LEVEL]
+    return question_set
+
@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+import metrics
+from inference_client import InferenceError
+
+# Request priorities, most urgent first
+INTERACTIVE = 0
+BATCH = 1
+WARMUP = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", WARMUP: "warmup"}
+
+# Seconds a request of each priority may take end to end before the fallback is used instead
+DEFAULT_BUDGETS = {INTERACTIVE: 10.0, BATCH: 120.0, WARMUP: None}
+
+
+class DeadlineExceededError(InferenceError):
+    """Raised when an upstream call can't start in time to finish within its latency budget"""
+
+
+class TokenBucket:
+    """Allow ``rate`` calls per second on average with bursts of up to ``burst``; not thread-safe"""
+
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, tokens: float) -> float:
+        """Seconds until the bucket holds ``tokens`` tokens, given no other takers"""
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+class _Waiter:
+    __slots__ = ("priority", "deadline", "future", "enqueued")
+
+    def __init__(self, priority: int, deadline: Optional[float]):
+        self.priority = priority
+        self.deadline = deadline
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class UpstreamLimiter:
+    """Token-bucket rate limit for upstream calls with a priority queue in front of it
+
+    Waiting calls are served by priority (interactive, then batch, then
+    warm-up) and within a priority by deadline. A call that can't get a token
+    early enough to finish within its budget fails at once with
+    DeadlineExceededError, so the caller can use the fallback straight away.
+    Limits apply per process.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, budgets: Optional[Dict[int, Optional[float]]] = None):
+        self.bucket = TokenBucket(rate, burst if burst is not None else max(1.0, rate))
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        # Smoothed duration of an upstream call, reserved out of each budget
+        self.service_time = 1.0
+        self._queue = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._dispatcher = None
+
+    @classmethod
+    def from_env(cls) -> Optional["UpstreamLimiter"]:
+        """Build a limiter from UPSTREAM_* environment variables; None if UPSTREAM_RATE is unset or 0"""
+        rate = float(os.environ.get("UPSTREAM_RATE") or 0)
+        if rate <= 0:
+            return None
+        budgets = dict(DEFAULT_BUDGETS)
+        for priority, name in PRIORITY_NAMES.items():
+            value = os.environ.get(f"UPSTREAM_{name.upper()}_BUDGET")
+            if value:
+                budgets[priority] = float(value) if float(value) > 0 else None
+        burst = os.environ.get("UPSTREAM_BURST")
+        return cls(rate, float(burst) if burst else None, budgets)
+
+    def deadline_for(self, priority: int, start: Optional[float] = None) -> Optional[float]:
+        """Latest monotonic time a call of this priority may start and still finish in budget"""
+        budget = self.budgets.get(priority)
+        if budget is None:
+            return None
+        return (start if start is not None else time.monotonic()) + budget - self.service_time
+
+    def record_service_time(self, seconds: float):
+        self.service_time += 0.2 * (seconds - self.service_time)
+
+    @staticmethod
+    def _sort_key(priority: int, deadline: Optional[float]):
+        """Queue order: by priority, then earliest deadline; calls without one go last"""
+        return (priority, deadline if deadline is not None else float("inf"))
+
+    def _enqueue(self, priority: int, deadline: Optional[float]) -> Future:
+        waiter = _Waiter(priority, deadline)
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        with self._lock:
+            now = waiter.enqueued
+            self.bucket.refill(now)
+            if not self._queue and self.bucket.tokens >= 1:
+                self.bucket.tokens -= 1
+                waiter.future.set_result(0.0)
+                return waiter.future
+            key = self._sort_key(priority, deadline)
+            if deadline is not None:
+                ahead = sum(1 for entry in self._queue if entry[:2] <= key)
+                if now + self.bucket.time_until(ahead + 1) > deadline:
+                    metrics.LIMITER_REJECTIONS.inc(name, "queue_full")
+                    raise DeadlineExceededError(
+                        f"{ahead} call(s) ahead of this {name} call; can't start within the latency budget"
+                    )
+            heapq.heappush(self._queue, (*key, next(self._order), waiter))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="upstream-limiter", daemon=True)
+                self._dispatcher.start()
+            self._wakeup.notify()
+        return waiter.future
+
+    def _dispatch(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                # Drop waiters whose budget ran out while queued
+                if any(w.deadline is not None and w.deadline < now for *_, w in self._queue):
+                    self._queue = [entry for entry in self._queue if not self._expire(entry[3], now)]
+                    heapq.heapify(self._queue)
+                if not self._queue:
+                    self._wakeup.wait()
+                    continue
+                self.bucket.refill(now)
+                if self.bucket.tokens >= 1:
+                    waiter = heapq.heappop(self._queue)[3]
+                    # Skip callers that gave up while queued
+                    if waiter.future.set_running_or_notify_cancel():
+                        self.bucket.tokens -= 1
+                        waiter.future.set_result(now - waiter.enqueued)
+                    continue
+                next_expiry = min((w.deadline for *_, w in self._queue if w.deadline is not None), default=None)
+                timeout = self.bucket.time_until(1)
+                if next_expiry is not None:
+                    timeout = min(timeout, max(0.0, next_expiry - now))
+                self._wakeup.wait(timeout)
+
+    def _expire(self, waiter: _Waiter, now: float) -> bool:
+        if waiter.deadline is None or waiter.deadline >= now:
+            return False
+        if not waiter.future.set_running_or_notify_cancel():
+            return True
+        metrics.LIMITER_REJECTIONS.inc(PRIORITY_NAMES.get(waiter.priority, str(waiter.priority)), "deadline")
+        waiter.future.set_exception(DeadlineExceededError("Latency budget ran out while waiting for the rate limit"))
+        return True
+
+    def acquire(self, priority: int = INTERACTIVE, deadline: Optional[float] = None) -> float:
+        """Block until a call may be made; returns the seconds spent queued"""
+        waited = self._enqueue(priority, deadline).result()
+        metrics.STAGE_LATENCY.observe("queue", value=waited)
+        return waited
+
+    async def aacquire(self, priority: int = INTERACTIVE, deadline: Optional[float] = None) -> float:
+        """Async version of acquire()"""
+        import asyncio
+
+        future = self._enqueue(priority, deadline)
+        if not future.done():
+            try:
+                await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # The caller gave up; hand the token back if it was granted meanwhile
+                if not future.cancel() and future.exception() is None:
+                    self.release_unused()
+                raise
+        waited = future.result()
+        metrics.STAGE_LATENCY.observe("queue", value=waited)
+        return waited
+
+    def release_unused(self):
+        """Return a token that was granted but not used"""
+        with self._lock:
+            self.bucket.tokens = min(self.bucket.burst, self.bucket.tokens + 1)
+            self._wakeup.notify()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"queued": len(self._queue), "tokens": self.bucket.tokens}
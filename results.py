@@ -0,0 +1,168 @@
+import functools
+import json
+from typing import Dict, Optional, Tuple
+
+SOURCES = ("model", "retrieval", "fallback")
+_FIELDS = ("role", "category", "category_name", "level", "skills", "questions", "advice", "source", "timings")
+
+
+@functools.lru_cache(maxsize=None)
+def load_orjson():
+    """The orjson module if it is installed (several times faster than json), else None
+
+    Imported on first use so it doesn't add to startup time.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+class QuestionPack:
+    """Immutable result of one question generation request
+
+    Questions are stored without numbering. The plain-text rendering shown in
+    the UI and the Markdown rendering are built on first use and kept, so
+    JSON consumers never pay for them.
+    """
+
+    __slots__ = _FIELDS + ("_text", "_markdown")
+
+    def __init__(
+        self,
+        role: str,
+        category: str,
+        category_name: str,
+        level: str,
+        skills: str,
+        questions: Tuple[str, ...],
+        advice: Optional[str],
+        source: str,
+        timings: Tuple[Tuple[str, float], ...] = (),
+    ):
+        if source not in SOURCES:
+            raise ValueError(f"unknown source {source!r}")
+        for name, value in zip(_FIELDS, (role, category, category_name, level, skills, tuple(questions),
+                                         advice, source, tuple(timings))):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_text", None)
+        object.__setattr__(self, "_markdown", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, QuestionPack):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _FIELDS)
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, name) for name in _FIELDS))
+
+    def __repr__(self) -> str:
+        return f"QuestionPack(role={self.role!r}, level={self.level!r}, source={self.source!r}, questions={len(self.questions)})"
+
+    def with_timings(self, timings: Tuple[Tuple[str, float], ...]) -> "QuestionPack":
+        """A copy with different timings"""
+        values = {name: getattr(self, name) for name in _FIELDS}
+        values["timings"] = timings
+        return QuestionPack(**values)
+
+    @property
+    def text(self) -> str:
+        """The plain-text rendering shown in the UI"""
+        if self._text is None:
+            object.__setattr__(self, "_text", render_text(self))
+        return self._text
+
+    @property
+    def markdown(self) -> str:
+        if self._markdown is None:
+            object.__setattr__(self, "_markdown", render_markdown(self))
+        return self._markdown
+
+    def to_dict(self) -> Dict:
+        return {
+            "role": self.role,
+            "category": self.category,
+            "category_name": self.category_name,
+            "level": self.level,
+            "skills": self.skills,
+            "questions": list(self.questions),
+            "advice": self.advice,
+            "source": self.source,
+            "timings": dict(self.timings),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuestionPack":
+        values = {name: data.get(name) for name in _FIELDS}
+        values["questions"] = tuple(data.get("questions") or ())
+        values["timings"] = tuple((data.get("timings") or {}).items())
+        return cls(**values)
+
+    def to_json(self) -> bytes:
+        """UTF-8 JSON, encoded with orjson when it is installed"""
+        orjson = load_orjson()
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "QuestionPack":
+        orjson = load_orjson()
+        return cls.from_dict(orjson.loads(data) if orjson is not None else json.loads(data))
+
+    def to_msgpack(self) -> bytes:
+        """MessagePack encoding; requires `pip install msgpack`"""
+        import msgpack
+
+        return msgpack.packb(self.to_dict(), use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "QuestionPack":
+        import msgpack
+
+        return cls.from_dict(msgpack.unpackb(data, raw=False))
+
+
+def render_text(pack: QuestionPack) -> str:
+    """Render a pack as the UI's plain text, with the emoji header"""
+    if pack.source == "fallback":
+        # Rule-based packs name the level and skills, and space the questions out
+        header = f"📋 {pack.level.replace('/', ' ').title()} Level Interview Questions for {pack.role}\n"
+        header += f"🏷️ Category: {pack.category_name}\n"
+        header += f"💼 Required Skills: {pack.skills}\n"
+        header += "=" * 60 + "\n\n"
+        separator = "\n\n"
+    else:
+        header = f"📋 Interview Questions for {pack.role}\n"
+        header += f"🏷️ Category: {pack.category_name}\n"
+        header += "=" * 50 + "\n\n"
+        separator = "\n"
+    text = header + separator.join(f"{number}. {question}" for number, question in enumerate(pack.questions, 1))
+    if pack.advice:
+        text += "\n\n" + pack.advice
+    return text
+
+
+def render_markdown(pack: QuestionPack) -> str:
+    """Render a pack as Markdown for documents and exports"""
+    lines = [
+        f"# Interview Questions for {pack.role}",
+        "",
+        f"**Category:** {pack.category_name}  ",
+        f"**Level:** {pack.level}  ",
+        f"**Skills:** {pack.skills}",
+        "",
+    ]
+    lines += [f"{number}. {question}" for number, question in enumerate(pack.questions, 1)]
+    if pack.advice:
+        title, _, tips = pack.advice.partition("\n")
+        lines += ["", f"## {title.lstrip('💡 ').rstrip(':')}", ""]
+        lines += [f"- {tip.lstrip('• ')}" for tip in tips.splitlines() if tip.strip()]
+    return "\n".join(lines) + "\n"
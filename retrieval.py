@@ -0,0 +1,267 @@
+import contextlib
+import json
+import math
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dedup import split_questions, strip_numbering, tokenize
+from question_bank import QUESTION_BANK, compile_question
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves from several workers aren't serialized
+    fcntl = None
+
+# IDF weights are recomputed in full once the corpus has grown by this fraction since the last time;
+# in between, only the new terms and documents are weighted
+REFRESH_GROWTH = 0.05
+
+
+class _Column:
+    """Append-only NumPy array that doubles its capacity as it grows"""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype, data: Optional[np.ndarray] = None):
+        self.data = data if data is not None else np.empty(1024, dtype=dtype)
+        self.size = len(data) if data is not None else 0
+
+    def extend(self, values: Sequence):
+        end = self.size + len(values)
+        if end > len(self.data) or not self.data.flags.writeable:
+            grown = np.empty(max(end, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class QuestionIndex:
+    """TF-IDF index of interview questions for nearest-neighbour retrieval
+
+    Postings are kept as three parallel NumPy columns (document, term, log term
+    frequency), so a query is one gather and one bincount over them. New
+    documents and terms are weighted with the IDF as of the last full
+    recompute, which happens once the corpus has grown by REFRESH_GROWTH. A
+    saved index can be memory-mapped by several worker processes.
+    """
+
+    def __init__(self):
+        self.docs: List[Dict] = []
+        self.vocab: Dict[str, int] = {}
+        self._doc_ids = _Column(np.int32)
+        self._term_ids = _Column(np.int32)
+        self._weights = _Column(np.float32)
+        self._df = _Column(np.int32)
+        self._seen = set()
+        # Level code per document and document ids per category, for filtering without a Python loop
+        self._levels = _Column(np.int32)
+        self._level_codes: Dict[Optional[str], int] = {}
+        self._category_docs: Dict[str, _Column] = {}
+        self._idf = None
+        self._norms = None
+        self._refreshed_docs = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(
+        self, text: str, level: Optional[str], categories: Iterable[str], source: str, template: Optional[str] = None
+    ) -> bool:
+        """Index one question; False if it is already indexed or has no searchable words"""
+        tokens = tokenize(text)
+        if not tokens:
+            return False
+        key = " ".join(tokens)
+        counts = Counter(tokens)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            doc_id = len(self.docs)
+            doc = {"text": text, "level": level, "categories": sorted(categories), "source": source}
+            if template is not None:
+                # Bank questions are re-rendered with the request's role and skill
+                doc["template"] = template
+            self.docs.append(doc)
+            term_ids = []
+            for term in counts:
+                term_id = self.vocab.get(term)
+                if term_id is None:
+                    term_id = self.vocab[term] = len(self.vocab)
+                    self._df.extend([0])
+                self._df.data[term_id] += 1
+                term_ids.append(term_id)
+            self._doc_ids.extend([doc_id] * len(term_ids))
+            self._term_ids.extend(term_ids)
+            self._weights.extend([1.0 + math.log(count) for count in counts.values()])
+            self._add_filters(doc_id, doc)
+        return True
+
+    def _add_filters(self, doc_id: int, doc: Dict):
+        self._levels.extend([self._level_codes.setdefault(doc["level"], len(self._level_codes))])
+        for category in doc["categories"]:
+            if category not in self._category_docs:
+                self._category_docs[category] = _Column(np.int64)
+            self._category_docs[category].extend([doc_id])
+
+    def add_bank(self, bank: Dict = QUESTION_BANK) -> int:
+        """Index the built-in templates; slots are filled with their default text for matching"""
+        added = 0
+        for group in bank.values():
+            for level, templates in group["levels"].items():
+                for template in templates:
+                    text = strip_numbering(template)
+                    item = compile_question(text)
+                    plain = item if isinstance(item, str) else item.render("", None)
+                    added += self.add(plain, level, group["categories"], "bank", template=text)
+        return added
+
+    def add_model_output(self, text: str, level: str, category: str) -> int:
+        """Index each question of a model answer; returns how many were new"""
+        return sum(self.add(question, level, (category,), "model") for question in split_questions(text))
+
+    def _idf_for(self, start: int = 0) -> np.ndarray:
+        df = self._df.view()[start:].astype(np.float32)
+        return (np.log((1 + len(self.docs)) / (1 + df)) + 1.0).astype(np.float32)
+
+    def _doc_norms(self, idf: np.ndarray, first_posting: int, first_doc: int) -> np.ndarray:
+        term_ids = self._term_ids.view()[first_posting:]
+        weighted = self._weights.view()[first_posting:] * idf[term_ids]
+        norms = np.sqrt(np.bincount(self._doc_ids.view()[first_posting:] - first_doc,
+                                    weights=weighted * weighted, minlength=len(self.docs) - first_doc))
+        norms[norms == 0] = 1.0
+        return norms
+
+    def _refresh(self):
+        # IDF depends on the whole corpus, so a full recompute reweights every document
+        n = len(self.docs)
+        if self._idf is None or n > self._refreshed_docs * (1 + REFRESH_GROWTH):
+            self._idf = self._idf_for()
+            self._norms = self._doc_norms(self._idf, 0, 0)
+            self._refreshed_docs = n
+            return
+        # Otherwise weight only what was added since: postings are appended in document order
+        if len(self._idf) < len(self.vocab):
+            self._idf = np.concatenate([self._idf, self._idf_for(len(self._idf))])
+        first_doc = len(self._norms)
+        if first_doc < n:
+            first_posting = int(np.searchsorted(self._doc_ids.view(), first_doc))
+            self._norms = np.concatenate([self._norms, self._doc_norms(self._idf, first_posting, first_doc)])
+
+    def search(
+        self, query: str, level: Optional[str] = None, category: Optional[str] = None,
+        k: int = 5, category_boost: float = 0.1,
+    ) -> List[Tuple[float, Dict]]:
+        """Top-k (cosine score, document) pairs, restricted to the level when one is given"""
+        counts = Counter(term for term in tokenize(query) if term in self.vocab)
+        with self._lock:
+            if not counts or not self.docs:
+                return []
+            if self._idf is None or len(self._norms) < len(self.docs):
+                self._refresh()
+            idf, norms = self._idf, self._norms
+            query_weights = np.zeros(len(self.vocab), dtype=np.float32)
+            for term, count in counts.items():
+                term_id = self.vocab[term]
+                query_weights[term_id] = (1.0 + math.log(count)) * idf[term_id]
+            query_norm = float(np.linalg.norm(query_weights))
+            term_ids = self._term_ids.view()
+            contributions = self._weights.view() * idf[term_ids] * query_weights[term_ids]
+            scores = np.bincount(self._doc_ids.view(), weights=contributions, minlength=len(self.docs))
+            scores /= norms * query_norm
+            docs = self.docs
+            if category is not None and category in self._category_docs:
+                matched = self._category_docs[category].view()
+                scores[matched] += np.where(scores[matched] > 0, category_boost, 0.0)
+            if level is not None:
+                # Documents without a level match any level
+                allowed = [self._level_codes[key] for key in (level, None) if key in self._level_codes]
+                scores[~np.isin(self._levels.view(), allowed)] = 0.0
+        top = np.argpartition(-scores, min(k, len(scores) - 1))[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[i]), docs[i]) for i in top if scores[i] > 0]
+
+    def save(self, path: str):
+        """Write the index to a directory that load() can memory-map
+
+        Worker processes share the directory: each save first takes in the
+        questions other workers saved there, so none are lost, and saves are
+        serialized with a lock file.
+        """
+        os.makedirs(path, exist_ok=True)
+        with _locked(path):
+            if os.path.exists(os.path.join(path, "docs.json")):
+                self._merge_saved(path)
+            # Copied under the lock, written without it, so searches aren't held up by the disk
+            with self._lock:
+                columns = [(name, column.view().copy()) for name, column in (
+                    ("doc_ids", self._doc_ids), ("term_ids", self._term_ids),
+                    ("weights", self._weights), ("df", self._df))]
+                state = {"vocab": dict(self.vocab), "docs": list(self.docs)}
+            for name, values in columns:
+                np.save(os.path.join(path, f"{name}.tmp.npy"), values)
+                os.replace(os.path.join(path, f"{name}.tmp.npy"), os.path.join(path, f"{name}.npy"))
+            with open(os.path.join(path, "docs.json.tmp"), "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(os.path.join(path, "docs.json.tmp"), os.path.join(path, "docs.json"))
+
+    def _merge_saved(self, path: str):
+        with open(os.path.join(path, "docs.json"), encoding="utf-8") as f:
+            saved = json.load(f)["docs"]
+        with self._lock:
+            known = {doc["text"] for doc in self.docs}
+        for doc in saved:
+            if doc["text"] not in known:
+                self.add(doc["text"], doc["level"], doc["categories"], doc["source"], doc.get("template"))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "QuestionIndex":
+        """Read an index written by save(); columns stay memory-mapped until something is added"""
+        index = cls()
+        with _locked(path):
+            with open(os.path.join(path, "docs.json"), encoding="utf-8") as f:
+                state = json.load(f)
+            mode = "r" if mmap else None
+            index._doc_ids = _Column(np.int32, np.load(os.path.join(path, "doc_ids.npy"), mmap_mode=mode))
+            index._term_ids = _Column(np.int32, np.load(os.path.join(path, "term_ids.npy"), mmap_mode=mode))
+            index._weights = _Column(np.float32, np.load(os.path.join(path, "weights.npy"), mmap_mode=mode))
+            # Document frequencies are updated in place, so they are always read into memory
+            index._df = _Column(np.int32, np.load(os.path.join(path, "df.npy")))
+        index.vocab, index.docs = state["vocab"], state["docs"]
+        index._seen = {" ".join(tokenize(doc["text"])) for doc in index.docs}
+        for doc_id, doc in enumerate(index.docs):
+            index._add_filters(doc_id, doc)
+        return index
+
+    def stats(self) -> Dict[str, int]:
+        sources = Counter(doc["source"] for doc in self.docs)
+        return {"bank": sources["bank"], "model": sources["model"]}
+
+
+@contextlib.contextmanager
+def _locked(path: str):
+    """Exclusive lock on a saved index directory, held across processes"""
+    with open(os.path.join(path, ".lock"), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        # Closing the file releases the lock
+        yield
+
+
+def index_from_env() -> QuestionIndex:
+    """Load the index at RETRIEVAL_INDEX_PATH if there is one, else build it from the question bank"""
+    path = os.environ.get("RETRIEVAL_INDEX_PATH")
+    if path and os.path.exists(os.path.join(path, "docs.json")):
+        return QuestionIndex.load(path)
+    index = QuestionIndex()
+    index.add_bank()
+    return index
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution
+
+    The first caller for a key (the leader) runs the call; callers that arrive
+    while it is in flight wait for and share its result or exception. Sync and
+    async callers share the same in-flight table, so a thread and a coroutine
+    asking for the same key also share one call.
+
+    With a shared ``store`` (see store.py) the leader also takes a lease on the
+    key, so a leader in another worker process waits for this one's result,
+    read through ``lookup`` (normally the shared cache), instead of repeating
+    the call. A worker that has waited ``wait_timeout`` seconds (the lease TTL
+    by default) makes the call itself.
+    """
+
+    LEASE_PREFIX = "flight:"
+
+    def __init__(self, store=None, lookup: Optional[Callable[[Hashable], Any]] = None,
+                 lease_ttl: float = 60.0, poll_interval: float = 0.05, wait_timeout: Optional[float] = None):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.store = store
+        self.lookup = lookup
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = lease_ttl if wait_timeout is None else wait_timeout
+        self.owner = f"{os.getpid()}:{id(self)}"
+        self.executed = 0
+        self.coalesced = 0
+        self.shared = 0
+        self.wait_timeouts = 0
+
+    def join(self, key: Hashable):
+        """Return (future, is_leader) for a key
+
+        Callers that drive the call themselves (e.g. while streaming it) must
+        pass the leader's outcome to finish().
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.executed += 1
+            return future, True
+
+    def finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        """Publish the leader's result or error to waiting callers"""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def claim(self, key: Hashable) -> Tuple[bool, Any]:
+        """Take the cross-worker lease for a key, or wait for the worker holding it
+
+        Returns (True, None) when this process should make the call and then
+        release() the key, or (False, result) when another worker produced the
+        result. Without a shared store every claim succeeds at once.
+        """
+        if self.store is None:
+            return True, None
+        lease = self.LEASE_PREFIX + str(key)
+        deadline = time.monotonic() + self.wait_timeout
+        while not self.store.add(lease, self.owner, self.lease_ttl):
+            while self.store.get(lease) is not None:
+                result = self.lookup(key)
+                if result is not None:
+                    return self._shared_result(result)
+                if time.monotonic() >= deadline:
+                    return self._stop_waiting()
+                time.sleep(self.poll_interval)
+            # The holder finished (or its lease expired); its result may have landed just before
+            result = self.lookup(key)
+            if result is not None:
+                return self._shared_result(result)
+        return True, None
+
+    async def aclaim(self, key: Hashable) -> Tuple[bool, Any]:
+        """Async version of claim(); the blocking store and lookup calls run in worker threads"""
+        if self.store is None:
+            return True, None
+        lease = self.LEASE_PREFIX + str(key)
+        deadline = time.monotonic() + self.wait_timeout
+        while not await asyncio.to_thread(self.store.add, lease, self.owner, self.lease_ttl):
+            while await asyncio.to_thread(self.store.get, lease) is not None:
+                result = await asyncio.to_thread(self.lookup, key)
+                if result is not None:
+                    return self._shared_result(result)
+                if time.monotonic() >= deadline:
+                    return self._stop_waiting()
+                await asyncio.sleep(self.poll_interval)
+            result = await asyncio.to_thread(self.lookup, key)
+            if result is not None:
+                return self._shared_result(result)
+        return True, None
+
+    def _shared_result(self, result: Any) -> Tuple[bool, Any]:
+        with self._lock:
+            self.shared += 1
+        return False, result
+
+    def _stop_waiting(self) -> Tuple[bool, Any]:
+        # The holder may have died or hung with its lease still live; make the call without one
+        with self._lock:
+            self.wait_timeouts += 1
+        return True, None
+
+    def release(self, key: Hashable):
+        """Drop the cross-worker lease taken by claim(), unless it has since expired and been taken by another worker"""
+        if self.store is not None:
+            self.store.delete_if(self.LEASE_PREFIX + str(key), self.owner)
+
+    async def arelease(self, key: Hashable):
+        """Async version of release()"""
+        if self.store is not None:
+            await asyncio.to_thread(self.release, key)
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless an identical call is already in flight"""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+        try:
+            claimed, result = self.claim(key)
+            if claimed:
+                try:
+                    result = fn(*args, **kwargs)
+                finally:
+                    self.release(key)
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    async def _arun(self, key: Hashable, coro_fn: Callable, *args, **kwargs) -> Any:
+        claimed, result = await self.aclaim(key)
+        if not claimed:
+            return result
+        try:
+            return await coro_fn(*args, **kwargs)
+        finally:
+            await self.arelease(key)
+
+    async def ado(self, key: Hashable, coro_fn: Callable, *args, **kwargs) -> Any:
+        """Async version of do() for coroutine functions"""
+        future, leader = self.join(key)
+        if leader:
+            task = asyncio.ensure_future(self._arun(key, coro_fn, *args, **kwargs))
+
+            def done(task):
+                if task.cancelled():
+                    self.finish(key, future, error=asyncio.CancelledError())
+                elif task.exception() is not None:
+                    self.finish(key, future, error=task.exception())
+                else:
+                    self.finish(key, future, task.result())
+
+            # The call runs as its own task, so a cancelled leader doesn't cancel it for the followers
+            task.add_done_callback(done)
+        # Shielded so a cancelled caller doesn't cancel the future the other callers share
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"executed": self.executed, "coalesced": self.coalesced, "shared": self.shared,
+                "wait_timeouts": self.wait_timeouts, "in_flight": in_flight}
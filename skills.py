@@ -0,0 +1,232 @@
+import functools
+import re
+from typing import Dict, Optional, Tuple
+
+# Canonical skill names and the spellings users type for them
+SKILL_ALIASES = {
+    "Python": ("py", "python3", "python 3"),
+    "JavaScript": ("js", "javascript es6", "es6", "ecmascript", "vanilla js"),
+    "TypeScript": ("ts",),
+    "Java": ("java se", "java ee", "core java"),
+    "C++": ("cpp", "c plus plus"),
+    "C#": ("csharp", "c sharp"),
+    "C": ("ansi c", "c language"),
+    "Go": ("golang",),
+    "Rust": ("rustlang",),
+    "Kotlin": ("kt",),
+    "Swift": ("swiftui",),
+    "Scala": (),
+    "R": ("rlang", "r language"),
+    "SQL": ("structured query language",),
+    "Bash": ("shell", "shell scripting", "sh"),
+    "Solidity": (),
+    "React": ("reactjs", "react.js", "react js"),
+    "Angular": ("angularjs", "angular.js"),
+    "Vue": ("vuejs", "vue.js"),
+    "Redux": (),
+    "Node.js": ("node", "nodejs", "node js"),
+    "Django": (),
+    "Flask": (),
+    "FastAPI": ("fast api",),
+    "Spring Boot": ("spring", "springboot"),
+    "HTML": ("html5",),
+    "CSS": ("css3",),
+    "REST APIs": ("rest", "rest api", "restful", "restful apis"),
+    "GraphQL": ("gql",),
+    "Flutter": (),
+    "React Native": ("rn",),
+    "Unity": ("unity3d",),
+    "Unreal Engine": ("unreal", "ue4", "ue5"),
+    "PostgreSQL": ("postgres", "psql", "pg"),
+    "MySQL": (),
+    "MongoDB": ("mongo",),
+    "Redis": (),
+    "Oracle": ("oracle db",),
+    "Elasticsearch": ("elastic",),
+    "Kafka": ("apache kafka",),
+    "Spark": ("apache spark", "pyspark"),
+    "Hadoop": ("hdfs",),
+    "Airflow": ("apache airflow",),
+    "Pandas": ("pd",),
+    "NumPy": ("np",),
+    "Scikit-learn": ("sklearn", "scikit learn", "scikit"),
+    "TensorFlow": ("tensor flow",),
+    "PyTorch": ("torch",),
+    "Keras": (),
+    "Machine Learning": ("ml",),
+    "Deep Learning": ("dl",),
+    "NLP": ("natural language processing",),
+    "Computer Vision": ("cv",),
+    "LLMs": ("llm", "large language models"),
+    "Transformers": ("hugging face", "huggingface"),
+    "OpenCV": ("cv2",),
+    "MLOps": ("ml ops",),
+    "Tableau": (),
+    "Power BI": ("powerbi",),
+    "Excel": ("ms excel", "microsoft excel"),
+    "AWS": ("amazon web services",),
+    "Azure": ("microsoft azure",),
+    "GCP": ("google cloud", "google cloud platform"),
+    "Docker": (),
+    "Kubernetes": ("k8s", "kube"),
+    "Terraform": (),
+    "Ansible": (),
+    "Jenkins": (),
+    "CI/CD": ("ci cd", "continuous integration"),
+    "Git": (),
+    "Linux": (),
+    "Prometheus": (),
+    "Grafana": (),
+    "Microservices": ("micro services",),
+    "SIEM": (),
+    "Splunk": (),
+    "IDS/IPS": ("ids", "ips"),
+    "Threat Hunting": (),
+    "Incident Response": ("ir",),
+    "EDR": (),
+    "Burp Suite": ("burp",),
+    "Metasploit": ("msf",),
+    "Nmap": (),
+    "OWASP": ("owasp top 10",),
+    "TCP/IP": ("tcp", "tcpip"),
+    "Cisco": ("ccna",),
+    "BGP": (),
+    "Firewalls": ("firewall",),
+    "Selenium": (),
+    "Cypress": (),
+    "Manual Testing": (),
+    "JIRA": (),
+    "Agile": ("scrum",),
+    "Ethereum": ("eth",),
+    "Smart Contracts": ("smart contract",),
+    "ROS": ("robot operating system", "ros2"),
+    "MQTT": (),
+    "Raspberry Pi": ("rpi", "raspberrypi"),
+    "RTOS": ("freertos",),
+    "Embedded Linux": ("yocto",),
+    "ARKit": (),
+}
+
+# Skills most relevant to each job category, most relevant first
+CATEGORY_SKILLS = {
+    "software_dev": ("Python", "Java", "JavaScript", "C++", "C#", "Go", "SQL", "Git", "REST APIs", "Microservices"),
+    "frontend": ("JavaScript", "TypeScript", "React", "Angular", "Vue", "CSS", "HTML", "Redux"),
+    "backend": ("Python", "Java", "Go", "Node.js", "Django", "Spring Boot", "PostgreSQL", "REST APIs", "Redis", "Kafka"),
+    "mobile": ("Kotlin", "Swift", "Flutter", "React Native", "Java"),
+    "gaming": ("C++", "Unity", "Unreal Engine", "C#"),
+    "embedded": ("C", "C++", "RTOS", "Embedded Linux", "Rust"),
+    "data_science": ("Python", "Machine Learning", "Pandas", "Scikit-learn", "SQL", "R", "NumPy", "Deep Learning"),
+    "data_analysis": ("SQL", "Excel", "Tableau", "Power BI", "Python", "Pandas", "R"),
+    "ml_engineer": ("PyTorch", "TensorFlow", "Machine Learning", "Deep Learning", "Python", "MLOps", "Scikit-learn", "Keras"),
+    "ai_engineer": ("LLMs", "PyTorch", "Transformers", "Python", "MLOps", "Deep Learning", "NLP"),
+    "nlp": ("NLP", "Transformers", "LLMs", "PyTorch", "Python"),
+    "computer_vision": ("Computer Vision", "OpenCV", "PyTorch", "TensorFlow", "Deep Learning", "Python"),
+    "bi": ("Power BI", "Tableau", "SQL", "Excel"),
+    "big_data": ("Spark", "Hadoop", "Kafka", "Scala", "Python", "SQL"),
+    "data_engineering": ("Airflow", "Spark", "SQL", "Kafka", "Python", "PostgreSQL", "AWS"),
+    "cybersecurity": ("SIEM", "Splunk", "IDS/IPS", "Threat Hunting", "Incident Response", "Firewalls", "Linux"),
+    "pentesting": ("Burp Suite", "Metasploit", "Nmap", "OWASP", "Python", "Linux"),
+    "networking": ("TCP/IP", "Cisco", "BGP", "Firewalls", "Linux"),
+    "soc": ("SIEM", "Splunk", "Incident Response", "EDR", "Threat Hunting"),
+    "cloud": ("AWS", "Azure", "GCP", "Terraform", "Docker", "Kubernetes"),
+    "cloud_arch": ("AWS", "Azure", "GCP", "Microservices", "Kubernetes", "Terraform"),
+    "devops": ("Kubernetes", "Docker", "Terraform", "CI/CD", "Jenkins", "Ansible", "AWS", "Linux"),
+    "sre": ("Kubernetes", "Prometheus", "Grafana", "Linux", "Go", "Python", "Terraform"),
+    "systems": ("Linux", "C", "Bash", "TCP/IP", "Rust"),
+    "database": ("SQL", "PostgreSQL", "MySQL", "Oracle", "MongoDB", "Redis"),
+    "qa": ("Manual Testing", "Selenium", "JIRA", "Cypress"),
+    "automation": ("Selenium", "Cypress", "Python", "CI/CD", "Java"),
+    "product": ("Agile", "JIRA", "SQL"),
+    "blockchain": ("Solidity", "Ethereum", "Smart Contracts", "Rust", "Go"),
+    "ar_vr": ("Unity", "Unreal Engine", "C#", "ARKit", "C++"),
+    "iot": ("MQTT", "C", "Raspberry Pi", "Embedded Linux", "Python"),
+    "robotics": ("ROS", "C++", "Python", "Computer Vision"),
+}
+
+_SEPARATORS = re.compile(r"[,;|\n]+")
+# Deletes the ASCII characters that don't tell skills apart: all but letters, digits, '+' and '#'
+_FOLD_TABLE = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if not (c.isalnum() or c in "+#")))
+
+
+def fold(name: str) -> str:
+    """Lookup form of a skill name: lowercased, without spaces or punctuation other than '+' and '#'"""
+    return name.lower().translate(_FOLD_TABLE)
+
+
+def build_alias_index(aliases: Dict[str, Tuple[str, ...]] = SKILL_ALIASES) -> Dict[str, str]:
+    """Map the folded form of every canonical name and alias to the canonical name"""
+    index = {}
+    for canonical, spellings in aliases.items():
+        index[fold(canonical)] = canonical
+        for spelling in spellings:
+            index.setdefault(fold(spelling), canonical)
+    return index
+
+
+def build_relevance(categories: Dict[str, Tuple[str, ...]] = CATEGORY_SKILLS) -> Dict[str, Dict[str, int]]:
+    """Score each category's skills, highest for the most relevant"""
+    return {
+        category: {skill: len(skills) - rank for rank, skill in enumerate(skills)}
+        for category, skills in categories.items()
+    }
+
+
+# Built once at import time
+ALIAS_INDEX = build_alias_index()
+RELEVANCE = build_relevance()
+_CANONICAL_KEYS = {canonical: fold(canonical) for canonical in SKILL_ALIASES}
+
+
+class ParsedSkills:
+    """A skills string split, resolved to canonical names and ranked for a category"""
+
+    __slots__ = ("names", "ranked", "key")
+
+    def __init__(self, names: Tuple[str, ...], ranked: Tuple[str, ...]):
+        # Canonical names in the order they were entered, without duplicates
+        self.names = names
+        # The same names, most relevant to the category first
+        self.ranked = ranked
+        # Order-independent form for cache keys
+        self.key: Tuple[str, ...] = tuple(sorted({name.lower() for name in names}))
+
+    @property
+    def primary(self) -> Optional[str]:
+        return self.ranked[0] if self.ranked else None
+
+    def __bool__(self) -> bool:
+        return bool(self.names)
+
+    def __repr__(self) -> str:
+        return f"ParsedSkills({list(self.ranked)!r})"
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_skills(skills: str, category: Optional[str] = None) -> ParsedSkills:
+    """Split a skills string on , ; | or newlines, resolve aliases and rank by relevance to the category
+
+    Unknown skills are kept as entered, with whitespace collapsed. Results are
+    cached, so each distinct (skills, category) pair is parsed once.
+    """
+    names = []
+    seen = set()
+    # Lowercasing the whole string once keeps the per-token work to one translate and one lookup
+    for token, lowered in zip(_SEPARATORS.split(skills), _SEPARATORS.split(skills.lower())):
+        folded = lowered.translate(_FOLD_TABLE)
+        if not folded:
+            continue
+        name = ALIAS_INDEX.get(folded)
+        if name is None:
+            name = " ".join(token.split())
+        else:
+            folded = _CANONICAL_KEYS[name]
+        if folded not in seen:
+            seen.add(folded)
+            names.append(name)
+    scores = RELEVANCE.get(category)
+    if scores:
+        # Stable sort: equally relevant skills keep the order they were entered in
+        ranked = sorted(names, key=lambda name: -scores.get(name, 0))
+    else:
+        ranked = names
+    return ParsedSkills(tuple(names), tuple(ranked))
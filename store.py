@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+# Lua scripts run atomically by Redis; benchmarks/fake_redis.py implements these same scripts
+REDIS_DELETE_IF = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+REDIS_INCR = """
+local value = redis.call("INCR", KEYS[1])
+if value == 1 and ARGV[1] ~= "" then
+    redis.call("PEXPIRE", KEYS[1], ARGV[1])
+end
+return value
+"""
+
+
+class MemoryStore:
+    """Process-local key-value store; nothing is shared between worker processes"""
+
+    shared = False
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl is not None else None)
+
+    def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set the key only if it is absent; True if this call set it"""
+        with self._lock:
+            now = time.time()
+            if self._live(key, now) is not None:
+                return False
+            self._data[key] = (value, now + ttl if ttl is not None else None)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_if(self, key: str, value: str) -> bool:
+        """Delete the key only if it holds value; True if this call deleted it"""
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None or entry[0] != value:
+                return False
+            del self._data[key]
+            return True
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Increment a counter; a new counter expires ttl seconds after it is created"""
+        with self._lock:
+            now = time.time()
+            entry = self._live(key, now)
+            if entry is None:
+                entry = ("0", now + ttl if ttl is not None else None)
+            value = int(entry[0]) + 1
+            self._data[key] = (str(value), entry[1])
+            return value
+
+
+class SQLiteStore:
+    """Key-value store in a SQLite file shared by every worker on one host"""
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl is not None else None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, value, self._expiry(ttl)),
+            )
+
+    def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set the key only if it is absent; True if this call set it"""
+        with self._lock:
+            # An expired row counts as absent; the conditional update takes it over atomically
+            cursor = self._conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+                (key, value, self._expiry(ttl), time.time()),
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def delete_if(self, key: str, value: str) -> bool:
+        """Delete the key only if it holds value; True if this call deleted it"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM kv WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, value, time.time()),
+            )
+        return cursor.rowcount > 0
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Increment a counter; a new counter expires ttl seconds after it is created"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, '1', ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "value = CASE WHEN kv.expires_at IS NOT NULL AND kv.expires_at <= ? THEN '1' "
+                "ELSE CAST(CAST(kv.value AS INTEGER) + 1 AS TEXT) END, "
+                "expires_at = CASE WHEN kv.expires_at IS NOT NULL AND kv.expires_at <= ? THEN excluded.expires_at "
+                "ELSE kv.expires_at END "
+                "RETURNING value",
+                (key, self._expiry(ttl), now, now),
+            ).fetchone()
+        return int(row[0])
+
+
+class RedisStore:
+    """Key-value store in Redis (or a Redis-compatible server) shared across hosts
+
+    Requires `pip install "redis>=5"`.
+    """
+
+    shared = True
+
+    def __init__(self, url: str):
+        import redis
+
+        self.url = url
+        # RESP2 is understood by every Redis-compatible server, including benchmarks/fake_redis.py
+        self.client = redis.Redis.from_url(url, decode_responses=True, protocol=2)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self.client.set(key, value, px=int(ttl * 1000) if ttl is not None else None)
+
+    def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set the key only if it is absent; True if this call set it"""
+        return bool(self.client.set(key, value, nx=True, px=int(ttl * 1000) if ttl is not None else None))
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+    def delete_if(self, key: str, value: str) -> bool:
+        """Delete the key only if it holds value; True if this call deleted it"""
+        return bool(self.client.eval(REDIS_DELETE_IF, 1, key, value))
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Increment a counter; a new counter expires ttl seconds after it is created"""
+        # One script, so a crash between the increment and the expiry can't leave a counter that never expires
+        return int(self.client.eval(REDIS_INCR, 1, key, int(ttl * 1000) if ttl is not None else ""))
+
+
+def create_store(url: str):
+    """Build a store from a URL: memory://, sqlite:///file.db or redis://host:port/db"""
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryStore()
+    if scheme == "sqlite":
+        # As in SQLAlchemy: sqlite:///store.db is relative, sqlite:////data/store.db absolute
+        path = url[len("sqlite:///"):]
+        if not url.startswith("sqlite:///") or not path:
+            raise ValueError(f"SQLite store URL needs a file path: {url!r}")
+        return SQLiteStore(path)
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisStore(url)
+    raise ValueError(f"Unknown store URL {url!r} (expected memory://, sqlite:///path or redis://host:port)")
+
+
+def store_from_env():
+    """Build the store selected by SHARED_STORE (in-process memory by default)"""
+    return create_store(os.environ.get("SHARED_STORE", "memory://"))
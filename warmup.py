@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ratelimit import WARMUP
+
+Target = Tuple[str, str, str]  # (role, skills, level)
+
+# One commonly entered skill set per job category; extend with WARMUP_SKILLS / WARMUP_SKILLS_FILE
+DEFAULT_SKILL_SETS = {
+    "software_dev": ["Python, Java, SQL, Git"],
+    "frontend": ["JavaScript, React, TypeScript, CSS"],
+    "backend": ["Python, Django, PostgreSQL, REST APIs"],
+    "mobile": ["Kotlin, Swift, Flutter"],
+    "gaming": ["C++, Unity, Unreal Engine"],
+    "embedded": ["C, C++, RTOS, Microcontrollers"],
+    "data_science": ["Python, Pandas, Scikit-learn, SQL"],
+    "data_analysis": ["SQL, Excel, Tableau, Python"],
+    "ml_engineer": ["Python, TensorFlow, PyTorch, Scikit-learn"],
+    "ai_engineer": ["Python, PyTorch, LLMs, MLOps"],
+    "nlp": ["Python, Transformers, spaCy, NLTK"],
+    "computer_vision": ["Python, OpenCV, PyTorch, CNNs"],
+    "bi": ["SQL, Power BI, Tableau, Data Modeling"],
+    "big_data": ["Spark, Hadoop, Kafka, Scala"],
+    "data_engineering": ["Python, SQL, Airflow, Spark"],
+    "cybersecurity": ["SIEM, Splunk, IDS/IPS, Threat Hunting"],
+    "pentesting": ["Burp Suite, Metasploit, Nmap, OWASP"],
+    "networking": ["TCP/IP, Cisco, BGP, Firewalls"],
+    "soc": ["SIEM, Incident Response, Splunk, EDR"],
+    "cloud": ["AWS, Azure, Terraform, Docker"],
+    "cloud_arch": ["AWS, Azure, GCP, Microservices"],
+    "devops": ["AWS, Docker, Kubernetes, Jenkins, Terraform"],
+    "sre": ["Kubernetes, Prometheus, Linux, Python"],
+    "systems": ["Linux, Bash, Networking, C"],
+    "database": ["SQL, PostgreSQL, Oracle, Performance Tuning"],
+    "qa": ["Manual Testing, Selenium, JIRA, Test Planning"],
+    "automation": ["Selenium, Python, Cypress, CI/CD"],
+    "product": ["Agile, Roadmapping, SQL, Stakeholder Management"],
+    "blockchain": ["Solidity, Ethereum, Web3.js, Smart Contracts"],
+    "ar_vr": ["Unity, C#, ARKit, 3D Graphics"],
+    "iot": ["C, MQTT, Raspberry Pi, Embedded Linux"],
+    "robotics": ["C++, ROS, Python, Computer Vision"],
+}
+
+
+def load_skill_sets(path: Optional[str] = None, extra: Optional[str] = None) -> Dict[str, List[str]]:
+    """Skill sets by role or category: the defaults, a JSON file's entries and a ';'-separated list for every role
+
+    The JSON file maps a role or category name (or "*" for every role) to a list
+    of comma-separated skill strings.
+    """
+    skill_sets = {category: list(sets) for category, sets in DEFAULT_SKILL_SETS.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for name, sets in json.load(f).items():
+                skill_sets.setdefault(name, []).extend(sets)
+    if extra:
+        skill_sets.setdefault("*", []).extend(s.strip() for s in extra.split(";") if s.strip())
+    return skill_sets
+
+
+def build_targets(
+    categories: Dict[str, str], levels: Iterable[str], skill_sets: Dict[str, List[str]]
+) -> List[Target]:
+    """Every role × level × skill set to keep warm, without duplicates"""
+    levels = list(levels)
+    targets = []
+    seen = set()
+    for role, category in categories.items():
+        sets = skill_sets.get(role, []) + skill_sets.get(category, []) + skill_sets.get("*", [])
+        for skills in sets:
+            for level in levels:
+                if (role, skills, level) not in seen:
+                    seen.add((role, skills, level))
+                    targets.append((role, skills, level))
+    return targets
+
+
+class WarmupScheduler:
+    """Keep the response cache filled for a fixed set of requests
+
+    Each pass regenerates the targets that are missing from the cache or expire
+    within ``refresh_margin`` seconds, missing ones first and then by expiry,
+    making at most ``max_calls`` upstream calls. With ``interval`` set, passes
+    repeat in a background thread. A shared store lets one worker process run
+    each pass for all of them.
+    """
+
+    def __init__(
+        self,
+        targets: List[Target],
+        refresh: Callable[[str, str, str], bool],
+        expires_at: Callable[[str, str, str], Optional[float]],
+        max_calls: int = 100,
+        interval: Optional[float] = None,
+        refresh_margin: Optional[float] = None,
+        store=None,
+    ):
+        self.targets = targets
+        self.refresh = refresh
+        self.expires_at = expires_at
+        self.max_calls = max_calls
+        self.interval = interval
+        self.refresh_margin = refresh_margin if refresh_margin is not None else (interval or 0.0)
+        self.store = store if store is not None and store.shared else None
+        self.passes = 0
+        self.calls = 0
+        self.failures = 0
+        self._progress = {"fresh": 0, "stale": 0, "missing": len(targets)}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def plan(self, now: Optional[float] = None) -> List[Tuple[Target, str]]:
+        """Targets due for a refresh with their state, most urgent first; also updates the coverage counts"""
+        now = time.time() if now is None else now
+        due = []
+        fresh = stale = missing = 0
+        for target in self.targets:
+            expires_at = self.expires_at(*target)
+            if expires_at is None:
+                missing += 1
+                due.append((0.0, target, "missing"))
+            elif expires_at - now <= self.refresh_margin:
+                stale += 1
+                due.append((expires_at, target, "stale"))
+            else:
+                fresh += 1
+        with self._lock:
+            self._progress = {"fresh": fresh, "stale": stale, "missing": missing}
+        due.sort(key=lambda item: item[0])
+        return [(target, state) for _, target, state in due]
+
+    def run_once(self) -> Dict:
+        """Run one pass and return its report"""
+        start = time.perf_counter()
+        due = self.plan()
+        refreshed = failed = 0
+        for target, state in due[:self.max_calls]:
+            if self._stop.is_set():
+                break
+            ok = self.refresh(*target)
+            with self._lock:
+                self.calls += 1
+                if ok:
+                    refreshed += 1
+                    self._progress[state] -= 1
+                    self._progress["fresh"] += 1
+                else:
+                    failed += 1
+                    self.failures += 1
+            if not ok and failed >= 3 and refreshed == 0:
+                # The model is unavailable; try again next pass rather than burning the budget
+                break
+        with self._lock:
+            self.passes += 1
+        report = dict(self.progress(), due=len(due), refreshed=refreshed, failed=failed,
+                      deferred=max(0, len(due) - refreshed - failed), elapsed=round(time.perf_counter() - start, 3))
+        print(f"Warm-up: {json.dumps(report)}")
+        return report
+
+    def progress(self) -> Dict:
+        """Coverage of the targets as of the last pass, updated as entries are refreshed"""
+        with self._lock:
+            progress = dict(self._progress)
+        progress["targets"] = len(self.targets)
+        progress["coverage"] = round(progress["fresh"] / len(self.targets), 4) if self.targets else 1.0
+        return progress
+
+    def _loop(self):
+        while not self._stop.is_set():
+            # With a shared store only one worker runs each pass
+            lease = f"warmup:{os.getpid()}"
+            if self.store is None or self.store.add("warmup:lease", lease, ttl=self.interval):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"Warm-up Error: {e}")
+            else:
+                # Another worker warms the shared cache; just keep the coverage numbers current
+                self.plan()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "WarmupScheduler":
+        """Run passes every ``interval`` seconds in a daemon thread, starting now"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def scheduler_from_env(interval: Optional[float] = None) -> WarmupScheduler:
+    """Build a scheduler over the engine's roles and levels from WARMUP_* environment variables"""
+    import engine
+
+    skill_sets = load_skill_sets(os.environ.get("WARMUP_SKILLS_FILE"), os.environ.get("WARMUP_SKILLS"))
+    if interval is None:
+        interval = float(os.environ.get("WARMUP_INTERVAL", 0)) or None
+    margin = os.environ.get("WARMUP_REFRESH_MARGIN")
+
+    def expires_at(role: str, skills: str, level: str) -> Optional[float]:
+        return engine.response_cache.expires_at(engine.question_cache_key(role, skills, level))
+
+    return WarmupScheduler(
+        build_targets(engine.JOB_CATEGORIES, engine.LEVEL_MODIFIERS, skill_sets),
+        lambda role, skills, level: engine.refresh_questions(role, skills, level, priority=WARMUP),
+        expires_at,
+        max_calls=int(os.environ.get("WARMUP_MAX_CALLS", 100)),
+        interval=interval,
+        refresh_margin=float(margin) if margin else None,
+        store=engine.shared_store,
+    )
+
+
+def cache_is_persistent() -> bool:
+    """True if the engine's response cache outlives the process (CACHE_PATH or SHARED_STORE)"""
+    import engine
+    from cache import MemoryBackend
+
+    return not isinstance(engine.response_cache.backend, MemoryBackend)
+
+
+def start_from_env() -> Optional[WarmupScheduler]:
+    """Start background warm-up if WARMUP_INTERVAL is set; returns the running scheduler or None"""
+    if not float(os.environ.get("WARMUP_INTERVAL", 0) or 0):
+        return None
+    import metrics
+
+    scheduler = scheduler_from_env().start()
+    metrics.register_stats(
+        "interview_warmup_targets", "Warm-up targets by cache state (fresh, stale, missing)",
+        lambda: {k: scheduler.progress()[k] for k in ("fresh", "stale", "missing")}, "state", kind="gauge"
+    )
+    return scheduler
+
+
+def main(argv) -> int:
+    """Entry point for `python app.py warmup`: run one pass and print its report
+
+    Refuses to run without CACHE_PATH or SHARED_STORE: the in-memory cache
+    would be filled and then thrown away when the command exits.
+    """
+    parser = argparse.ArgumentParser(
+        prog="app.py warmup",
+        description="Precompute question sets for every role and level with common skill sets. "
+                    "The answers must outlive this command, so CACHE_PATH or SHARED_STORE has to be set; "
+                    "otherwise use WARMUP_INTERVAL to warm the cache of a running server.",
+    )
+    parser.add_argument("--max-calls", type=int, help="upstream call budget (default WARMUP_MAX_CALLS or 100)")
+    parser.add_argument("--dry-run", action="store_true", help="only report coverage and what is due")
+    args = parser.parse_args(argv)
+
+    try:
+        scheduler = scheduler_from_env()
+    except (OSError, ValueError) as e:
+        print(f"Warm-up Error: {e}", file=sys.stderr)
+        return 2
+    if args.max_calls is not None:
+        scheduler.max_calls = args.max_calls
+    if args.dry_run:
+        due = scheduler.plan()
+        print(json.dumps(dict(scheduler.progress(), due=len(due))))
+        return 0
+    if not cache_is_persistent():
+        print("Warm-up Error: the response cache is in memory only and would be lost when this command exits; "
+              "set CACHE_PATH or SHARED_STORE, or WARMUP_INTERVAL on the server", file=sys.stderr)
+        return 2
+    report = scheduler.run_once()
+    return 1 if report["failed"] and not report["refreshed"] else 0